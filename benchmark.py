@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Onyx Terminal.
+Generates synthetic fixing workbooks, day-count files, snapshot histories
+and ticker sets in a temp directory, times the hot paths and writes the
+results as JSON. A stored baseline can be compared to flag regressions.
+
+Usage:
+    python benchmark.py                         # run and write benchmark_results.json
+    python benchmark.py --sheets 250 --repeat 10
+    python benchmark.py --save-baseline         # also store results as the baseline
+    python benchmark.py --compare               # exit 1 if a case regressed, 2 without a baseline
+    python benchmark.py --only funding.         # scenario grid and DV01 only
+"""
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from openpyxl import Workbook
+from openpyxl.utils.cell import coordinate_to_tuple
+
+from config import APP_DIR, ALL_REAL_TICKERS, CHART_LOOKBACK_DAYS, WEIGHTS_FILE_CELLS, WEIGHTS_MODEL_CELLS
+
+DEFAULT_RESULTS = APP_DIR / "benchmark_results.json"
+DEFAULT_BASELINE = APP_DIR / "benchmark_baseline.json"
+
+DAY_FILE_TENORS = [("1w", 7), ("1m", 30), ("2m", 61), ("3m", 91), ("6m", 182)]
+
+
+# ============================================================================
+# Synthetic fixtures
+# ============================================================================
+
+def business_days(start: date, count: int) -> list[date]:
+    """`count` weekdays from `start` onwards."""
+    days = []
+    d = start
+    while len(days) < count:
+        if d.weekday() < 5:
+            days.append(d)
+        d += timedelta(days=1)
+    return days
+
+
+def build_recon_workbook(path: Path, sheets: int, rows: int = 116, cols: int = 30, seed: int = 1):
+    """
+    Fixing workbook with one sheet per business day, named YYYY-MM-DD like
+    the real workbook, filled with numbers (real sheets are ~116x30).
+    The weights model date cell holds the sheet date.
+    """
+    rng = random.Random(seed)
+    date_row, date_col = coordinate_to_tuple(WEIGHTS_MODEL_CELLS["DATE"])
+    wb = Workbook(write_only=True)
+    for d in business_days(date(2024, 1, 2), sheets):
+        ws = wb.create_sheet(d.isoformat())
+        for r in range(1, rows + 1):
+            values = [round(rng.uniform(-5.0, 15.0), 6) for _ in range(cols)]
+            if r == date_row:
+                values[date_col - 1] = datetime(d.year, d.month, d.day)
+            ws.append(values)
+    wb.save(path)
+
+
+def build_day_file(path: Path, year: int):
+    """Day-count file with the same columns as 'Nibor days YYYY.xlsx'."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Days")
+    header = ["date", "settlement"]
+    for tenor, _ in DAY_FILE_TENORS:
+        header += [f"{tenor}_MD", f"{tenor}_Days"]
+    ws.append(header)
+
+    for d in business_days(date(year, 1, 2), 252):
+        if d.year != year:
+            break
+        settlement = d + timedelta(days=2)
+        row = [datetime(d.year, d.month, d.day), datetime(settlement.year, settlement.month, settlement.day)]
+        for _, days in DAY_FILE_TENORS:
+            md = settlement + timedelta(days=days)
+            row += [datetime(md.year, md.month, md.day), days]
+        ws.append(row)
+    wb.save(path)
+
+
+def build_weights_file(path: Path):
+    wb = Workbook()
+    ws = wb.active
+    effective = datetime(2026, 1, 1)
+    for i, key in enumerate(("H3", "H4", "H5", "H6")):
+        ws[WEIGHTS_FILE_CELLS[key]] = effective + timedelta(days=31 * i)
+    ws[WEIGHTS_FILE_CELLS["USD"]] = 0.445
+    ws[WEIGHTS_FILE_CELLS["EUR"]] = 0.555
+    ws[WEIGHTS_FILE_CELLS["NOK"]] = 0.0
+    wb.save(path)
+
+
+def build_tickers(extra: int) -> list[str]:
+    """The real ticker set plus `extra` synthetic tickers."""
+    return list(ALL_REAL_TICKERS) + [f"SYN{i:04d} Curncy" for i in range(extra)]
+
+
+def build_market(tickers: list[str], seed: int = 2) -> dict:
+    rng = random.Random(seed)
+    return {t: {"price": round(rng.uniform(1.0, 12.0), 4), "change": 0.0, "time": "12:00:00"} for t in tickers}
+
+
+def build_snapshots(snapshot_engine, market: dict, today: date, days: int):
+    """One daily snapshot per calendar day for the last `days` days."""
+    contrib = {t: {"Z": 4.5, "AA": 4.6} for t in ("1M", "2M", "3M", "6M")}
+    for i in range(days, -1, -1):
+        d = today - timedelta(days=i)
+        snapshot_engine.save_daily_snapshot(d.isoformat(), market, contrib, {"workbook": "benchmark"})
+
+
+# ============================================================================
+# Timing
+# ============================================================================
+
+def time_case(func, repeat: int, warmup: int = 1, setup=None) -> dict:
+    """
+    Time `func` `repeat` times after `warmup` untimed calls.
+
+    Args:
+        func: Callable without arguments
+        repeat: Timed runs
+        warmup: Untimed runs first (imports, caches)
+        setup: Optional callable run before each call, outside the timing
+
+    Returns:
+        {"n", "min_ms", "median_ms", "mean_ms", "max_ms"}
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+
+    return {
+        "n": len(samples),
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def run_benchmarks(sheets: int = 60, repeat: int = 5, extra_tickers: int = 200,
+                   implied_batch: int = 10000, only: list[str] | None = None) -> dict:
+    """
+    Build the fixtures and time every case.
+
+    Returns:
+        {"meta": {...}, "results": {case: stats}}
+    """
+    from calculations import calc_implied_yield
+    from engines import ExcelEngine, MockBloombergEngine
+    from recon_engine import ReconModel
+    from snapshot_engine import SnapshotEngine
+
+    tmp = Path(tempfile.mkdtemp(prefix="onyx_bench_"))
+    results: dict[str, dict] = {}
+
+    def _want(name: str) -> bool:
+        return not only or any(name.startswith(o) for o in only)
+
+    try:
+        t0 = time.perf_counter()
+        recon_file = tmp / "2025" / "Nibor fixing Benchmark Workbook.xlsx"
+        recon_file.parent.mkdir(parents=True)
+        build_recon_workbook(recon_file, sheets)
+        day_files = [tmp / "Nibor days 2025.xlsx", tmp / "Nibor days 2026.xlsx"]
+        for f, year in zip(day_files, (2025, 2026)):
+            build_day_file(f, year)
+        weights_file = tmp / "Weights.xlsx"
+        build_weights_file(weights_file)
+
+        tickers = build_tickers(extra_tickers)
+        market = build_market(tickers)
+        today = date(2026, 3, 2)
+        snapshots = SnapshotEngine(base_path=tmp / "Historik")
+        build_snapshots(snapshots, market, today, CHART_LOOKBACK_DAYS)
+        fixtures_ms = (time.perf_counter() - t0) * 1000.0
+        print(f"[Bench] Fixtures built in {fixtures_ms:.0f} ms ({sheets} sheets, {len(tickers)} tickers) in {tmp}")
+
+        # No weights history file: keeps the synthetic weights out of the real one
+        engine = ExcelEngine(recon_file=recon_file, weights_file=weights_file, day_files=day_files,
+                             weights_history_file=None)
+        # Let the constructor's background day-file load finish before timing anything
+        engine.wait_ready("days", timeout=10)
+
+        if _want("excel.load_recon_direct"):
+            results["excel.load_recon_direct"] = time_case(
+                lambda: engine.load_recon_direct(include_weights=False, force=True), repeat)
+
+        if _want("excel.load_day_files"):
+            results["excel.load_day_files"] = time_case(engine.reload_days, repeat)
+        else:
+            engine.reload_days()
+
+        if _want("excel.load_weights_file"):
+            results["excel.load_weights_file"] = time_case(lambda: engine.load_weights_file(force=True), repeat)
+
+        if _want("recon."):
+            ok, msg = engine.load_recon_direct(include_weights=False, force=True)
+            if not ok:
+                raise RuntimeError(f"Synthetic recon workbook failed to load: {msg}")
+            engine.load_weights_file(force=True)
+            days = engine.get_days_for_date(engine.day_rows[0]["date"].strftime("%Y-%m-%d")) or {}
+            model = ReconModel()
+            counter = iter(range(1_000_000))
+
+            def _inputs():
+                # Fresh tokens every call so the whole graph is recomputed
+                n = next(counter)
+                return {
+                    "excel_cells": (dict(engine.recon_data), n),
+                    "recon_data": (dict(engine.recon_data), n),
+                    "market": (market, n),
+                    "day_calendar": (days, n),
+                    "weights_file": ({"ok": engine.weights_ok, "parsed": dict(engine.weights_cells_parsed)}, n),
+                    "today": (today, n),
+                }
+
+            results["recon.build_rows"] = time_case(lambda: model.evaluate(_inputs()).rows_for("ALL"), repeat)
+
+        if _want("snapshot."):
+            contrib = {t: {"Z": 4.5, "AA": 4.6} for t in ("1M", "2M", "3M", "6M")}
+            day = today.isoformat()
+            results["snapshot.save"] = time_case(
+                lambda: snapshots.save_daily_snapshot(day, market, contrib, {"workbook": "benchmark"}), repeat)
+            results["snapshot.load"] = time_case(lambda: snapshots.load_snapshot(day), repeat)
+            results["snapshot.nibor_history"] = time_case(
+                lambda: snapshots.load_nibor_history(CHART_LOOKBACK_DAYS, today=today), repeat)
+
+        if _want("calc.implied_yield_batch"):
+            rng = random.Random(3)
+            batch = [(rng.uniform(9.0, 12.0), rng.uniform(-200.0, 200.0), rng.uniform(2.0, 5.0),
+                      rng.choice((7, 30, 61, 91, 182))) for _ in range(implied_batch)]
+            results["calc.implied_yield_batch"] = time_case(
+                lambda: [calc_implied_yield(s, p, r, d) for s, p, r, d in batch], repeat)
+
+        if _want("market.mock_fetch"):
+            bbg = MockBloombergEngine(cache_ttl_sec=0.0)
+
+            def _fetch():
+                done = threading.Event()
+                bbg.fetch_snapshot(tickers, lambda data, meta: done.set(), lambda err: done.set())
+                if not done.wait(10.0):
+                    raise RuntimeError("Mock fetch timed out")
+
+            results["market.mock_fetch"] = time_case(_fetch, repeat)
+
+        if _want("funding."):
+            from funding_model import FUNDING_TENORS, resolve_weights
+            from scenario_engine import ScenarioEngine
+
+            engine.load_weights_file(force=True)
+            rng = random.Random(4)
+            weights = resolve_weights(engine)
+            funding_data = {}
+            for tenor, days in zip(FUNDING_TENORS, (7, 30, 61, 91, 182)):
+                funding_data[tenor] = {
+                    "eur_spot": rng.uniform(11.0, 12.0), "eur_pips": rng.uniform(-50.0, 150.0),
+                    "eur_rate": rng.uniform(2.0, 4.0), "eur_days": days,
+                    "usd_spot": rng.uniform(10.0, 11.0), "usd_pips": rng.uniform(-50.0, 150.0),
+                    "usd_rate": rng.uniform(3.5, 5.0), "usd_days": days,
+                    "nok_cm": rng.uniform(4.0, 5.0), "weights": weights,
+                }
+            scenarios = ScenarioEngine.from_funding_data(funding_data, engine)
+            steps = [x / 2.0 for x in range(-10, 11)]
+            weight_shifts = [{"USD": d, "EUR": -d} for d in (-0.10, -0.05, 0.0, 0.05, 0.10)]
+            results["funding.scenario_grid"] = time_case(
+                lambda: scenarios.run_grid(steps, [x * 5.0 for x in steps], [x * 10.0 for x in steps],
+                                           weight_shifts), repeat)
+            results["funding.scenario_dv01"] = time_case(scenarios.dv01, repeat)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "sheets": sheets,
+            "repeat": repeat,
+            "tickers": len(tickers),
+            "implied_batch": implied_batch,
+            "fixtures_ms": round(fixtures_ms, 1),
+        },
+        "results": results,
+    }
+
+
+# ============================================================================
+# Baseline comparison
+# ============================================================================
+
+def compare(results: dict, baseline: dict, threshold: float = 0.25, min_delta_ms: float = 1.0) -> list[dict]:
+    """
+    Compare best-of-n times against a baseline.
+
+    The minimum is compared rather than the median since it is the least
+    affected by other load on the machine. A case regresses when it is more
+    than `threshold` slower (relative) and at least `min_delta_ms` slower
+    (absolute, filters timer noise on sub-millisecond cases).
+
+    Returns:
+        One row per case present in both: {"case", "baseline_ms", "current_ms", "ratio", "regressed"}
+    """
+    rows = []
+    base = baseline.get("results", {})
+    for case, cur in results.get("results", {}).items():
+        if case not in base:
+            continue
+        b, c = base[case]["min_ms"], cur["min_ms"]
+        ratio = c / b if b > 0 else float("inf")
+        rows.append({
+            "case": case,
+            "baseline_ms": b,
+            "current_ms": c,
+            "ratio": round(ratio, 3),
+            "regressed": ratio > 1.0 + threshold and (c - b) >= min_delta_ms,
+        })
+    return rows
+
+
+def format_results(results: dict, comparison: list[dict] | None = None) -> str:
+    by_case = {r["case"]: r for r in comparison or []}
+    lines = [f"  {'case':<28} {'median':>10} {'min':>10} {'max':>10}  vs baseline"]
+    for case, st in results["results"].items():
+        cmp = by_case.get(case)
+        vs = ""
+        if cmp:
+            vs = f"{cmp['ratio']:.2f}x" + ("  REGRESSION" if cmp["regressed"] else "")
+        lines.append(f"  {case:<28} {st['median_ms']:10.2f} {st['min_ms']:10.2f} {st['max_ms']:10.2f}  {vs}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Onyx Terminal benchmark suite")
+    parser.add_argument("--sheets", type=int, default=60, help="Sheets in the synthetic fixing workbook")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--tickers", type=int, default=200, help="Synthetic tickers on top of the real set")
+    parser.add_argument("--batch", type=int, default=10000, help="calc_implied_yield calls per batch")
+    parser.add_argument("--only", nargs="*", help="Case name prefixes to run, e.g. excel. recon.")
+    parser.add_argument("--out", type=Path, default=DEFAULT_RESULTS, help="Results JSON")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Exit 1 if any case regressed vs the baseline, 2 if there is no baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(sheets=args.sheets, repeat=args.repeat, extra_tickers=args.tickers,
+                             implied_batch=args.batch, only=args.only)
+
+    comparison = None
+    if args.compare and not args.baseline.exists():
+        print(f"[Bench] WARNING: --compare given but no baseline at {args.baseline}; nothing compared")
+    if args.baseline.exists():
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                comparison = compare(results, json.load(f), threshold=args.threshold)
+            results["comparison"] = comparison
+        except (OSError, json.JSONDecodeError, KeyError) as e:
+            print(f"[Bench] Could not read baseline {args.baseline}: {e}")
+
+    print(format_results(results, comparison))
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"[Bench] Results written to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in results.items() if k != "comparison"}, f, indent=2)
+        print(f"[Bench] Baseline saved to {args.baseline}")
+
+    if args.compare and comparison is None:
+        # Nothing was compared; do not let CI read that as "no regressions"
+        return 2
+
+    regressions = [r for r in comparison or [] if r["regressed"]]
+    if regressions:
+        print(f"[Bench] {len(regressions)} regression(s): {', '.join(r['case'] for r in regressions)}")
+        return 1 if args.compare else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
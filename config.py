@@ -110,8 +110,6 @@ APP_DIR = Path(__file__).resolve().parent
 ASSETS_DIR = APP_DIR / "assets"
 DATA_DIR = BASE_DIR  # Use dynamically detected path
 
-# Skapa data-mappen om den inte finns
-DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 EXCEL_LOGO_CANDIDATES = [
     DATA_DIR / "Bilder" / "Excel.png",
@@ -139,7 +137,69 @@ RECON_FILE = DATA_DIR / "Nibor" / "Historik" / "2025" / "Nibor fixing Testing Wo
 WEIGHTS_FILE = DATA_DIR / "Nibor" / "Vikter" / "Weights.xlsx"
 
 CACHE_DIR = DATA_DIR / "cache"
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+_dirs_ready = False
+
+
+def ensure_dirs():
+    """
+    Create the data and cache directories if they do not exist.
+    Called by writers instead of at import so importing config does no filesystem writes.
+    """
+    global _dirs_ready
+    if not _dirs_ready:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)  # also creates DATA_DIR
+        _dirs_ready = True
+
+# Managed copies of locked workbooks (utils.copy_to_cache_fast)
+COPY_CACHE_MAX_MB = 256
+COPY_CACHE_MAX_AGE_HOURS = 24
+
+# Parsed weights per effective month (written by ExcelEngine.load_weights_file)
+WEIGHTS_HISTORY_FILE = CACHE_DIR / "weights_history.json"
+
+# Source file watcher (auto-refresh when a workbook is saved)
+WATCH_SOURCE_FILES = True
+WATCH_POLL_SEC = 1.0      # Poll interval for the mtime/size backend
+WATCH_DEBOUNCE_SEC = 2.0  # File must be unchanged this long before loaders run
+
+# Build hidden pages in idle time after the first paint (otherwise on first visit)
+PREWARM_PAGES = True
+
+# Metrics dump written at the end of terminal mode (see metrics.py)
+METRICS_JSON_FILE = CACHE_DIR / "metrics.json"
+DIAGNOSTICS_REFRESH_MS = 2000  # Diagnostics page auto-refresh while visible
+
+# Sampling profiler (Ctrl+Shift+P in the app, or start with --profile / ONYX_PROFILE=1)
+PROFILER_INTERVAL_MS = 5
+PROFILE_DIR = CACHE_DIR / "profiles"
+
+# Offline market data: serve Bloomberg requests from mock_market instead of
+# blpapi ("instant", "lan", "busy_morning", "flaky", "outage"; None = off)
+MOCK_MARKET_PROFILE = None
+MOCK_MARKET_SEED = 7
+
+# Overall deadline per market fetch; on expiry the request is cancelled and
+# the tickers received so far are delivered, the rest reported missing
+MARKET_FETCH_TIMEOUT_SEC = 10.0
+# Market snapshot versions kept in memory (market_store.MarketDataStore)
+MARKET_HISTORY_VERSIONS = 240
+
+# Replay recorded market data instead of blpapi: "YYYY-MM-DD" or
+# "YYYY-MM-DD:YYYY-MM-DD" (None = off; the ONYX_REPLAY env var overrides).
+# Speed is x wall-clock (0 = next frame on every fetch); longer gaps between
+# frames (nights, weekends) are cut to MARKET_REPLAY_MAX_GAP_SEC.
+MARKET_REPLAY = None
+MARKET_REPLAY_SPEED = 60.0
+MARKET_REPLAY_MAX_GAP_SEC = 300
+# Append every live market fetch to Historik/{year}/intraday/{date}.jsonl for later replay
+RECORD_INTRADAY = False
+
+# Tk event-loop stall detector (heartbeat via after(), reported on the Diagnostics page)
+STALL_WATCHDOG = True
+STALL_HEARTBEAT_MS = 100
+STALL_THRESHOLD_MS = 500
 
 # Swedbank contribution cell mapping (Nibor fixing workbook)
 SWEDBANK_CONTRIBUTION_CELLS = {
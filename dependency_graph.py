@@ -0,0 +1,167 @@
+"""
+Data-versioned dependency graph for Onyx Terminal.
+Nodes declare their inputs; only nodes whose inputs changed are recomputed.
+"""
+import threading
+import time
+
+
+class _Node:
+    """Single computation node with cached value and timing stats."""
+
+    __slots__ = ("name", "func", "inputs", "value", "version", "dep_versions",
+                 "runs", "skips", "last_ms", "total_ms", "error")
+
+    def __init__(self, name: str, func, inputs: list[str]):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.value = None
+        self.version = 0
+        self.dep_versions: tuple | None = None
+        self.runs = 0
+        self.skips = 0
+        self.last_ms: float | None = None
+        self.total_ms = 0.0
+        self.error: str | None = None
+
+
+class DependencyGraph:
+    """
+    Lightweight recomputation graph.
+
+    Inputs are set with a version token; a changed token marks every node
+    that (transitively) depends on the input as dirty. evaluate() recomputes
+    dirty nodes in dependency order and records per-node timings.
+
+    Node functions are called with keyword arguments named after their inputs.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._inputs: dict[str, dict] = {}
+        self._nodes: dict[str, _Node] = {}
+        self._order: list[str] = []
+
+    def add_input(self, name: str, value=None, token=None):
+        with self._lock:
+            if name in self._inputs or name in self._nodes:
+                raise ValueError(f"Duplicate graph name: {name}")
+            self._inputs[name] = {"value": value, "token": token, "version": 0}
+
+    def add_node(self, name: str, func, inputs: list[str]):
+        """Register a node. Inputs must be existing inputs or nodes (keeps the graph acyclic)."""
+        with self._lock:
+            if name in self._inputs or name in self._nodes:
+                raise ValueError(f"Duplicate graph name: {name}")
+            for dep in inputs:
+                if dep not in self._inputs and dep not in self._nodes:
+                    raise ValueError(f"Unknown dependency '{dep}' for node '{name}'")
+            self._nodes[name] = _Node(name, func, inputs)
+            self._order.append(name)
+
+    def set_input(self, name: str, value, token) -> bool:
+        """
+        Set an input value. The input only counts as changed if `token` differs
+        from the previous token (the value itself is never compared).
+
+        Returns:
+            True if the input changed
+        """
+        with self._lock:
+            inp = self._inputs[name]
+            inp["value"] = value
+            if inp["version"] and inp["token"] == token:
+                return False
+            inp["token"] = token
+            inp["version"] += 1
+            return True
+
+    def _dep_version(self, name: str) -> int:
+        if name in self._inputs:
+            return self._inputs[name]["version"]
+        return self._nodes[name].version
+
+    def _dep_value(self, name: str):
+        if name in self._inputs:
+            return self._inputs[name]["value"]
+        return self._nodes[name].value
+
+    def dirty_nodes(self) -> list[str]:
+        """Nodes that would be recomputed by evaluate()."""
+        with self._lock:
+            dirty = set()
+            for name in self._order:
+                node = self._nodes[name]
+                deps = tuple(self._dep_version(d) for d in node.inputs)
+                if node.dep_versions != deps or any(d in dirty for d in node.inputs):
+                    dirty.add(name)
+            return [n for n in self._order if n in dirty]
+
+    def evaluate(self, targets: list[str] | None = None) -> dict:
+        """
+        Recompute dirty nodes (all, or those needed by `targets`).
+
+        Returns:
+            Dict of node name -> current value
+        """
+        with self._lock:
+            needed = self._closure(targets) if targets else set(self._order)
+
+            for name in self._order:
+                if name not in needed:
+                    continue
+                node = self._nodes[name]
+                deps = tuple(self._dep_version(d) for d in node.inputs)
+                if node.dep_versions == deps:
+                    node.skips += 1
+                    continue
+
+                kwargs = {d: self._dep_value(d) for d in node.inputs}
+                t0 = time.perf_counter()
+                try:
+                    node.value = node.func(**kwargs)
+                    node.error = None
+                except Exception as e:
+                    node.value = None
+                    node.error = str(e)
+                    print(f"[Graph] Node '{name}' failed: {e}")
+                elapsed = (time.perf_counter() - t0) * 1000.0
+
+                node.dep_versions = deps
+                node.version += 1
+                node.runs += 1
+                node.last_ms = elapsed
+                node.total_ms += elapsed
+
+            return {n: self._nodes[n].value for n in self._order if n in needed}
+
+    def value(self, name: str):
+        with self._lock:
+            return self._dep_value(name)
+
+    def _closure(self, targets: list[str]) -> set[str]:
+        out = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name in out or name not in self._nodes:
+                continue
+            out.add(name)
+            stack.extend(self._nodes[name].inputs)
+        return out
+
+    def timings(self) -> dict[str, dict]:
+        """Per-node stats: runs, skips, last_ms, total_ms, error."""
+        with self._lock:
+            return {
+                name: {
+                    "inputs": list(node.inputs),
+                    "runs": node.runs,
+                    "skips": node.skips,
+                    "last_ms": None if node.last_ms is None else round(node.last_ms, 3),
+                    "total_ms": round(node.total_ms, 3),
+                    "error": node.error,
+                }
+                for name, node in ((n, self._nodes[n]) for n in self._order)
+            }
@@ -2,23 +2,32 @@
 Data engines for Onyx Terminal.
 Contains ExcelEngine and BloombergEngine.
 """
+import json
+import os
 import threading
 import time
 import uuid
-from datetime import datetime
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
 
-import pandas as pd
-from openpyxl import load_workbook
 from openpyxl.utils import coordinate_to_tuple
 
 from config import (
     BASE_HISTORY_PATH, DAY_FILES, RECON_FILE, WEIGHTS_FILE,
     RECON_MAPPING, DAYS_MAPPING, RULES_DB, SWET_CM_RECON_MAPPING,
     WEIGHTS_FILE_CELLS, WEIGHTS_MODEL_CELLS, USE_MOCK_DATA,
-    EXCEL_CM_RATES_MAPPING, DEVELOPMENT_MODE
+    EXCEL_CM_RATES_MAPPING, DEVELOPMENT_MODE, WEIGHTS_HISTORY_FILE, MARKET_FETCH_TIMEOUT_SEC,
+    MARKET_HISTORY_VERSIONS, ensure_dirs
 )
-from utils import copy_to_cache_fast, safe_float, to_date
+from market_providers import (
+    BlpapiProvider, FetchIncomplete, RandomWalkProvider, ReplayProvider, StaticDefaultsProvider
+)
+from market_store import MarketDataStore
+from metrics import METRICS
+from utils import safe_float, to_date
+from workbook_access import load_workbook_shared, open_shared
 
 # Bloomberg API optional
 try:
@@ -27,6 +36,10 @@ except ImportError:
     blpapi = None
 
 
+# pandas is imported lazily (DataFrame views, mock defaults); headless
+# paths such as the terminal report never need it.
+
+
 def build_required_cell_set() -> set[tuple[int, int]]:
     """Build set of all required cells for Excel reading."""
     needed = set()
@@ -52,17 +65,71 @@ def build_required_cell_set() -> set[tuple[int, int]]:
     return needed
 
 
-REQUIRED_CELLS = build_required_cell_set()
+def read_cells(ws, coords) -> dict[tuple[int, int], object]:
+    """
+    Values of the (row, col) cells `coords` in one pass over the sheet.
+
+    Read-only worksheets re-parse the sheet XML on every ws.cell() call, so
+    looking up a few hundred cells one by one costs about a second per
+    sheet; iter_rows over the bounding rows reads each row once.
+    """
+    out = dict.fromkeys(coords)
+    if not out:
+        return out
+    cols_by_row: dict[int, list[int]] = {}
+    for r, c in out:
+        cols_by_row.setdefault(r, []).append(c)
+    min_row, max_row = min(cols_by_row), max(cols_by_row)
+    max_col = max(c for _, c in out)
+    for r, row in enumerate(ws.iter_rows(min_row=min_row, max_row=max_row, max_col=max_col, values_only=True),
+                            min_row):
+        for c in cols_by_row.get(r, ()):
+            if c <= len(row):
+                out[(r, c)] = row[c - 1]
+    return out
+
+
+@lru_cache(maxsize=1)
+def required_cells() -> frozenset[tuple[int, int]]:
+    """Required recon cells, built on first use instead of at import."""
+    return frozenset(build_required_cell_set())
 
 
 class ExcelEngine:
-    """Engine for reading and processing Excel files."""
+    """
+    Engine for reading and processing Excel files.
+
+    The source paths default to config; benchmark.py passes synthetic
+    workbooks instead. With load_days=False the day calendar is not loaded
+    in the background; the caller runs reload_days() itself.
+    weights_history_file=None keeps the weights history in memory only
+    (neither read nor written).
+
+    Each dataset ("days", "recon", "weights") has one readiness future
+    per load generation (ready()/wait_ready()); a load that starts after
+    the previous one finished opens the next generation.
+    """
+
+    DATASETS = ("days", "recon", "weights")
 
-    def __init__(self):
-        self.day_data = pd.DataFrame()
-        self._day_data_ready = False
+    def __init__(self, recon_file: Path | None = None, weights_file: Path | None = None,
+                 day_files: list[Path] | None = None, load_days: bool = True,
+                 weights_history_file: Path | None = WEIGHTS_HISTORY_FILE):
+        self.recon_file = Path(recon_file) if recon_file else RECON_FILE
+        self.weights_file = Path(weights_file) if weights_file else WEIGHTS_FILE
+        self.day_files = [Path(p) for p in day_files] if day_files is not None else list(DAY_FILES)
+        self.weights_history_file = Path(weights_history_file) if weights_history_file else None
+
+        # Day-count calendar: rows sorted by date, plus a date -> row index
+        self.day_rows: list[dict] = []
+        self._days_by_date: dict[date, dict] = {}
+        self._day_df = None
         self._day_data_err = None
 
+        # dataset -> Future[bool] of the current load generation (True = loaded OK)
+        self._ready_lock = threading.Lock()
+        self._ready: dict[str, Future] = {name: Future() for name in self.DATASETS}
+
         self.recon_data = {}
         self.current_filename = ""
         self.current_folder_path = BASE_HISTORY_PATH
@@ -79,6 +146,10 @@ class ExcelEngine:
         self.weights_last_loaded_ts: datetime | None = None
         self.weights_cells_raw: dict[str, object] = {}
         self.weights_cells_parsed: dict[str, object] = {}
+        self._weights_sig: tuple | None = None
+
+        # Weights in force per month: "YYYY-MM" -> {"effective", "USD", "EUR", "NOK"}
+        self.weights_history: dict[str, dict] = self._read_weights_history()
 
         # Excel CM rates cache (from Nibor fixing workbook)
         self.excel_cm_rates: dict[str, float] = {}
@@ -88,61 +159,161 @@ class ExcelEngine:
         self.swedbank_contribution_previous: dict[str, dict] = {}
         self.swedbank_contribution_change: dict[str, dict] = {}
 
-        threading.Thread(target=self._load_day_files_bg, daemon=True).start()
+        if load_days:
+            threading.Thread(target=self.reload_days, daemon=True, name="DayFileLoader").start()
+
+    def ready(self, dataset: str) -> Future:
+        """
+        Future for the current load generation of `dataset` ("days", "recon" or "weights").
+
+        Resolves with True once the load has finished, False if it failed.
+        A resolved future is never reset: a reload starts a new generation,
+        so callers that saw a failure call ready() again after the next load
+        to see it recover. Block with .result(timeout), chain with
+        add_done_callback (runs on the loader thread) or await
+        asyncio.wrap_future(...).
+        """
+        with self._ready_lock:
+            return self._ready[dataset]
+
+    @property
+    def _day_data_ready(self) -> bool:
+        return self.ready("days").done()
+
+    def wait_ready(self, dataset: str, timeout: float | None = None) -> bool:
+        """Block until `dataset` has loaded; False if the load failed or `timeout` seconds passed first."""
+        try:
+            return self.ready(dataset).result(timeout)
+        except FutureTimeout:
+            return False
+
+    def _begin_load(self, dataset: str):
+        """Open a new load generation for `dataset` unless one is still pending."""
+        with self._ready_lock:
+            if self._ready[dataset].done():
+                self._ready[dataset] = Future()
+
+    def _set_ready(self, dataset: str, ok: bool):
+        with self._ready_lock:
+            fut = self._ready[dataset]
+            if fut.done():
+                # A concurrent load already resolved this generation
+                return
+            fut.set_result(bool(ok))
 
-    def _load_day_files_bg(self):
+    @staticmethod
+    def _read_day_file(f_path: Path) -> list[dict]:
+        """Rows of the first sheet as dicts keyed by the header row."""
+        wb = load_workbook_shared(f_path, select=lambda names: names[:1])
         try:
-            dfs = []
-            for f_path in DAY_FILES:
+            ws = wb[wb.sheetnames[0]]
+            it = ws.iter_rows(values_only=True)
+            header = next(it, None)
+            if not header:
+                return []
+            cols = [str(h).strip() if h is not None else None for h in header]
+            rows = []
+            for values in it:
+                if values is None or all(v is None for v in values):
+                    continue
+                rows.append({c: v for c, v in zip(cols, values) if c is not None})
+            return rows
+        finally:
+            wb.close()
+
+    def reload_days(self) -> bool:
+        """
+        (Re)load the day calendar from the day files, blocking.
+
+        Returns:
+            True if it loaded; readers keep the previous calendar until then
+        """
+        self._begin_load("days")
+        t0 = time.perf_counter()
+        try:
+            rows = []
+            for f_path in self.day_files:
                 if not f_path.exists():
                     continue
                 try:
-                    df = pd.read_excel(f_path, engine="openpyxl")
-                    dfs.append(df)
+                    rows.extend(self._read_day_file(f_path))
                 except Exception:
-                    try:
-                        temp = copy_to_cache_fast(f_path)
-                        df = pd.read_excel(temp, engine="openpyxl")
-                        dfs.append(df)
-                    except Exception:
-                        continue
-
-            if dfs:
-                day_data = pd.concat(dfs, ignore_index=True)
-                if "date" in day_data.columns:
-                    day_data["date"] = pd.to_datetime(day_data["date"], errors="coerce")
-                    day_data["date"] = day_data["date"].dt.normalize()
-                    day_data = day_data.dropna(subset=["date"]).sort_values("date")
-                self.day_data = day_data
-            self._day_data_ready = True
+                    continue
+
+            dated = []
+            for r in rows:
+                d = to_date(r.get("date"))
+                if d is None:
+                    continue
+                r["date"] = datetime(d.year, d.month, d.day)
+                dated.append(r)
+            dated.sort(key=lambda r: r["date"])
+
+            by_date = {}
+            for r in dated:
+                by_date.setdefault(r["date"].date(), r)
+
+            self.day_rows = dated
+            self._days_by_date = by_date
+            self._day_df = None
+            self._day_data_err = None
+            METRICS.set_gauge("excel.day_rows", len(dated))
         except Exception as e:
             self._day_data_err = str(e)
-            self._day_data_ready = True
+            METRICS.inc("excel.day_files.errors")
+        METRICS.observe("excel.day_files", (time.perf_counter() - t0) * 1000.0)
+        ok = self._day_data_err is None
+        self._set_ready("days", ok)
+        return ok
+
+    @property
+    def day_data(self):
+        """Day calendar as a pandas DataFrame (built, and pandas imported, on first access)."""
+        if self._day_df is None:
+            import pandas as pd
+            self._day_df = pd.DataFrame(self.day_rows)
+        return self._day_df
 
     def resolve_latest_path(self):
-        if RECON_FILE.exists():
-            self.current_folder_path = RECON_FILE.parent
-            self.current_year_loaded = RECON_FILE.parent.name
-            self.current_filename = RECON_FILE.name
-            return RECON_FILE, "OK"
+        recon_file = self.recon_file
+        if recon_file.exists():
+            self.current_folder_path = recon_file.parent
+            self.current_year_loaded = recon_file.parent.name
+            self.current_filename = recon_file.name
+            return recon_file, "OK"
         return None, "File Not Found"
 
-    def load_weights_file(self) -> bool:
-        """Load EXACT cells from Weights.xlsx."""
+    def load_weights_file(self, force: bool = False) -> bool:
+        """
+        Load EXACT cells from Weights.xlsx.
+
+        The file changes about once a month, so the parsed cells are reused
+        while its mtime/size are unchanged unless `force` is set.
+        """
+        self._begin_load("weights")
+        ok = self._load_weights_file(force)
+        self._set_ready("weights", ok)
+        return ok
+
+    def _load_weights_file(self, force: bool) -> bool:
+        weights_file = self.weights_file
         try:
-            if not WEIGHTS_FILE.exists():
+            if not weights_file.exists():
                 self.weights_ok = False
-                self.weights_err = f"Missing file: {WEIGHTS_FILE}"
+                self.weights_err = f"Missing file: {weights_file}"
                 self.weights_cells_raw = {}
                 self.weights_cells_parsed = {}
+                self._weights_sig = None
                 return False
 
-            wb = None
-            try:
-                wb = load_workbook(WEIGHTS_FILE, data_only=True, read_only=True)
-            except Exception:
-                temp_path = copy_to_cache_fast(WEIGHTS_FILE)
-                wb = load_workbook(temp_path, data_only=True, read_only=True)
+            st = weights_file.stat()
+            sig = (st.st_mtime_ns, st.st_size)
+            if not force and self.weights_ok and sig == self._weights_sig:
+                METRICS.inc("excel.weights.unchanged")
+                return True
+
+            t0 = time.perf_counter()
+            wb = load_workbook_shared(weights_file, select=lambda names: names[:1])
 
             ws = wb[wb.sheetnames[0]]
 
@@ -162,61 +333,145 @@ class ExcelEngine:
                 parsed[k] = safe_float(v, None)
 
             wb.close()
+            METRICS.observe("excel.weights_parse", (time.perf_counter() - t0) * 1000.0)
 
             self.weights_cells_raw = dict(raw)
             self.weights_cells_parsed = dict(parsed)
             self.weights_ok = True
             self.weights_err = None
             self.weights_last_loaded_ts = datetime.now()
+            self._weights_sig = sig
+            self._record_weights_history(parsed)
             return True
         except Exception as e:
             self.weights_ok = False
             self.weights_err = str(e)
             self.weights_cells_raw = {}
             self.weights_cells_parsed = {}
+            self._weights_sig = None
+            return False
+
+    def _read_weights_history(self) -> dict[str, dict]:
+        if self.weights_history_file is None:
+            return {}
+        try:
+            with open(self.weights_history_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _record_weights_history(self, parsed: dict):
+        """Store the weights under their effective month (H3) and persist if anything changed."""
+        effective = parsed.get("H3")
+        if effective is None or any(parsed.get(k) is None for k in ("USD", "EUR", "NOK")):
+            return
+
+        entry = {
+            "effective": effective.isoformat(),
+            "USD": parsed["USD"],
+            "EUR": parsed["EUR"],
+            "NOK": parsed["NOK"],
+        }
+        month = effective.strftime("%Y-%m")
+        if self.weights_history.get(month) == entry:
+            return
+        self.weights_history[month] = entry
+        if self.weights_history_file is None:
+            return
+
+        try:
+            ensure_dirs()
+            tmp = self.weights_history_file.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dict(sorted(self.weights_history.items())), f, indent=2)
+            os.replace(tmp, self.weights_history_file)
+        except Exception as e:
+            print(f"[Weights] Could not save history: {e}")
+
+    def get_weights_for_date(self, d: date) -> dict | None:
+        """
+        Weights in force on `d`: the latest history entry with effective date <= d.
+
+        Returns:
+            {"effective": "YYYY-MM-DD", "USD": float, "EUR": float, "NOK": float} or None
+        """
+        target = d.isoformat()
+        best = None
+        for entry in self.weights_history.values():
+            if entry.get("effective", "") <= target and (best is None or entry["effective"] > best["effective"]):
+                best = entry
+        return dict(best) if best else None
+
+    def recon_unchanged(self, file_path: Path) -> bool:
+        """True if `file_path` has the same mtime/size as the last successful load."""
+        try:
+            st = file_path.stat()
+        except Exception:
             return False
+        return (bool(self.recon_data) and self._last_src == file_path
+                and self._last_mtime == st.st_mtime and self._last_size == st.st_size)
+
+    def load_recon_direct(self, include_weights: bool = True, force: bool = True):
+        """
+        Load required cells from the latest sheet of the recon workbook.
+
+        Args:
+            include_weights: Also reload Weights.xlsx afterwards. The refresh
+                orchestrator passes False and parses weights in parallel.
+            force: Re-read even if the workbook signature is unchanged
+
+        Returns:
+            (ok, message)
+        """
+        self._begin_load("recon")
+        res = self._load_recon_direct(include_weights, force)
+        self._set_ready("recon", res[0])
+        return res
 
-    def load_recon_direct(self):
+    def _load_recon_direct(self, include_weights: bool, force: bool):
         try:
             file_path, msg = self.resolve_latest_path()
             if not file_path:
                 return False, msg
 
+            if not force and self.recon_unchanged(file_path):
+                METRICS.inc("excel.recon.unchanged")
+                if include_weights:
+                    self.load_weights_file()
+                return True, f"{self.current_year_loaded} / {self.current_filename}"
+
+            src_stat = None
             try:
-                st = file_path.stat()
-                self._last_src = file_path
-                self._last_mtime = st.st_mtime
-                self._last_size = st.st_size
+                src_stat = file_path.stat()
             except Exception:
                 pass
 
-            wb = None
-            try:
-                wb = load_workbook(file_path, data_only=True, read_only=True)
-            except Exception:
-                temp_path = copy_to_cache_fast(file_path)
-                wb = load_workbook(temp_path, data_only=True, read_only=True)
+            # Only the latest and previous sheets are read
+            wb = load_workbook_shared(file_path, select=lambda names: names[-2:])
+            t_extract = time.perf_counter()
 
             sheet_name = wb.sheetnames[-1]
             ws = wb[sheet_name]
 
-            recon = {}
-            for (r, c) in REQUIRED_CELLS:
-                recon[(r, c)] = ws.cell(row=r, column=c).value
+            from config import SWEDBANK_CONTRIBUTION_CELLS
+            cm_coords = {key: coordinate_to_tuple(ref) for key, ref in EXCEL_CM_RATES_MAPPING.items()}
+            contrib_coords = {tenor: (coordinate_to_tuple(cells["Z"]), coordinate_to_tuple(cells["AA"]))
+                              for tenor, cells in SWEDBANK_CONTRIBUTION_CELLS.items()}
+            values = read_cells(ws, required_cells() | set(cm_coords.values())
+                                | {rc for pair in contrib_coords.values() for rc in pair})
+
+            recon = {rc: values[rc] for rc in required_cells()}
 
             # Read Excel CM rates (EUR and USD)
-            cm_rates = {}
-            for key, cell_ref in EXCEL_CM_RATES_MAPPING.items():
-                val = ws[cell_ref].value
-                cm_rates[key] = safe_float(val, None)
+            cm_rates = {key: safe_float(values[rc], None) for key, rc in cm_coords.items()}
 
             # Extract Swedbank contribution data from latest sheet
-            from config import SWEDBANK_CONTRIBUTION_CELLS
             swedbank_contrib = {}
-            for tenor, cells in SWEDBANK_CONTRIBUTION_CELLS.items():
+            for tenor, (z, aa) in contrib_coords.items():
                 swedbank_contrib[tenor] = {
-                    "Z": safe_float(ws[cells["Z"]].value, None),
-                    "AA": safe_float(ws[cells["AA"]].value, None)
+                    "Z": safe_float(values[z], None),
+                    "AA": safe_float(values[aa], None)
                 }
 
             # Extract Swedbank contribution from second-to-last sheet for change calculation
@@ -225,11 +480,11 @@ class ExcelEngine:
             if len(wb.sheetnames) >= 2:
                 # Read second-to-last sheet
                 prev_sheet_name = wb.sheetnames[-2]
-                ws_prev = wb[prev_sheet_name]
+                prev_values = read_cells(wb[prev_sheet_name], {rc for pair in contrib_coords.values() for rc in pair})
 
-                for tenor, cells in SWEDBANK_CONTRIBUTION_CELLS.items():
-                    prev_z = safe_float(ws_prev[cells["Z"]].value, None)
-                    prev_aa = safe_float(ws_prev[cells["AA"]].value, None)
+                for tenor, (z, aa) in contrib_coords.items():
+                    prev_z = safe_float(prev_values[z], None)
+                    prev_aa = safe_float(prev_values[aa], None)
 
                     swedbank_contrib_prev[tenor] = {
                         "Z": prev_z,
@@ -253,6 +508,7 @@ class ExcelEngine:
                     }
 
             wb.close()
+            METRICS.observe("excel.cell_extract", (time.perf_counter() - t_extract) * 1000.0)
 
             self.recon_data = recon
             self.excel_cm_rates = cm_rates
@@ -261,44 +517,52 @@ class ExcelEngine:
             self.swedbank_contribution_change = swedbank_change
             self.last_loaded_ts = datetime.now()
 
-            self.load_weights_file()
+            if src_stat is not None:
+                self._last_src = file_path
+                self._last_mtime = src_stat.st_mtime
+                self._last_size = src_stat.st_size
+
+            if include_weights:
+                self.load_weights_file()
 
             return True, f"{self.current_year_loaded} / {self.current_filename}"
         except Exception as e:
             return False, str(e)
 
-    def get_days_for_date(self, date_str):
-        if self.day_data.empty or "date" not in self.day_data.columns:
+    def get_days_for_date(self, date_str, timeout: float | None = 0):
+        """
+        Day counts per tenor for a date, or None.
+
+        Args:
+            date_str: Date (str/date/datetime)
+            timeout: Seconds to wait for the day calendar (None = until loaded,
+                0 = don't wait; use 0 on the Tk thread and ready("days") to retry)
+        """
+        if timeout != 0 and not self.wait_ready("days", timeout):
             return None
-        try:
-            target_date = pd.to_datetime(date_str)
-            target_date = target_date.normalize()
-
-            row = self.day_data[self.day_data["date"] == target_date]
-            if not row.empty:
-                r = row.iloc[0]
-                return {
-                    "1w": r.get("1w_Days", "-"),
-                    "1m": r.get("1m_Days", "-"),
-                    "2m": r.get("2m_Days", "-"),
-                    "3m": r.get("3m_Days", "-"),
-                    "6m": r.get("6m_Days", "-"),
-                }
-        except Exception:
+        target = to_date(date_str)
+        r = self._days_by_date.get(target) if target else None
+        if r is None:
             return None
-        return None
+        return {
+            "1w": r.get("1w_Days", "-"),
+            "1m": r.get("1m_Days", "-"),
+            "2m": r.get("2m_Days", "-"),
+            "3m": r.get("3m_Days", "-"),
+            "6m": r.get("6m_Days", "-"),
+        }
 
     def get_future_days_data(self, limit_rows=300):
-        if self.day_data.empty or "date" not in self.day_data.columns:
+        import pandas as pd
+
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        rows = [r for r in self.day_rows if r["date"] >= today][:limit_rows]
+        if not rows:
             return pd.DataFrame()
-        today = pd.Timestamp(datetime.now().date()).normalize()
-        future_df = self.day_data[self.day_data["date"] >= today].copy()
+        future_df = pd.DataFrame(rows)
         for c in ["date", "settlement"]:
             if c in future_df.columns:
                 future_df[c] = pd.to_datetime(future_df[c], errors="coerce").dt.strftime("%Y-%m-%d")
-        future_df = future_df.reset_index(drop=True)
-        if len(future_df) > limit_rows:
-            future_df = future_df.iloc[:limit_rows].copy()
         return future_df
 
     def get_recon_value(self, cell_ref):
@@ -319,7 +583,8 @@ class HistoricalDataManager:
         self.excel_engine = excel_engine
         self.snapshot_engine = snapshot_engine
 
-    def identify_sheet_date(self, sheet_name: str) -> str | None:
+    @staticmethod
+    def identify_sheet_date(sheet_name: str) -> str | None:
         """
         Extract date from sheet name.
         Patterns: "2025-01-13", "13-01-2025", "13.01.2025", etc.
@@ -493,6 +758,7 @@ def _load_mock_defaults_from_excel() -> dict:
         return fallback
 
     try:
+        import pandas as pd
         df = pd.read_excel(defaults_file, header=1)
         df.columns = ["TENOR", "EURNOK_SPOT", "EURNOK_PIPS", "USDNOK_SPOT",
                       "USDNOK_PIPS", "DAYS", "EUR_CM", "USD_CM", "NOK_CM"]
@@ -546,416 +812,297 @@ def _load_mock_defaults_from_excel() -> dict:
         return fallback
 
 
+def _record_fetch_metrics(meta: dict):
+    """Fetch latency and cache/missing counts from a snapshot meta dict."""
+    if meta.get("from_cache"):
+        METRICS.inc("market.fetch.cache_hits")
+        return
+    METRICS.observe("market.fetch", float(meta.get("duration_ms") or 0))
+    METRICS.inc("market.fetch.requests")
+    METRICS.set_gauge("market.fetch.missing", len(meta.get("missing") or []))
+
+
+def create_mock_market_api(profile: str = "lan", seed: int = 0):
+    """mock_market service seeded with the Implied_NOK_Defaults prices, for BloombergEngine(api=...)."""
+    from mock_market import create_mock_api
+    return create_mock_api(seed=seed, profile=profile, base_prices=_load_mock_defaults_from_excel(), strict=True)
+
+
+def create_replay_provider(start: str, end: str | None = None, speed: float = 60.0,
+                           max_gap_sec: float | None = None, base_path: Path | None = None) -> ReplayProvider:
+    """ReplayProvider over the SnapshotEngine history (daily snapshots and intraday records), for BloombergEngine(provider=...)."""
+    from snapshot_engine import SnapshotEngine
+    return ReplayProvider.from_snapshots(SnapshotEngine(base_path), start, end, speed=speed, max_gap_sec=max_gap_sec)
+
+
 class BloombergEngine:
     """
-    Bloomberg ingestion engine with caching.
-    Automatically falls back to mock data if:
-    - blpapi is not installed (Linux/cloud environment)
-    - USE_MOCK_DATA is True in config
+    Market data engine with caching, over a pluggable provider (market_providers).
+
+    The engine owns the TTL cache, coalescing of identical in-flight
+    requests, meta dicts, metrics and the fetch thread; the provider only
+    answers one request. Results are published to `store` and handed out
+    as immutable MarketSnapshots (shared, never copied). Unless `provider` is given the source is picked as:
+    - `api` given (blpapi-compatible, e.g. mock_market.create_mock_api()): blpapi requests through it
+    - blpapi not installed, USE_MOCK_DATA or DEVELOPMENT_MODE: Implied_NOK_Defaults prices
+    - otherwise: blpapi
+
+    Replay a recorded day with provider=ReplayProvider.from_snapshots(...).
+
+    Every request has an overall deadline of `timeout_sec` (queueing behind
+    another fetch included). When it passes, the outstanding request is
+    cancelled and whatever arrived is delivered with the rest listed as
+    missing and meta["timed_out"] set; such partial results are not cached.
+    Partial results are delivered as detached snapshots and never become
+    store.latest(); a request still queued at its deadline (or cancelled
+    there) is answered with the last complete snapshot.
     """
 
-    def __init__(self, cache_ttl_sec: float = 3.0):
-        self._lock = threading.Lock()
-        self._session = None
-        self._service = None
-        self._is_ready = False
+    DEFAULT_FIELDS = ["PX_LAST", "CHG_NET_1D", "LAST_UPDATE"]
+    # Lock wait per turn while queued; bounds how late a cancel is noticed
+    QUEUE_POLL_SEC = 0.2
+
+    def __init__(self, cache_ttl_sec: float = 3.0, api=None, provider=None,
+                 timeout_sec: float = MARKET_FETCH_TIMEOUT_SEC):
+        self._lock = threading.Lock()          # one provider request at a time
+        self._state_lock = threading.Lock()    # cache and in-flight requests
         self._last_error = None
+        self.timeout_sec = float(timeout_sec)  # <= 0: no deadline
+        self.timeouts = 0
 
         self._cache_ttl_sec = float(cache_ttl_sec)
-        self._cache_data: dict = {}
+        self.store = MarketDataStore(keep=MARKET_HISTORY_VERSIONS)
+        self._cache_data = self.store.latest()
         self._cache_ts: float | None = None
-        self._cache_tickers: tuple[str, ...] | None = None
+        self._cache_key: tuple | None = None
         self._last_meta: dict = {}
-
-        # Determine if we should use mock mode
-        self._use_mock = (blpapi is None) or USE_MOCK_DATA or DEVELOPMENT_MODE
-
-        # Load mock prices from Excel file (used in mock mode)
-        self._mock_prices = _load_mock_defaults_from_excel() if self._use_mock else {}
-
-        # Only start Bloomberg session if not in mock mode
-        if blpapi and not self._use_mock:
-            self._start_session_async()
-
-    def _start_session_async(self):
-        def _starter():
-            try:
-                session_options = blpapi.SessionOptions()
-                session_options.setServerHost("localhost")
-                session_options.setServerPort(8194)
-                session = blpapi.Session(session_options)
-                if not session.start():
-                    self._last_error = "Session Start Failed"
-                    return
-                if not session.openService("//blp/refdata"):
-                    session.stop()
-                    self._last_error = "Service Open Failed"
-                    return
-                service = session.getService("//blp/refdata")
-                self._session = session
-                self._service = service
-                self._is_ready = True
-                self._last_error = None
-            except Exception as e:
-                self._last_error = str(e)
-        threading.Thread(target=_starter, daemon=True).start()
+        # request key -> [(callback, error_callback)] waiting on the running fetch
+        self._inflight: dict[tuple, list[tuple]] = {}
+        # Cancel tokens of requests that are queued or running
+        self._cancel_tokens: set[threading.Event] = set()
+
+        # The refresh market stage runs for an explicitly configured source, or
+        # whenever blpapi is importable (mock prices in USE_MOCK_DATA/DEVELOPMENT_MODE)
+        self._drives_refresh = provider is not None or api is not None or blpapi is not None
+        if provider is None:
+            if api is not None:
+                provider = BlpapiProvider(api)
+            elif blpapi is None or USE_MOCK_DATA or DEVELOPMENT_MODE:
+                provider = StaticDefaultsProvider(_load_mock_defaults_from_excel())
+            else:
+                provider = BlpapiProvider(blpapi)
+        self.provider = provider
+        self._use_mock = bool(provider.mock)
+
+        # Warm up (e.g. open the Bloomberg session in the background)
+        provider.start()
+
+    @property
+    def has_api(self) -> bool:
+        """True if the refresh market stage should run (blpapi installed, or a provider/api was given)."""
+        return self._drives_refresh
 
     def last_meta(self) -> dict:
         return dict(self._last_meta or {})
 
-    def _generate_mock_price(self, ticker: str) -> dict:
-        """Generate mock price data for a ticker from Excel defaults."""
-        # Use exact price from Excel file (no randomization for verification)
-        price = self._mock_prices.get(ticker, 1.0)
+    def cancel(self):
+        """Abort the queued and running provider requests; they are delivered as partial results."""
+        with self._state_lock:
+            for token in self._cancel_tokens:
+                token.set()
+
+    def _acquire(self, deadline: float | None, cancel: threading.Event) -> str | None:
+        """Wait for the provider lock; returns None once held, else "timeout" or "cancelled"."""
+        while True:
+            if cancel.is_set():
+                return "cancelled"
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return "timeout"
+            wait = self.QUEUE_POLL_SEC if remaining is None else min(self.QUEUE_POLL_SEC, remaining)
+            if self._lock.acquire(timeout=wait):
+                return None
+
+    def _meta(self, key: tuple, t0: float, t1: float, responded: int, missing: list[str], from_cache: bool,
+              version: int, request_id: str | None = None, incomplete: str | None = None) -> dict:
+        meta = {
+            "request_id": request_id or uuid.uuid4().hex[:10],
+            "requested_at": datetime.fromtimestamp(t0),
+            "received_at": datetime.fromtimestamp(t1),
+            "duration_ms": int(round((t1 - t0) * 1000)),
+            "from_cache": from_cache,
+            "requested_count": len(key[0]),
+            "responded_count": responded,
+            "missing": missing,
+            "source": self.provider.name,
+            "version": version,
+            "timed_out": incomplete == "timeout",
+            "cancelled": incomplete == "cancelled",
+            "timeouts": self.timeouts,
+        }
+        if self._use_mock:
+            meta["mock"] = True
+        return meta
 
-        # Generate realistic time string
-        now = datetime.now()
-        time_str = now.strftime("%H:%M:%S")
+    def fetch_snapshot(self, tickers: list[str], callback_func, error_callback, fields: list[str] | None = None):
+        """
+        Fetch a market snapshot in the background.
 
-        return {"price": float(price), "change": 0.0, "time": time_str}
+        Served from cache within cache_ttl_sec; a request identical to one
+        already running joins it instead of hitting the provider again.
 
-    def _fetch_mock_snapshot(self, tickers: list[str], callback_func, error_callback):
-        """Fetch mock market data snapshot (used when blpapi is unavailable or USE_MOCK_DATA=True)."""
+        Args:
+            tickers: Bloomberg ticker strings
+            callback_func: Called with (data_dict, meta_dict) on success
+            error_callback: Called with an error message on failure
+            fields: Bloomberg fields (default PX_LAST, CHG_NET_1D, LAST_UPDATE)
+        """
+        fields = list(fields or self.DEFAULT_FIELDS)
         tickers = [t for t in tickers if isinstance(t, str) and t.strip()]
         tickers_key = tuple(sorted(set(tickers)))
+        key = (tickers_key, tuple(fields))
 
         now = time.time()
-        # Check cache
-        if self._cache_ts is not None and self._cache_tickers == tickers_key:
-            age = now - float(self._cache_ts)
-            if age <= self._cache_ttl_sec:
-                meta = {
-                    "request_id": uuid.uuid4().hex[:10],
-                    "requested_at": datetime.fromtimestamp(now),
-                    "received_at": datetime.fromtimestamp(now),
-                    "duration_ms": 0,
-                    "from_cache": True,
-                    "requested_count": len(tickers_key),
-                    "responded_count": len(self._cache_data),
-                    "missing": [],
-                    "mock": True,
-                }
+        with self._state_lock:
+            if self._cache_ts is not None and self._cache_key == key and now - self._cache_ts <= self._cache_ttl_sec:
+                data = self._cache_data
+                meta = self._meta(key, now, now, len(data), [t for t in tickers_key if t not in data], True,
+                                  data.version)
                 self._last_meta = dict(meta)
-                callback_func(dict(self._cache_data), dict(meta))
+            elif key in self._inflight:
+                self._inflight[key].append((callback_func, error_callback))
+                METRICS.inc("market.fetch.coalesced")
                 return
+            else:
+                self._inflight[key] = [(callback_func, error_callback)]
+                data = None
 
-        def _worker():
-            with self._lock:
-                req_id = uuid.uuid4().hex[:10]
-                t0 = time.time()
-                requested_at = datetime.fromtimestamp(t0)
-
-                # Generate mock data for all tickers
-                res = {}
-                for ticker in tickers_key:
-                    res[ticker] = self._generate_mock_price(ticker)
-
-                # Simulate small network delay
-                time.sleep(0.05)
-
-                t1 = time.time()
-                received_at = datetime.fromtimestamp(t1)
-                duration_ms = int(round((t1 - t0) * 1000))
-
-                meta = {
-                    "request_id": req_id,
-                    "requested_at": requested_at,
-                    "received_at": received_at,
-                    "duration_ms": duration_ms,
-                    "from_cache": False,
-                    "requested_count": len(tickers_key),
-                    "responded_count": len(res),
-                    "missing": [],
-                    "mock": True,
-                }
-                self._last_meta = dict(meta)
-
-                self._cache_data = dict(res)
-                self._cache_ts = time.time()
-                self._cache_tickers = tickers_key
-
-                callback_func(res, meta)
-
-        threading.Thread(target=_worker, daemon=True).start()
-
-    def _ensure_ready_sync(self) -> tuple[bool, str | None]:
-        if not blpapi:
-            return False, "BLPAPI not installed"
-        if self._is_ready and self._session and self._service:
-            return True, None
-        try:
-            session_options = blpapi.SessionOptions()
-            session_options.setServerHost("localhost")
-            session_options.setServerPort(8194)
-            session = blpapi.Session(session_options)
-            if not session.start():
-                return False, "Session Start Failed"
-            if not session.openService("//blp/refdata"):
-                session.stop()
-                return False, "Service Open Failed"
-            self._session = session
-            self._service = session.getService("//blp/refdata")
-            self._is_ready = True
-            self._last_error = None
-            return True, None
-        except Exception as e:
-            return False, str(e)
-
-    def fetch_snapshot(self, tickers: list[str], callback_func, error_callback, fields: list[str] | None = None):
-        # Use mock data if blpapi is unavailable OR USE_MOCK_DATA is True
-        if self._use_mock:
-            self._fetch_mock_snapshot(tickers, callback_func, error_callback)
+        if data is not None:
+            _record_fetch_metrics(meta)
+            callback_func(data, dict(meta))
             return
 
-        fields = fields or ["PX_LAST", "CHG_NET_1D", "LAST_UPDATE"]
-        tickers = [t for t in tickers if isinstance(t, str) and t.strip()]
-        tickers_key = tuple(sorted(set(tickers)))
-
-        now = time.time()
-        if self._cache_ts is not None and self._cache_tickers == tickers_key:
-            age = now - float(self._cache_ts)
-            if age <= self._cache_ttl_sec:
-                meta = {
-                    "request_id": uuid.uuid4().hex[:10],
-                    "requested_at": datetime.fromtimestamp(now),
-                    "received_at": datetime.fromtimestamp(now),
-                    "duration_ms": 0,
-                    "from_cache": True,
-                    "requested_count": len(tickers_key),
-                    "responded_count": len(self._cache_data),
-                    "missing": sorted(list(set(tickers_key) - set(self._cache_data.keys()))),
-                }
+        deadline = time.monotonic() + self.timeout_sec if self.timeout_sec > 0 else None
+        threading.Thread(target=self._run_fetch, args=(key, deadline), daemon=True, name="BloombergFetch").start()
+
+    def _run_fetch(self, key: tuple, deadline: float | None):
+        tickers_key, fields = key
+        req_id = uuid.uuid4().hex[:10]
+        t0 = time.time()
+        res, err, incomplete, as_of = None, None, None, None
+        cancel = threading.Event()
+        with self._state_lock:
+            self._cancel_tokens.add(cancel)
+
+        # Stopped while still queued behind another fetch: nothing new to publish
+        queued = self._acquire(deadline, cancel)
+        if queued:
+            incomplete = queued
+        else:
+            try:
+                res = self.provider.fetch(tickers_key, list(fields), deadline=deadline, cancel=cancel)
+            except FetchIncomplete as e:
+                res, incomplete = e.partial, e.reason
+            except Exception as e:
+                err = str(e) or "Unknown Bloomberg error"
+            finally:
+                # Replay sources report which recorded moment they served
+                as_of = getattr(self.provider, "as_of", None)
+                self._lock.release()
+        t1 = time.time()
+
+        if incomplete == "timeout":
+            METRICS.inc("market.fetch.timeouts")
+        elif incomplete:
+            METRICS.inc("market.fetch.cancelled")
+        if incomplete:
+            received = 0 if queued else len(res)
+            print(f"[Bloomberg] Fetch {incomplete} after {(t1 - t0):.1f}s: {received}/{len(tickers_key)} tickers")
+
+        with self._state_lock:
+            self._cancel_tokens.discard(cancel)
+            waiters = self._inflight.pop(key, [])
+            if incomplete == "timeout":
+                self.timeouts += 1
+            if err is None:
+                # A queued request gets the last complete snapshot; partial results stay out of the store
+                res = self.store.latest() if queued else self.store.publish(res, record=not incomplete)
+                missing = [t for t in tickers_key if t not in res]
+                meta = self._meta(key, t0, t1, len(tickers_key) - len(missing), missing, False,
+                                  res.version, req_id, incomplete)
+                if as_of is not None:
+                    meta["as_of"] = as_of
                 self._last_meta = dict(meta)
-                callback_func(dict(self._cache_data), dict(meta))
-                return
-
-        def _worker():
-            with self._lock:
-                ok, err = self._ensure_ready_sync()
-                if not ok:
-                    self._last_error = err
-                    error_callback(err or "Unknown Bloomberg error")
-                    return
-
-                req_id = uuid.uuid4().hex[:10]
-                t0 = time.time()
-                requested_at = datetime.fromtimestamp(t0)
-
-                try:
-                    req = self._service.createRequest("ReferenceDataRequest")
-                    for t in tickers_key:
-                        req.getElement("securities").appendValue(t)
-                    for f in fields:
-                        req.getElement("fields").appendValue(f)
-
-                    self._session.sendRequest(req)
-
-                    res = {}
-                    responded = set()
-
-                    while True:
-                        ev = self._session.nextEvent(500)
-                        if ev.eventType() in (blpapi.Event.RESPONSE, blpapi.Event.PARTIAL_RESPONSE):
-                            for msg in ev:
-                                if not msg.hasElement("securityData"):
-                                    continue
-                                arr = msg.getElement("securityData")
-                                for i in range(arr.numValues()):
-                                    sec = arr.getValueAsElement(i)
-                                    t = sec.getElementAsString("security")
-                                    if sec.hasElement("securityError"):
-                                        continue
-                                    if not sec.hasElement("fieldData"):
-                                        continue
-                                    flds = sec.getElement("fieldData")
-
-                                    price = flds.getElementAsFloat("PX_LAST") if flds.hasElement("PX_LAST") else 0.0
-                                    change = flds.getElementAsFloat("CHG_NET_1D") if flds.hasElement("CHG_NET_1D") else 0.0
-                                    time_str = flds.getElementAsString("LAST_UPDATE") if flds.hasElement("LAST_UPDATE") else ""
-
-                                    res[t] = {"price": float(price), "change": float(change), "time": str(time_str)}
-                                    responded.add(t)
-
-                            if ev.eventType() == blpapi.Event.RESPONSE:
-                                break
-                        elif ev.eventType() == blpapi.Event.TIMEOUT:
-                            continue
-
-                    t1 = time.time()
-                    received_at = datetime.fromtimestamp(t1)
-                    duration_ms = int(round((t1 - t0) * 1000))
-
-                    missing = sorted(list(set(tickers_key) - responded))
-
-                    meta = {
-                        "request_id": req_id,
-                        "requested_at": requested_at,
-                        "received_at": received_at,
-                        "duration_ms": duration_ms,
-                        "from_cache": False,
-                        "requested_count": len(tickers_key),
-                        "responded_count": len(responded),
-                        "missing": missing,
-                    }
-                    self._last_meta = dict(meta)
-
-                    self._cache_data = dict(res)
+                if not incomplete:
+                    self._cache_data = res
                     self._cache_ts = time.time()
-                    self._cache_tickers = tickers_key
+                    self._cache_key = key
 
-                    callback_func(res, meta)
-                except Exception as e:
-                    self._last_error = str(e)
-                    error_callback(str(e))
+        if err is not None:
+            self._last_error = err
+            METRICS.inc("market.fetch.errors")
+            for _, on_error in waiters:
+                self._deliver(on_error, err)
+            return
 
-        threading.Thread(target=_worker, daemon=True).start()
+        self._last_error = None
+        _record_fetch_metrics(meta)
+        for i, (on_data, _) in enumerate(waiters):
+            self._deliver(on_data, res, meta if i == 0 else dict(meta, coalesced=True))
 
+    @staticmethod
+    def _deliver(callback, *args):
+        # One failing subscriber must not starve the others sharing the fetch
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"[Bloomberg] Callback failed: {e}")
 
-class MockBloombergEngine:
+
+class MockBloombergEngine(BloombergEngine):
     """
     Mock Bloomberg engine for testing without a real Bloomberg connection.
-    Returns realistic random data for all tickers in MARKET_STRUCTURE.
+    Serves a seeded random walk around realistic prices for MARKET_STRUCTURE.
     """
 
-    def __init__(self, cache_ttl_sec: float = 3.0):
-        self._lock = threading.Lock()
-        self._is_ready = True
-        self._last_error = None
-        self._cache_ttl_sec = float(cache_ttl_sec)
-        self._cache_data: dict = {}
-        self._cache_ts: float | None = None
-        self._cache_tickers: tuple[str, ...] | None = None
-        self._last_meta: dict = {}
-
-        # Realistic base prices for different ticker types
-        self._base_prices = {
-            # Spot rates
-            "NOK F033 Curncy": 10.85,      # USDNOK around 10.85
-            "NKEU F033 Curncy": 11.75,     # EURNOK around 11.75
-
-            # USDNOK forwards (slightly higher than spot due to forward points)
-            "NK1W F033 Curncy": 10.852,
-            "NK1M F033 Curncy": 10.858,
-            "NK2M F033 Curncy": 10.865,
-            "NK3M F033 Curncy": 10.875,
-            "NK6M F033 Curncy": 10.905,
-
-            # EURNOK forwards
-            "NKEU1W F033 Curncy": 11.752,
-            "NKEU1M F033 Curncy": 11.758,
-            "NKEU2M F033 Curncy": 11.765,
-            "NKEU3M F033 Curncy": 11.775,
-            "NKEU6M F033 Curncy": 11.805,
-
-            # EUR CM curves (interest rates around 3-4%)
-            "EUCM1M SWET Curncy": 3.85,
-            "EUCM2M SWET Curncy": 3.78,
-            "EUCM3M SWET Curncy": 3.72,
-            "EUCM6M SWET Curncy": 3.55,
-
-            # USD CM curves (interest rates around 4-5%)
-            "USCM1M SWET Curncy": 4.85,
-            "USCM2M SWET Curncy": 4.78,
-            "USCM3M SWET Curncy": 4.72,
-            "USCM6M SWET Curncy": 4.55,
-
-            # NOK CM curves (NIBOR around 4-5%)
-            "NKCM1M SWET Curncy": 4.65,
-            "NKCM2M SWET Curncy": 4.58,
-            "NKCM3M SWET Curncy": 4.52,
-            "NKCM6M SWET Curncy": 4.35,
-        }
-
-    def last_meta(self) -> dict:
-        """Return metadata from the last fetch operation."""
-        return dict(self._last_meta or {})
-
-    def _generate_mock_price(self, ticker: str) -> dict:
-        """Generate realistic mock price data for a ticker."""
-        import random
-
-        base = self._base_prices.get(ticker, 1.0)
-        # Add small random variation (±0.5%)
-        variation = base * random.uniform(-0.005, 0.005)
-        price = round(base + variation, 4)
+    # Realistic base prices for different ticker types
+    BASE_PRICES = {
+        # Spot rates
+        "NOK F033 Curncy": 10.85,      # USDNOK around 10.85
+        "NKEU F033 Curncy": 11.75,     # EURNOK around 11.75
 
-        # Random daily change (±0.3%)
-        change = round(price * random.uniform(-0.003, 0.003), 4)
+        # USDNOK forwards (slightly higher than spot due to forward points)
+        "NK1W F033 Curncy": 10.852,
+        "NK1M F033 Curncy": 10.858,
+        "NK2M F033 Curncy": 10.865,
+        "NK3M F033 Curncy": 10.875,
+        "NK6M F033 Curncy": 10.905,
 
-        # Generate realistic time string
-        now = datetime.now()
-        time_str = now.strftime("%H:%M:%S")
-
-        return {"price": price, "change": change, "time": time_str}
-
-    def fetch_snapshot(self, tickers: list[str], callback_func, error_callback, fields: list[str] | None = None):
-        """
-        Fetch mock market data snapshot for given tickers.
-
-        Args:
-            tickers: List of Bloomberg ticker strings
-            callback_func: Function to call with (data_dict, meta_dict) on success
-            error_callback: Function to call with error message on failure
-            fields: Optional list of fields (ignored in mock, always returns price/change/time)
-        """
-        tickers = [t for t in tickers if isinstance(t, str) and t.strip()]
-        tickers_key = tuple(sorted(set(tickers)))
-
-        now = time.time()
-        # Check cache
-        if self._cache_ts is not None and self._cache_tickers == tickers_key:
-            age = now - float(self._cache_ts)
-            if age <= self._cache_ttl_sec:
-                meta = {
-                    "request_id": uuid.uuid4().hex[:10],
-                    "requested_at": datetime.fromtimestamp(now),
-                    "received_at": datetime.fromtimestamp(now),
-                    "duration_ms": 0,
-                    "from_cache": True,
-                    "requested_count": len(tickers_key),
-                    "responded_count": len(self._cache_data),
-                    "missing": [],
-                    "mock": True,
-                }
-                self._last_meta = dict(meta)
-                callback_func(dict(self._cache_data), dict(meta))
-                return
-
-        def _worker():
-            with self._lock:
-                req_id = uuid.uuid4().hex[:10]
-                t0 = time.time()
-                requested_at = datetime.fromtimestamp(t0)
-
-                # Generate mock data for all tickers
-                res = {}
-                for ticker in tickers_key:
-                    res[ticker] = self._generate_mock_price(ticker)
-
-                # Simulate small network delay
-                time.sleep(0.05)
-
-                t1 = time.time()
-                received_at = datetime.fromtimestamp(t1)
-                duration_ms = int(round((t1 - t0) * 1000))
-
-                meta = {
-                    "request_id": req_id,
-                    "requested_at": requested_at,
-                    "received_at": received_at,
-                    "duration_ms": duration_ms,
-                    "from_cache": False,
-                    "requested_count": len(tickers_key),
-                    "responded_count": len(res),
-                    "missing": [],
-                    "mock": True,
-                }
-                self._last_meta = dict(meta)
-
-                self._cache_data = dict(res)
-                self._cache_ts = time.time()
-                self._cache_tickers = tickers_key
-
-                callback_func(res, meta)
+        # EURNOK forwards
+        "NKEU1W F033 Curncy": 11.752,
+        "NKEU1M F033 Curncy": 11.758,
+        "NKEU2M F033 Curncy": 11.765,
+        "NKEU3M F033 Curncy": 11.775,
+        "NKEU6M F033 Curncy": 11.805,
+
+        # EUR CM curves (interest rates around 3-4%)
+        "EUCM1M SWET Curncy": 3.85,
+        "EUCM2M SWET Curncy": 3.78,
+        "EUCM3M SWET Curncy": 3.72,
+        "EUCM6M SWET Curncy": 3.55,
+
+        # USD CM curves (interest rates around 4-5%)
+        "USCM1M SWET Curncy": 4.85,
+        "USCM2M SWET Curncy": 4.78,
+        "USCM3M SWET Curncy": 4.72,
+        "USCM6M SWET Curncy": 4.55,
+
+        # NOK CM curves (NIBOR around 4-5%)
+        "NKCM1M SWET Curncy": 4.65,
+        "NKCM2M SWET Curncy": 4.58,
+        "NKCM3M SWET Curncy": 4.52,
+        "NKCM6M SWET Curncy": 4.35,
+    }
 
-        threading.Thread(target=_worker, daemon=True).start()
+    def __init__(self, cache_ttl_sec: float = 3.0, seed: int | None = None):
+        super().__init__(cache_ttl_sec=cache_ttl_sec, provider=RandomWalkProvider(self.BASE_PRICES, seed=seed))
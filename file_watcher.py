@@ -0,0 +1,129 @@
+"""
+Source file watcher for Onyx Terminal.
+Detects saves of the recon, weights and day-count workbooks and reports
+which source groups changed once the files have settled.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+
+# inotify optional (Linux only); polling is used everywhere else
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+    inotify_flags = None
+
+
+def file_signature(path: Path) -> tuple | None:
+    """(mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+class FileWatcher:
+    """
+    Watches groups of files and calls on_change(set_of_group_names).
+
+    A group is reported once all its changed files have kept the same
+    signature for `debounce` seconds, so the burst of writes while Excel
+    saves (temp file, rename, metadata touch) triggers a single reload.
+    on_change runs on the watcher thread.
+    """
+
+    def __init__(self, groups: dict[str, list], on_change, interval: float = 1.0,
+                 debounce: float = 2.0, use_inotify: bool = True):
+        self.groups = {name: [Path(p) for p in paths] for name, paths in groups.items()}
+        self.on_change = on_change
+        self.interval = float(interval)
+        self.debounce = float(debounce)
+
+        self._signatures = {p: file_signature(p) for paths in self.groups.values() for p in paths}
+        # path -> (pending signature, monotonic time it was first seen)
+        self._pending: dict[Path, tuple] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._inotify = None
+        if use_inotify and INotify is not None:
+            try:
+                self._inotify = INotify()
+                mask = inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.CREATE
+                for parent in {p.parent for p in self._signatures}:
+                    if parent.exists():
+                        self._inotify.add_watch(str(parent), mask)
+            except Exception as e:
+                print(f"[Watcher] inotify unavailable, polling instead: {e}")
+                self._inotify = None
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify is not None else "poll"
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name="FileWatcher")
+        self._thread.start()
+        print(f"[Watcher] Watching {len(self._signatures)} files ({self.backend})")
+
+    def stop(self):
+        self._stop.set()
+
+    def _wait(self, timeout: float):
+        """Sleep until the next check; with inotify wake up early on directory events."""
+        if self._inotify is None:
+            self._stop.wait(timeout)
+            return
+        try:
+            self._inotify.read(timeout=int(timeout * 1000))
+        except Exception:
+            self._stop.wait(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Poll faster while a change is settling
+            self._wait(min(self.interval, self.debounce / 2) if self._pending else self.interval)
+            try:
+                changed = self.check()
+            except Exception as e:
+                print(f"[Watcher] Check failed: {e}")
+                continue
+            if changed:
+                try:
+                    self.on_change(changed)
+                except Exception as e:
+                    print(f"[Watcher] on_change failed: {e}")
+
+    def check(self) -> set[str]:
+        """
+        Compare signatures once.
+
+        Returns:
+            Names of groups with settled changes
+        """
+        now = time.monotonic()
+        settled = set()
+
+        for path, known in self._signatures.items():
+            sig = file_signature(path)
+            if sig == known:
+                self._pending.pop(path, None)
+                continue
+
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != sig:
+                # New or still-moving change; restart the debounce window
+                self._pending[path] = (sig, now)
+                continue
+
+            if now - pending[1] >= self.debounce:
+                self._signatures[path] = sig
+                del self._pending[path]
+                settled.add(path)
+
+        return {name for name, paths in self.groups.items() if any(p in settled for p in paths)}
@@ -0,0 +1,324 @@
+"""
+Funding Model for Onyx Terminal.
+Computes implied NOK yields and funding rates once per data version,
+shared by NokImpliedPage and DashboardPage.
+"""
+import threading
+
+from calculations import calc_implied_yield, calc_funding_rate
+from config import FUNDING_SPREADS
+from dependency_graph import DependencyGraph
+from utils import safe_float
+
+DEFAULT_WEIGHTS = {"USD": 0.45, "EUR": 0.05, "NOK": 0.50}
+
+FUNDING_TENORS = ["1w", "1m", "2m", "3m", "6m"]
+
+# Tenor configuration (Bloomberg tickers + Excel CM keys)
+IMPLIED_TENORS = [
+    {"tenor": "1M", "key": "1m",
+     "usd_fwd": "NK1M F033 Curncy", "usd_rate_bbg": "USCM1M SWET Curncy", "usd_days_bbg": "NK1M TPSF Curncy",
+     "eur_fwd": "NKEU1M F033 Curncy", "eur_rate_bbg": "EUCM1M SWET Curncy", "eur_days_bbg": "EURNOK1M TPSF Curncy",
+     "nok_cm": "NKCM1M SWET Curncy", "usd_rate_exc": "USD_1M", "eur_rate_exc": "EUR_1M"},
+    {"tenor": "2M", "key": "2m",
+     "usd_fwd": "NK2M F033 Curncy", "usd_rate_bbg": "USCM2M SWET Curncy", "usd_days_bbg": "NK2M TPSF Curncy",
+     "eur_fwd": "NKEU2M F033 Curncy", "eur_rate_bbg": "EUCM2M SWET Curncy", "eur_days_bbg": "EURNOK2M TPSF Curncy",
+     "nok_cm": "NKCM2M SWET Curncy", "usd_rate_exc": "USD_2M", "eur_rate_exc": "EUR_2M"},
+    {"tenor": "3M", "key": "3m",
+     "usd_fwd": "NK3M F033 Curncy", "usd_rate_bbg": "USCM3M SWET Curncy", "usd_days_bbg": "NK3M TPSF Curncy",
+     "eur_fwd": "NKEU3M F033 Curncy", "eur_rate_bbg": "EUCM3M SWET Curncy", "eur_days_bbg": "EURNOK3M TPSF Curncy",
+     "nok_cm": "NKCM3M SWET Curncy", "usd_rate_exc": "USD_3M", "eur_rate_exc": "EUR_3M"},
+    {"tenor": "6M", "key": "6m",
+     "usd_fwd": "NK6M F033 Curncy", "usd_rate_bbg": "USCM6M SWET Curncy", "usd_days_bbg": "NK6M TPSF Curncy",
+     "eur_fwd": "NKEU6M F033 Curncy", "eur_rate_bbg": "EUCM6M SWET Curncy", "eur_days_bbg": "EURNOK6M TPSF Curncy",
+     "nok_cm": "NKCM6M SWET Curncy", "usd_rate_exc": "USD_6M", "eur_rate_exc": "EUR_6M"},
+]
+
+FALLBACK_BBG_DAYS = {"1m": 30, "2m": 58, "3m": 90, "6m": 181}
+
+
+def resolve_weights(excel_engine, as_of=None) -> dict:
+    """
+    Get weights from Excel engine or use defaults.
+
+    Args:
+        excel_engine: ExcelEngine with Weights.xlsx loaded
+        as_of: Optional date; uses the weights in force on that date from the
+            engine's weights history when available
+    """
+    weights = dict(DEFAULT_WEIGHTS)
+    if excel_engine is not None and as_of is not None:
+        hist = excel_engine.get_weights_for_date(as_of)
+        if hist:
+            weights.update({k: hist[k] for k in ("USD", "EUR", "NOK")})
+            return weights
+    if excel_engine is not None and excel_engine.weights_ok:
+        parsed = excel_engine.weights_cells_parsed
+        if parsed.get("USD") is not None:
+            weights["USD"] = parsed["USD"]
+        if parsed.get("EUR") is not None:
+            weights["EUR"] = parsed["EUR"]
+        if parsed.get("NOK") is not None:
+            weights["NOK"] = parsed["NOK"]
+    return weights
+
+
+def compute_implied(market_data: dict, excel_cm_rates: dict, days_data: dict) -> dict:
+    """
+    Compute implied NOK yields per tenor for both sections.
+
+    Section 1 uses Bloomberg CM rates with pips scaled to Excel days,
+    section 2 uses Excel CM rates with Bloomberg days and pips.
+
+    Returns:
+        Dict with "implied_rows" (per tenor, both sections) and "impl_calc_data"
+    """
+    market_data = market_data or {}
+    excel_cm_rates = excel_cm_rates or {}
+    days_data = days_data or {}
+
+    def ticker_val(ticker):
+        inf = market_data.get(ticker)
+        if inf:
+            return float(inf.get("price", 0.0))
+        return None
+
+    def pips_of(fwd_ticker, spot_ticker):
+        fwd = ticker_val(fwd_ticker)
+        spot = ticker_val(spot_ticker)
+        if fwd is not None and spot is not None:
+            return (fwd - spot) * 10000
+        return None
+
+    usd_spot = ticker_val("NOK F033 Curncy")
+    eur_spot = ticker_val("NKEU F033 Curncy")
+
+    implied_rows = []
+    impl_calc_data = {}
+
+    for t in IMPLIED_TENORS:
+        # Bloomberg days
+        bbg_days_usd = ticker_val(t["usd_days_bbg"])
+        if bbg_days_usd is None:
+            bbg_days_usd = FALLBACK_BBG_DAYS.get(t["key"])
+
+        bbg_days_eur = ticker_val(t["eur_days_bbg"])
+        if bbg_days_eur is None:
+            bbg_days_eur = FALLBACK_BBG_DAYS.get(t["key"])
+
+        # Excel days
+        excel_days = safe_float(days_data.get(f"{t['key']}_Days"), None)
+        if excel_days is None:
+            excel_days = safe_float(days_data.get(t["key"]), None)
+        if excel_days is None:
+            excel_days = bbg_days_usd
+
+        # Bloomberg pips
+        pips_bbg_usd = pips_of(t["usd_fwd"], "NOK F033 Curncy")
+        pips_bbg_eur = pips_of(t["eur_fwd"], "NKEU F033 Curncy")
+
+        # NOK CM (same for both sections)
+        nok_cm = ticker_val(t["nok_cm"]) if t["nok_cm"] else None
+
+        # ============ SECTION 1: Bloomberg CM + Excel Days ============
+        # Adjust pips for Excel days
+        pips_exc_usd = None
+        if pips_bbg_usd is not None and bbg_days_usd and excel_days:
+            pips_exc_usd = (pips_bbg_usd / bbg_days_usd) * excel_days
+
+        usd_rate_bbg = ticker_val(t["usd_rate_bbg"]) if t["usd_rate_bbg"] else None
+        impl_usd_bbg = calc_implied_yield(usd_spot, pips_exc_usd, usd_rate_bbg, excel_days) if excel_days else None
+
+        pips_exc_eur = None
+        if pips_bbg_eur is not None and bbg_days_eur and excel_days:
+            pips_exc_eur = (pips_bbg_eur / bbg_days_eur) * excel_days
+
+        eur_rate_bbg = ticker_val(t["eur_rate_bbg"]) if t["eur_rate_bbg"] else None
+        impl_eur_bbg = calc_implied_yield(eur_spot, pips_exc_eur, eur_rate_bbg, excel_days) if excel_days else None
+
+        # ============ SECTION 2: Excel CM + Bloomberg Days ============
+        # Use Bloomberg days and pips directly (no adjustment)
+        usd_rate_exc = excel_cm_rates.get(t["usd_rate_exc"])
+        eur_rate_exc = excel_cm_rates.get(t["eur_rate_exc"])
+
+        impl_usd_exc = calc_implied_yield(usd_spot, pips_bbg_usd, usd_rate_exc, bbg_days_usd) if bbg_days_usd else None
+        impl_eur_exc = calc_implied_yield(eur_spot, pips_bbg_eur, eur_rate_exc, bbg_days_eur) if bbg_days_eur else None
+
+        implied_rows.append({
+            "tenor": t["tenor"], "key": t["key"], "nok_cm": nok_cm,
+            "bbg_days_usd": bbg_days_usd, "bbg_days_eur": bbg_days_eur, "excel_days": excel_days,
+            "pips_bbg_usd": pips_bbg_usd, "pips_bbg_eur": pips_bbg_eur,
+            "pips_exc_usd": pips_exc_usd, "pips_exc_eur": pips_exc_eur,
+            "usd_rate_bbg": usd_rate_bbg, "eur_rate_bbg": eur_rate_bbg,
+            "impl_usd_bbg": impl_usd_bbg, "impl_eur_bbg": impl_eur_bbg,
+            "usd_rate_exc": usd_rate_exc, "eur_rate_exc": eur_rate_exc,
+            "impl_usd_exc": impl_usd_exc, "impl_eur_exc": impl_eur_exc,
+        })
+
+        impl_calc_data[f"usd_{t['key']}"] = {
+            'implied': impl_usd_bbg, 'spot': usd_spot, 'pips': pips_exc_usd,
+            'rate': usd_rate_bbg, 'days': excel_days, 'nok_cm': nok_cm
+        }
+        impl_calc_data[f"eur_{t['key']}"] = {
+            'implied': impl_eur_bbg, 'spot': eur_spot, 'pips': pips_exc_eur,
+            'rate': eur_rate_bbg, 'days': excel_days, 'nok_cm': nok_cm
+        }
+
+    return {"implied_rows": implied_rows, "impl_calc_data": impl_calc_data}
+
+
+def compute_funding(implied: dict, weights: dict, contribution_change: dict) -> dict:
+    """
+    Compute weighted funding rates and final rates (incl. FUNDING_SPREADS).
+
+    Returns:
+        Dict tenor -> breakdown dict (also used by the dashboard popup)
+    """
+    impl_calc_data = (implied or {}).get("impl_calc_data", {})
+    contribution_change = contribution_change or {}
+
+    funding = {}
+    for tenor_key in FUNDING_TENORS:
+        eur_data = impl_calc_data.get(f"eur_{tenor_key}", {})
+        usd_data = impl_calc_data.get(f"usd_{tenor_key}", {})
+
+        eur_impl = eur_data.get('implied')
+        usd_impl = usd_data.get('implied')
+        nok_cm = eur_data.get('nok_cm')  # Same for both USD and EUR
+
+        funding_rate = None
+        if all(x is not None for x in [eur_impl, usd_impl, nok_cm]):
+            funding_rate = calc_funding_rate(eur_impl, usd_impl, nok_cm, weights)
+
+        spread = FUNDING_SPREADS.get(tenor_key, 0.20)
+        final_rate = funding_rate + spread if funding_rate is not None else None
+
+        # Change between latest and second-to-last sheet (Z cell)
+        change_val = (contribution_change.get(tenor_key.upper()) or {}).get("Z")
+
+        funding[tenor_key] = {
+            'eur_impl': eur_impl, 'usd_impl': usd_impl, 'nok_cm': nok_cm,
+            'eur_spot': eur_data.get('spot'), 'eur_pips': eur_data.get('pips'),
+            'eur_rate': eur_data.get('rate'), 'eur_days': eur_data.get('days'),
+            'usd_spot': usd_data.get('spot'), 'usd_pips': usd_data.get('pips'),
+            'usd_rate': usd_data.get('rate'), 'usd_days': usd_data.get('days'),
+            'weights': weights, 'funding_rate': funding_rate,
+            'spread': spread, 'final_rate': final_rate, 'change': change_val
+        }
+
+    return funding
+
+
+def build_funding_graph() -> DependencyGraph:
+    """Funding graph: implied yields depend on market/excel/days, funding on implied + weights."""
+    g = DependencyGraph()
+    for name in ("market_data", "excel_cm_rates", "days_data", "weights", "contribution_change"):
+        g.add_input(name)
+    g.add_node("implied", compute_implied, ["market_data", "excel_cm_rates", "days_data"])
+    g.add_node("funding", compute_funding, ["implied", "weights", "contribution_change"])
+    return g
+
+
+class FundingModel:
+    """
+    Memoized funding model keyed on data version.
+
+    The version is (market snapshot id, excel load ts, weights ts, days).
+    Each component versions one graph input, so e.g. a new weights file only
+    recomputes the funding node and reuses the implied yields.
+    compute_async() runs the math on a worker thread; the result callback
+    is invoked from that thread, so GUI callers marshal it with after().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._graph = build_funding_graph()
+        self._eval_lock = threading.Lock()
+        self._version: tuple | None = None
+        self._result: dict | None = None
+        self._pending_version: tuple | None = None
+
+    @staticmethod
+    def market_version(bbg_meta: dict):
+        """Market snapshot version (request id if meta has none); unchanged on cache hits."""
+        meta = bbg_meta or {}
+        return meta.get("version") or meta.get("request_id")
+
+    @staticmethod
+    def data_version(bbg_meta: dict, excel_engine, days_data: dict) -> tuple:
+        return (
+            FundingModel.market_version(bbg_meta),
+            excel_engine.last_loaded_ts if excel_engine is not None else None,
+            excel_engine.weights_last_loaded_ts if excel_engine is not None else None,
+            tuple(sorted((str(k), str(v)) for k, v in (days_data or {}).items())),
+        )
+
+    def current(self) -> dict | None:
+        return self._result
+
+    def is_current(self, version: tuple) -> bool:
+        return self._version == version and self._result is not None
+
+    def timings(self) -> dict:
+        return self._graph.timings()
+
+    def _evaluate(self, version: tuple, inputs: dict, force: bool) -> dict:
+        market_id, excel_ts, weights_ts, days_key = version
+        g = self._graph
+        # force: fresh tokens so every node recomputes
+        tok = (lambda v: object()) if force else (lambda v: v)
+        g.set_input("market_data", inputs["market_data"], tok(market_id))
+        g.set_input("excel_cm_rates", inputs["excel_cm_rates"], tok(excel_ts))
+        g.set_input("contribution_change", inputs["contribution_change"], tok(excel_ts))
+        g.set_input("days_data", inputs["days_data"], tok(days_key))
+        g.set_input("weights", inputs["weights"], tok((weights_ts, tuple(sorted(inputs["weights"].items())))))
+        values = g.evaluate()
+
+        implied = values.get("implied") or {}
+        return {
+            "version": version,
+            "weights": dict(inputs["weights"]),
+            "implied_rows": implied.get("implied_rows", []),
+            "impl_calc_data": implied.get("impl_calc_data", {}),
+            "funding": values.get("funding") or {},
+        }
+
+    def compute_async(self, version: tuple, inputs: dict, callback, force: bool = False):
+        """
+        Compute the model for `version` unless it is already current or in flight.
+
+        Args:
+            version: Data version tuple from data_version()
+            inputs: Graph inputs market_data, excel_cm_rates, days_data, weights
+                and contribution_change (copied by caller)
+            callback: Called with the result dict once computed
+            force: Recompute even if version is unchanged
+        """
+        with self._lock:
+            if not force and (self._version == version and self._result is not None):
+                return False
+            if not force and self._pending_version == version:
+                return False
+            self._pending_version = version
+
+        def _worker():
+            try:
+                with self._eval_lock:
+                    result = self._evaluate(version, inputs, force)
+            except Exception as e:
+                print(f"[Funding] Evaluation failed: {e}")
+                with self._lock:
+                    if self._pending_version == version:
+                        self._pending_version = None
+                return
+            with self._lock:
+                # Drop stale results if a newer version was requested meanwhile
+                if self._pending_version != version:
+                    return
+                self._version = version
+                self._result = result
+                self._pending_version = None
+            callback(result)
+
+        threading.Thread(target=_worker, daemon=True, name="FundingWorker").start()
+        return True
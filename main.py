@@ -2,44 +2,58 @@
 Onyx Terminal - Main Application
 Treasury Suite for NIBOR validation and monitoring.
 """
+from profiling import STARTUP, IMPORT_PROFILER, SamplingProfiler, StallWatchdog
+
 import os
+import sys
 import threading
-import time
 from datetime import datetime
 from tkinter import messagebox
 
 import tkinter as tk
 
-from openpyxl.utils import coordinate_to_tuple
-
 from config import (
     APP_VERSION, THEME, CURRENT_MODE, set_mode,
     APP_DIR, DATA_DIR, BASE_HISTORY_PATH, STIBOR_GRSS_PATH,
     DAY_FILES, RECON_FILE, WEIGHTS_FILE, CACHE_DIR,
     EXCEL_LOGO_CANDIDATES, BBG_LOGO_CANDIDATES,
-    RULES_DB, RECON_MAPPING, DAYS_MAPPING, MARKET_STRUCTURE,
-    WEIGHTS_FILE_CELLS, WEIGHTS_MODEL_CELLS, SWET_CM_RECON_MAPPING,
-    ALL_REAL_TICKERS
+    MARKET_STRUCTURE, ALL_REAL_TICKERS,
+    WATCH_SOURCE_FILES, WATCH_POLL_SEC, WATCH_DEBOUNCE_SEC, PREWARM_PAGES, METRICS_JSON_FILE,
+    PROFILER_INTERVAL_MS, PROFILE_DIR, STALL_WATCHDOG, STALL_HEARTBEAT_MS, STALL_THRESHOLD_MS,
+    MOCK_MARKET_PROFILE, MOCK_MARKET_SEED, MARKET_REPLAY, MARKET_REPLAY_SPEED, MARKET_REPLAY_MAX_GAP_SEC,
+    RECORD_INTRADAY
 )
-from utils import (
-    fmt_ts, fmt_date, safe_float, to_date,
-    business_day_index_in_month, calendar_days_since_month_start,
-    LogoPipelineTK
+from metrics import METRICS
+from utils import fmt_ts, cleanup_copy_cache, LogoPipelineTK
+from engines import (
+    ExcelEngine, BloombergEngine, HistoricalDataManager, create_mock_market_api, create_replay_provider
 )
-from engines import ExcelEngine, BloombergEngine, HistoricalDataManager, blpapi
+from market_providers import BlpapiProvider
 from snapshot_engine import SnapshotEngine
+from funding_model import FundingModel, resolve_weights
+from recon_engine import ReconModel
+from refresh_pipeline import RefreshOrchestrator
+from report_engine import ReportEngine, write_text
+from file_watcher import FileWatcher
+from refresh_bus import (
+    RefreshBus, REFRESH_STARTED, EXCEL_LOADED, MARKET_LOADED, VALIDATED, FAILED, TERMINAL_EVENTS
+)
 from ui_components import style_ttk, NavButtonTK, SourceCardTK, MatchCriteriaPopup
 from ui_pages import (
     DashboardPage, ReconPage, RulesPage, BloombergPage,
-    NiborDaysPage, NokImpliedPage, NiborMetaDataPage
+    NiborDaysPage, NokImpliedPage, NiborMetaDataPage, DiagnosticsPage
 )
 
 
+STARTUP.mark("imports")
+
+
 class OnyxTerminalTK(tk.Tk):
     """Main application window for Onyx Terminal."""
 
     def __init__(self):
         super().__init__()
+        STARTUP.mark("tk root")
 
         set_mode("OFFICE")
 
@@ -51,10 +65,25 @@ class OnyxTerminalTK(tk.Tk):
         style_ttk(self)
 
         self.logo_pipeline = LogoPipelineTK()
-        self.engine = BloombergEngine(cache_ttl_sec=3.0)
+        self.engine = BloombergEngine(cache_ttl_sec=3.0, provider=self._market_provider())
+        threading.Thread(target=cleanup_copy_cache, daemon=True, name="CopyCacheCleanup").start()
         self.excel_engine = ExcelEngine()
         self.snapshot_engine = SnapshotEngine()
         self.historical_manager = HistoricalDataManager(self.excel_engine, self.snapshot_engine)
+        STARTUP.mark("engines")
+        self.funding_model = FundingModel()
+        self.recon_model = ReconModel()
+        self.recon_result = None
+        self._recon_final_status = False
+
+        # Refresh lifecycle events (started, excel_loaded, market_loaded, validated, failed)
+        self.refresh_bus = RefreshBus()
+        self.refresh_bus.subscribe(MARKET_LOADED, self._on_market_loaded)
+        # Buttons stay disabled until recon has validated the new data (or the refresh failed)
+        self.refresh_bus.subscribe(TERMINAL_EVENTS, lambda _event, _payload: self.set_busy(False))
+
+        self.refresh_orchestrator = RefreshOrchestrator(self.excel_engine, self.engine)
+        self.last_refresh_trace = None
 
         self.status_spot = True
         self.status_fwds = True
@@ -68,14 +97,23 @@ class OnyxTerminalTK(tk.Tk):
         self.recon_view_mode = "ALL"
 
         self.current_days_data = {}
+        self._days_wait_pending = False
+        # Source files changed during a refresh, reloaded when it ends
+        self._pending_sources: set[str] = set()
         self.cached_market_data: dict = {}
         self.cached_excel_data: dict = {}
         self.active_alerts: list[dict] = []
 
+        # Shared funding model result (read by NokImpliedPage and DashboardPage)
+        self.funding_result: dict | None = None
+        self.impl_calc_data: dict = {}
+        self.funding_calc_data: dict = {}
+
         self.bbg_last_ok_ts: datetime | None = None
         self.excel_last_ok_ts: datetime | None = None
         self.last_bbg_meta: dict = {}
         self.group_health: dict[str, str] = {}
+        self.market_health: dict[str, str] = {}
 
         # Criteria statistics for popup
         self.criteria_stats: dict = {
@@ -96,9 +134,34 @@ class OnyxTerminalTK(tk.Tk):
         self._update_btn_original_text: dict[int, str] = {}
 
         self.build_ui()
+        STARTUP.mark("build_ui")
+        self.after_idle(self._on_first_paint)
+
+        # Sampling profiler: created on first use, so it costs nothing unless toggled
+        self.sampling_profiler: SamplingProfiler | None = None
+        self.bind_all("<Control-P>", lambda _e: self.toggle_profiler())
+        if os.environ.get("ONYX_PROFILE") == "1" or "--profile" in sys.argv:
+            self.toggle_profiler()
+
+        # Logs event-loop stalls with the callback that blocked (see Diagnostics)
+        self.stall_watchdog = None
+        if STALL_WATCHDOG:
+            self.stall_watchdog = StallWatchdog(self, heartbeat_ms=STALL_HEARTBEAT_MS,
+                                                threshold_ms=STALL_THRESHOLD_MS)
+            self.stall_watchdog.start()
 
         self.after(250, self.refresh_data)
 
+        # Reload only the affected sources when a workbook is saved
+        self.file_watcher = None
+        if WATCH_SOURCE_FILES:
+            self.file_watcher = FileWatcher(
+                {"recon": [RECON_FILE], "weights": [WEIGHTS_FILE], "days": list(DAY_FILES)},
+                lambda names: self.after(0, self._on_sources_changed, names),
+                interval=WATCH_POLL_SEC, debounce=WATCH_DEBOUNCE_SEC
+            )
+            self.file_watcher.start()
+
     def build_ui(self):
         hpad = CURRENT_MODE["hpad"]
 
@@ -112,6 +175,10 @@ class OnyxTerminalTK(tk.Tk):
                                   font=("Segoe UI", CURRENT_MODE["title"], "bold"))
         self.lbl_title.pack(anchor="w")
 
+        self.lbl_refresh_trace = tk.Label(title_box, text="", fg=THEME["muted2"], bg=THEME["bg_main"],
+                                          font=("Segoe UI", CURRENT_MODE["small"]))
+        self.lbl_refresh_trace.pack(anchor="w")
+
         right_box = tk.Frame(self.header, bg=THEME["bg_main"])
         right_box.pack(side="right")
 
@@ -145,6 +212,7 @@ class OnyxTerminalTK(tk.Tk):
             ("rules", "Rules & Logic", RulesPage),
             ("bloomberg", "Bloomberg", BloombergPage),
             ("days", "Nibor Days", NiborDaysPage),
+            ("diagnostics", "Diagnostics", DiagnosticsPage),
         ]
 
         for key, label, _ in self.PAGES_CONFIG:
@@ -161,19 +229,92 @@ class OnyxTerminalTK(tk.Tk):
         self.content.grid_rowconfigure(0, weight=1)
         self.content.grid_columnconfigure(0, weight=1)
 
-        for key, _, page_class in self.PAGES_CONFIG:
-            page_instance = page_class(self.content, self)
-            self._pages[key] = page_instance
-            page_instance.grid(row=0, column=0, sticky="nsew")
-            page_instance.grid_remove()
+        # Pages are built on first show_page (or by the idle prewarm)
+        self._page_classes = {key: page_class for key, _, page_class in self.PAGES_CONFIG}
 
         if self.PAGES_CONFIG:
             self.show_page(self.PAGES_CONFIG[0][0])
 
+    @staticmethod
+    def _market_provider():
+        """
+        Market source override: replay of recorded days (MARKET_REPLAY / ONYX_REPLAY)
+        or the mock_market service (MOCK_MARKET_PROFILE); None lets the engine pick.
+        """
+        replay = os.environ.get("ONYX_REPLAY") or MARKET_REPLAY
+        if replay:
+            start, _, end = str(replay).partition(":")
+            try:
+                provider = create_replay_provider(start, end or None, speed=MARKET_REPLAY_SPEED,
+                                                  max_gap_sec=MARKET_REPLAY_MAX_GAP_SEC)
+                print(f"[Market] Replaying {replay} at {MARKET_REPLAY_SPEED:g}x")
+                return provider
+            except ValueError as e:
+                print(f"[Market] Replay unavailable: {e}")
+        if not MOCK_MARKET_PROFILE:
+            return None
+        print(f"[Market] Using mock market service (profile={MOCK_MARKET_PROFILE}, seed={MOCK_MARKET_SEED})")
+        return BlpapiProvider(create_mock_market_api(MOCK_MARKET_PROFILE, MOCK_MARKET_SEED))
+
+    def _get_page(self, key: str):
+        """Return the page for `key`, constructing it on first use."""
+        page = self._pages.get(key)
+        if page is None and key in self._page_classes:
+            with STARTUP.phase(f"page {key}"):
+                page = self._page_classes[key](self.content, self)
+                page.grid(row=0, column=0, sticky="nsew")
+                page.grid_remove()
+            self._pages[key] = page
+        return page
+
+    def _on_first_paint(self):
+        STARTUP.mark("first paint")
+        print(STARTUP.report())
+        if IMPORT_PROFILER is not None:
+            print(IMPORT_PROFILER.report())
+        if PREWARM_PAGES:
+            self.after(300, self._prewarm_next_page)
+
+    def _prewarm_next_page(self):
+        """Build one not-yet-visited page per idle slot so the UI stays responsive."""
+        for key in self._page_classes:
+            if key not in self._pages:
+                self._get_page(key)
+                self.after(50, lambda: self.after_idle(self._prewarm_next_page))
+                return
+
+    def toggle_profiler(self):
+        """Start or stop sampling all thread stacks; on stop the flame-graph file is written."""
+        prof = self.sampling_profiler
+        if prof is None or not prof.running:
+            if prof is None:
+                prof = self.sampling_profiler = SamplingProfiler(interval_ms=PROFILER_INTERVAL_MS)
+            prof.start()
+            print(f"[Profiler] Started ({PROFILER_INTERVAL_MS} ms interval), Ctrl+Shift+P to stop")
+            self.lbl_refresh_trace.configure(text="● PROFILING (Ctrl+Shift+P to stop)")
+            return
+
+        prof.stop()
+        path = PROFILE_DIR / f"onyx_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded"
+        try:
+            prof.write_collapsed(path)
+            print(prof.report())
+            print(f"[Profiler] Flame graph stacks written to {path}")
+            self.lbl_refresh_trace.configure(text=f"Profile saved: {path.name} ({prof.samples} samples)")
+        except OSError as e:
+            print(f"[Profiler] Could not write {path}: {e}")
+            self.lbl_refresh_trace.configure(text="Profile could not be saved")
+
     def register_update_button(self, btn: tk.Button):
         if btn not in self._update_buttons:
             self._update_buttons.append(btn)
             self._update_btn_original_text[id(btn)] = btn.cget("text")
+            # Pages can be built mid-refresh; match the current busy state
+            if self._busy:
+                try:
+                    btn.configure(state="disabled")
+                except Exception:
+                    pass
 
     def set_busy(self, busy: bool, text: str | None = None):
         self._busy = bool(busy)
@@ -194,14 +335,15 @@ class OnyxTerminalTK(tk.Tk):
         self._nav_buttons[key] = btn
 
     def show_page(self, key: str, focus: str | None = None):
-        if key not in self._pages:
+        page = self._get_page(key)
+        if page is None:
             return
 
         if self._current_page:
             self._pages[self._current_page].grid_remove()
 
         self._current_page = key
-        self._pages[key].grid()
+        page.grid()
 
         for k, b in self._nav_buttons.items():
             b.set_selected(k == key)
@@ -224,31 +366,94 @@ class OnyxTerminalTK(tk.Tk):
         else:
             messagebox.showerror("Onyx", f"Folder missing: {STIBOR_GRSS_PATH}")
 
-    def refresh_data(self):
+    def refresh_data(self) -> bool:
+        """
+        Start a refresh unless one is running.
+
+        Returns:
+            True if a new refresh was started. Either way the running refresh
+            ends with a "validated" or "failed" event on refresh_bus.
+        """
         if self._busy:
-            return
+            return False
 
         self.set_busy(True, text="FETCHING…")
         self.run_status.configure(text="● UPDATING…", fg=THEME["accent"])
+        self._recon_final_status = False
 
         today = datetime.now().strftime("%Y-%m-%d")
         self.update_days_from_date(today)
 
-        threading.Thread(target=self._worker_refresh_excel_then_bbg, daemon=True).start()
-
-    def _worker_refresh_excel_then_bbg(self):
-        excel_ok, excel_msg = self.excel_engine.load_recon_direct()
-        self.after(0, self._apply_excel_result, excel_ok, excel_msg)
+        self.refresh_bus.emit(REFRESH_STARTED, date=today)
+        threading.Thread(target=self._worker_refresh, daemon=True, name="RefreshOrchestrator").start()
+        return True
 
-        if blpapi:
-            self.engine.fetch_snapshot(
-                ALL_REAL_TICKERS,
-                lambda d, meta: self.after(0, self._apply_bbg_result, d, meta, None),
-                lambda e: self.after(0, self._apply_bbg_result, {}, {}, str(e)),
-                fields=["PX_LAST", "CHG_NET_1D", "LAST_UPDATE"]
+    def _worker_refresh(self):
+        """Recon, weights and market stages run in parallel; results are handed to the Tk thread."""
+        try:
+            self.refresh_orchestrator.run(
+                tickers=ALL_REAL_TICKERS,
+                fields=["PX_LAST", "CHG_NET_1D", "LAST_UPDATE"],
+                market_error=None if self.engine.has_api else "BLPAPI not installed",
+                on_excel=lambda ok, msg: self.after(0, self._apply_excel_result, ok, msg),
+                on_market=self._on_market_result,
+                on_done=lambda trace: self.after(0, self._apply_refresh_trace, trace),
             )
+        except Exception as e:
+            self.after(0, self._fail_refresh, f"Refresh crashed: {e}")
+
+    def _on_sources_changed(self, names: set[str]):
+        """Run only the loaders for source files that changed on disk (Tk thread)."""
+        if self._busy:
+            # A refresh is running; reload once it has ended (VALIDATED or FAILED)
+            if not self._pending_sources:
+                self.refresh_bus.subscribe(TERMINAL_EVENTS, self._on_refresh_ended_reload, once=True)
+            self._pending_sources |= set(names)
+            return
+
+        print(f"[Watcher] Changed: {', '.join(sorted(names))}")
+        self.set_busy(True, text="RELOADING…")
+        self.run_status.configure(text="● UPDATING…", fg=THEME["accent"])
+        self._recon_final_status = False
+        # Ends with VALIDATED or FAILED like a refresh, so subscribers see a full cycle
+        self.refresh_bus.emit(REFRESH_STARTED, date=datetime.now().strftime("%Y-%m-%d"), sources=sorted(names))
+        threading.Thread(target=self._worker_reload_sources, args=(set(names),), daemon=True,
+                         name="SourceReload").start()
+
+    def _on_refresh_ended_reload(self, _event, _payload):
+        names, self._pending_sources = self._pending_sources, set()
+        if names:
+            self.after(0, self._on_sources_changed, names)
+
+    def _worker_reload_sources(self, names: set[str]):
+        ee = self.excel_engine
+        try:
+            if "days" in names:
+                ee.reload_days()
+            if "weights" in names:
+                ee.load_weights_file()
+            excel_res = ee.load_recon_direct(include_weights=False) if "recon" in names else None
+        except Exception as e:
+            excel_res = (False, str(e))
+        self.after(0, self._apply_source_reload, names, excel_res)
+
+    def _apply_source_reload(self, names: set[str], excel_res: tuple | None):
+        if "days" in names:
+            self.update_days_from_date(datetime.now().strftime("%Y-%m-%d"))
+        if excel_res is not None:
+            # Recon workbook changed: same path as a refresh's Excel stage
+            self._apply_excel_result(*excel_res)
         else:
-            self.after(0, self._apply_bbg_result, {}, {}, "BLPAPI not installed")
+            self.update_funding_model()
+            self.refresh_ui()
+
+        self._recon_final_status = True
+        if not self.update_recon():
+            self._finish_refresh()
+
+    def _apply_refresh_trace(self, trace):
+        self.last_refresh_trace = trace
+        self.lbl_refresh_trace.configure(text=f"Refresh: {trace.summary()}")
 
     def _compute_group_health(self, bbg_meta: dict, market_data: dict) -> dict[str, str]:
         meta = bbg_meta or {}
@@ -290,69 +495,89 @@ class OnyxTerminalTK(tk.Tk):
             self.card_excel.set_status(False, None, detail_text="Last updated: -")
             self.run_status.configure(text="● EXCEL ERROR", fg=THEME["bad"])
 
-        self.active_alerts = []
-        self.status_spot = True
-        self.status_fwds = True
-        self.status_ecp = True
-        self.status_days = True
-        self.status_cells = True
-        self.status_weights = True
-        self.weights_state = "WAIT"
+        self.refresh_bus.emit(EXCEL_LOADED, ok=excel_ok, msg=excel_msg)
 
-        _ = self.build_recon_rows(view="ALL")
+        self.update_recon()
+        self.update_funding_model()
         self.refresh_ui()
 
+    def _on_market_result(self, bbg_data: dict, bbg_meta: dict, bbg_err: str | None):
+        """Orchestrator thread: optionally record the fetch for replay, then hand it to Tk."""
+        if RECORD_INTRADAY and bbg_data and not bbg_err and not bbg_meta.get("from_cache") and not bbg_meta.get("mock"):
+            self.snapshot_engine.append_intraday_record(bbg_data, bbg_meta.get("received_at"))
+        self.after(0, self._apply_bbg_result, bbg_data, bbg_meta, bbg_err)
+
+    def _fail_refresh(self, error: str):
+        print(f"[Refresh] {error}")
+        self.run_status.configure(text="● REFRESH FAILED", fg=THEME["bad"])
+        self.refresh_bus.emit(FAILED, error=error)
+
     def _apply_bbg_result(self, bbg_data: dict, bbg_meta: dict, bbg_err: str | None):
         self.last_bbg_meta = dict(bbg_meta or {})
 
-        if bbg_data and not bbg_err and blpapi:
-            self.cached_market_data = dict(bbg_data)
+        if bbg_data and not bbg_err and self.engine.has_api:
+            # Immutable MarketSnapshot, shared with the workers without copying
+            self.cached_market_data = bbg_data
             self.bbg_last_ok_ts = datetime.now()
 
-            gh = self._compute_group_health(self.last_bbg_meta, self.cached_market_data)
-            self.group_health = dict(gh)
+            self.market_health = self._compute_group_health(self.last_bbg_meta, self.cached_market_data)
 
             req = self.last_bbg_meta.get("requested_count", "-")
             resp = self.last_bbg_meta.get("responded_count", "-")
             dur = self.last_bbg_meta.get("duration_ms", "-")
             src = "cache" if self.last_bbg_meta.get("from_cache") else f"{dur}ms"
             detail = f"Last updated: {fmt_ts(self.bbg_last_ok_ts)} | {resp}/{req} | {src}"
+            if self.last_bbg_meta.get("timed_out"):
+                detail += " | timeout"
+            if self.last_bbg_meta.get("as_of"):
+                detail += f" | replay {self.last_bbg_meta['as_of']:%Y-%m-%d %H:%M}"
             self.card_bbg.set_status(True, self.bbg_last_ok_ts, detail_text=detail)
         else:
-            self.cached_market_data = dict(bbg_data) if bbg_data else {}
-            self.group_health = self._compute_group_health(self.last_bbg_meta, self.cached_market_data)
+            self.cached_market_data = bbg_data if bbg_data else {}
+            self.market_health = self._compute_group_health(self.last_bbg_meta, self.cached_market_data)
             self.card_bbg.set_status(False, None, detail_text="Last updated: -")
 
-        self.active_alerts = []
-        self.status_spot = True
-        self.status_fwds = True
-        self.status_ecp = True
-        self.status_days = True
-        self.status_cells = True
-        self.status_weights = True
-        self.weights_state = "WAIT"
-
-        _ = self.build_recon_rows(view="ALL")
+        self.group_health = {**self.market_health, **dict(self.recon_result.group_health if self.recon_result else {})}
 
-        if self.cached_excel_data and (self.cached_market_data or not blpapi) and not self.active_alerts:
-            self.run_status.configure(text="● VALIDATED", fg=THEME["good"])
-        elif self.active_alerts:
-            self.run_status.configure(text=f"● ALERTS ({len(self.active_alerts)})", fg=THEME["bad"])
-        else:
-            self.run_status.configure(text="● PARTIAL", fg=THEME["warn"])
+        # Final run status is set once the recon worker has validated this data
+        self._recon_final_status = True
+        recon_pending = self.update_recon()
 
-        self.set_busy(False)
+        self.refresh_bus.emit(MARKET_LOADED, ok=bool(bbg_data and not bbg_err),
+                              meta=dict(self.last_bbg_meta), error=bbg_err)
+        if not recon_pending:
+            self._finish_refresh()
 
-        # Save daily snapshot after successful data fetch
-        if bbg_data and not bbg_err and self.cached_excel_data:
-            self._save_daily_snapshot()
+        self.update_funding_model()
+        self.refresh_ui()
 
+    def update_funding_model(self, force: bool = False):
+        """Recompute the shared funding model off the UI thread if the data version changed."""
+        version = FundingModel.data_version(self.last_bbg_meta, self.excel_engine, self.current_days_data)
+        inputs = {
+            "market_data": self.cached_market_data or {},
+            "excel_cm_rates": dict(self.excel_engine.excel_cm_rates or {}),
+            "days_data": dict(self.current_days_data or {}),
+            "weights": resolve_weights(self.excel_engine),
+            "contribution_change": dict(self.excel_engine.swedbank_contribution_change or {}),
+        }
+        self.funding_model.compute_async(
+            version, inputs,
+            lambda result: self.after(0, self._apply_funding_result, result),
+            force=force
+        )
+
+    def _apply_funding_result(self, result: dict):
+        self.funding_result = result
+        self.impl_calc_data = result.get("impl_calc_data", {})
+        self.funding_calc_data = result.get("funding", {})
         self.refresh_ui()
 
     def refresh_ui(self):
         if self._current_page and self._current_page in self._pages:
             try:
-                self._pages[self._current_page].update()
+                with METRICS.timer("ui.repaint"), METRICS.timer(f"ui.repaint.{self._current_page}"):
+                    self._pages[self._current_page].update()
             except Exception:
                 pass
 
@@ -407,317 +632,111 @@ class OnyxTerminalTK(tk.Tk):
         days_map = self.excel_engine.get_days_for_date(date_str)
         self.current_days_data = days_map if days_map else {}
 
-    def build_recon_rows(self, view="ALL"):
-        excel_data = self.cached_excel_data or {}
-        market_data = self.cached_market_data or {}
-
-        rows_out = []
-
-        TOL_SPOT = 0.0005
-        TOL_FWDS = 0.0005
-        TOL_W = 1e-9
-
-        def add_section(title):
-            rows_out.append({"values": [title, "", "", "", "", ""], "style": "section"})
-
-        def add_row(cell, desc, model, market, diff, ok, style_override=None):
-            status = "✔" if ok else "✘"
-            style = style_override if style_override else ("good" if ok and view != "ALL" else ("normal" if ok else "bad"))
-            rows_out.append({"values": [cell, desc, model, market, diff, status], "style": style})
-            return ok
-
-        def collect_market_section(title, filter_prefixes, tol):
-            add_section(title)
-            section_ok = True
-            market_ready = bool(market_data)
-
-            for cell, desc, ticker in RECON_MAPPING:
-                if not any(cell.startswith(p) for p in filter_prefixes):
-                    continue
-
-                model_val = excel_data.get(coordinate_to_tuple(cell), None)
-
-                if not market_ready:
-                    add_row(cell, desc, str(model_val), "-", "-", True)
-                    continue
-
-                market_inf = market_data.get(ticker)
-                if not market_inf:
-                    section_ok = False
-                    add_row(cell, desc, str(model_val), "-", "-", False)
-                    if view == "ALL":
-                        self.active_alerts.append({"source": cell, "msg": f"{desc} Missing ticker", "val": "-", "exp": ticker})
-                    continue
-
-                market_val = float(market_inf.get("price", 0.0))
-                mf = safe_float(model_val, 0.0)
-                diff = mf - market_val
-                ok = abs(diff) < tol
-                section_ok = section_ok and ok
-
-                add_row(cell, desc, f"{mf:,.6f}", f"{market_val:,.6f}", f"{diff:+.6f}", ok)
-
-                if view == "ALL" and not ok:
-                    self.active_alerts.append({"source": cell, "msg": f"{desc} Diff", "val": f"{diff:+.6f}", "exp": f"±{tol}"})
-            return section_ok
-
-        if view in ("ALL", "SPOT"):
-            ok_n = collect_market_section("EURNOK SPOT", ["N"], TOL_SPOT)
-            ok_s = collect_market_section("USDNOK SPOT", ["S"], TOL_SPOT)
-            if view == "ALL":
-                self.status_spot = (ok_n and ok_s) if market_data else True
-
-        if view in ("ALL", "FWDS"):
-            ok_o = collect_market_section("EURNOK FORWARDS", ["O"], TOL_FWDS)
-            ok_t = collect_market_section("USDNOK FORWARDS", ["T"], TOL_FWDS)
-            if view == "ALL":
-                self.status_fwds = (ok_o and ok_t) if market_data else True
-
-        if view in ("ALL", "DAYS"):
-            add_section("DAYS VALIDATION")
-            days_ok = True
-            for cell, desc, key in DAYS_MAPPING:
-                model_val = excel_data.get(coordinate_to_tuple(cell), None)
-                ref_val = (self.current_days_data or {}).get(key, None)
-                try:
-                    mi = int(model_val)
-                    ri = int(ref_val)
-                    diff = mi - ri
-                    ok = (diff == 0)
-                    days_ok = days_ok and ok
-                    add_row(cell, desc, str(mi), str(ri), str(diff), ok)
-                    if view == "ALL" and not ok:
-                        self.active_alerts.append({"source": cell, "msg": f"{desc} Mismatch", "val": str(mi), "exp": str(ri)})
-                except Exception:
-                    days_ok = False
-                    add_row(cell, desc, str(model_val), str(ref_val), "-", False)
-                    if view == "ALL":
-                        self.active_alerts.append({"source": cell, "msg": f"{desc} Parse error", "val": str(model_val), "exp": str(ref_val)})
-            if view == "ALL":
-                self.status_days = days_ok
-                self.group_health["DAYS"] = "OK" if days_ok else "CHECK"
-
-        if view in ("ALL", "CELLS"):
-            add_section("EXCEL CONSISTENCY CHECKS")
-            cells_ok = True
-
-            # Reset criteria stats when doing full validation
-            if view == "ALL":
-                self.criteria_stats = {
-                    "exact": {"passed": 0, "failed": 0},
-                    "rounded": {"passed": 0, "failed": 0},
-                    "range": {"passed": 0, "failed": 0},
-                    "fixed": {"passed": 0, "failed": 0}
-                }
-                self.match_details = []
-
-            for rule in RULES_DB:
-                rule_id, top_cell, ref_target, logic, msg = rule
-                val_top = self.excel_engine.get_recon_value(top_cell)
-                val_bot = "-"
-                ok = False
-                criteria_type = "exact"
+        # Each calendar load has its own future: a failed one stays failed, and
+        # the reload that fixes it comes back through here with a new one
+        days_ready = self.excel_engine.ready("days")
+        if not days_ready.done() and not self._days_wait_pending:
+            # Calendar still loading: validate days again once it arrives
+            self._days_wait_pending = True
+            days_ready.add_done_callback(lambda fut: self.after(0, self._on_days_ready, fut.result()))
+
+    def _on_days_ready(self, ok: bool = True):
+        """Re-run days validation with the calendar that just finished loading (Tk thread)."""
+        self._days_wait_pending = False
+        if not ok:
+            print("[Days] Day calendar failed to load; waiting for the next reload")
+            return
+        self.update_days_from_date(datetime.now().strftime("%Y-%m-%d"))
+        if not self.current_days_data or self._busy:
+            # Nothing new, or the running refresh validates the calendar itself
+            return
+        self.update_funding_model()
+        self._recon_final_status = True
+        if not self.update_recon():
+            self._finish_refresh()
+        self.refresh_ui()
 
-                try:
-                    if logic == "Exakt Match":
-                        criteria_type = "exact"
-                        val_bot = self.excel_engine.get_recon_value(ref_target)
-                        try:
-                            ok = abs(float(val_top) - float(val_bot)) < 0.000001
-                        except Exception:
-                            ok = (str(val_top).strip() == str(val_bot).strip())
-
-                    elif logic == "Avrundat 2 dec":
-                        criteria_type = "rounded"
-                        val_bot = self.excel_engine.get_recon_value(ref_target)
-                        ok = abs(round(float(val_top), 2) - round(float(val_bot), 2)) < 0.000001
-
-                    elif "-" in logic and logic[0].isdigit():
-                        criteria_type = "range"
-                        a, b = logic.split("-")
-                        ok = float(a) <= float(val_top) <= float(b)
-                        val_bot = f"Range {logic}"
-
-                    elif "Exakt" in logic:
-                        criteria_type = "fixed"
-                        target = float(logic.split()[1].replace(",", "."))
-                        ok = abs(float(val_top) - target) < 0.000001
-                        val_bot = f"== {target}"
-                except Exception:
-                    ok = False
-
-                # Track statistics
-                if view == "ALL":
-                    if ok:
-                        self.criteria_stats[criteria_type]["passed"] += 1
-                    else:
-                        self.criteria_stats[criteria_type]["failed"] += 1
-
-                    # Store match detail for clickable rows
-                    self.match_details.append({
-                        "rule_id": rule_id,
-                        "cell": top_cell,
-                        "ref_cell": ref_target,
-                        "desc": msg,
-                        "model": str(val_top),
-                        "market": str(val_bot),
-                        "logic": logic,
-                        "status": ok,
-                        "diff": "-"
-                    })
-
-                cells_ok = cells_ok and ok
-
-                show = (view == "CELLS") or (view == "ALL" and not ok)
-                if show:
-                    add_row(top_cell, msg, str(val_top), str(val_bot), "-", ok)
-
-                if view == "ALL" and not ok:
-                    self.active_alerts.append({"source": top_cell, "msg": msg, "val": str(val_top), "exp": str(val_bot)})
-
-            if view == "ALL":
-                self.status_cells = cells_ok
-                self.group_health["CELLS"] = "OK" if cells_ok else "CHECK"
-
-        if view in ("ALL", "WEIGHTS"):
-            add_section("WEIGHTS — FILE VS MODEL (MONTHLY)")
-
-            today_d = datetime.now().date()
-            bday_idx = business_day_index_in_month(today_d)
-            cal_days = calendar_days_since_month_start(today_d)
-
-            model_date_raw = self.excel_engine.get_recon_value(WEIGHTS_MODEL_CELLS["DATE"])
-            model_date = to_date(model_date_raw)
-
-            model_usd = safe_float(self.excel_engine.get_recon_value(WEIGHTS_MODEL_CELLS["USD"]), None)
-            model_eur = safe_float(self.excel_engine.get_recon_value(WEIGHTS_MODEL_CELLS["EUR"]), None)
-            model_nok = safe_float(self.excel_engine.get_recon_value(WEIGHTS_MODEL_CELLS["NOK"]), None)
-
-            file_ok = bool(self.excel_engine.weights_ok)
-            if not file_ok:
-                self.status_weights = False
-                self.weights_state = "FAIL"
-                self.group_health["WEIGHTS"] = "FAIL | Weights.xlsx not readable"
-
-                add_row("WEIGHTS.xlsx", "Weights file not available", "-", "-", "-", False)
-                if view == "ALL":
-                    self.active_alerts.append({"source": "WEIGHTS.xlsx", "msg": "Weights file missing/unreadable", "val": "-", "exp": str(WEIGHTS_FILE)})
-
-            else:
-                p = self.excel_engine.weights_cells_parsed or {}
-                file_h3 = p.get("H3")
-                file_h4 = p.get("H4")
-                file_h5 = p.get("H5")
-                file_h6 = p.get("H6")
-
-                file_usd = p.get("USD")
-                file_eur = p.get("EUR")
-                file_nok = p.get("NOK")
-
-                dates_to_check = [("H3", file_h3), ("H4", file_h4), ("H5", file_h5), ("H6", file_h6)]
-                date_ok = True
-                for label, dval in dates_to_check:
-                    if label != "H3" and dval is None:
-                        continue
-                    ok = (model_date is not None and dval is not None and model_date == dval)
-                    date_ok = date_ok and ok
-                    add_row(
-                        f"{WEIGHTS_MODEL_CELLS['DATE']} ↔ {label}",
-                        f"Weights effective date ({label} in Weights.xlsx)",
-                        fmt_date(model_date),
-                        fmt_date(dval),
-                        "" if ok else "DIFF",
-                        ok
-                    )
-                    if view == "ALL" and not ok:
-                        self.active_alerts.append({"source": "WEIGHTS DATE", "msg": f"Date mismatch ({label})", "val": fmt_date(model_date), "exp": fmt_date(dval)})
-
-                w_ok = True
-
-                def w_cmp(name, model_val, file_val, model_cell, file_cell):
-                    nonlocal w_ok
-                    if model_val is None or file_val is None:
-                        ok = False
-                        diff = "-"
-                    else:
-                        diffv = float(model_val) - float(file_val)
-                        ok = abs(diffv) <= TOL_W
-                        diff = f"{diffv:+.6f}"
-                    w_ok = w_ok and ok
-                    add_row(
-                        f"{model_cell} ↔ {file_cell}",
-                        f"{name} weight",
-                        "-" if model_val is None else f"{float(model_val):.6f}",
-                        "-" if file_val is None else f"{float(file_val):.6f}",
-                        diff,
-                        ok
-                    )
-                    if view == "ALL" and not ok:
-                        self.active_alerts.append({"source": f"WEIGHTS {name}", "msg": f"{name} weight mismatch", "val": str(model_val), "exp": str(file_val)})
-                    return ok
-
-                w_cmp("USD", model_usd, file_usd, WEIGHTS_MODEL_CELLS["USD"], WEIGHTS_FILE_CELLS["USD"])
-                w_cmp("EUR", model_eur, file_eur, WEIGHTS_MODEL_CELLS["EUR"], WEIGHTS_FILE_CELLS["EUR"])
-                w_cmp("NOK", model_nok, file_nok, WEIGHTS_MODEL_CELLS["NOK"], WEIGHTS_FILE_CELLS["NOK"])
-
-                sum_file = None
-                if file_usd is not None and file_eur is not None and file_nok is not None:
-                    sum_file = float(file_usd) + float(file_eur) + float(file_nok)
-
-                weights_match_ok = bool(date_ok and w_ok)
-                self.status_weights = weights_match_ok
-
-                updated_this_month = False
-                if weights_match_ok and model_date is not None:
-                    updated_this_month = (model_date.year == today_d.year and model_date.month == today_d.month)
-
-                if not weights_match_ok:
-                    self.weights_state = "FAIL"
-                    self.group_health["WEIGHTS"] = "FAIL | Mismatch"
-                else:
-                    if updated_this_month:
-                        self.weights_state = "OK"
-                        sf = "-" if sum_file is None else f"{sum_file:.3f}"
-                        self.group_health["WEIGHTS"] = f"OK | Updated {fmt_date(model_date)} | Sum {sf}"
-                    else:
-                        if bday_idx >= 5:
-                            self.weights_state = "ALERT"
-                            self.group_health["WEIGHTS"] = f"ALERT | Not updated | BDay {bday_idx}/5 | {cal_days} days"
-                            if view == "ALL":
-                                self.active_alerts.append({
-                                    "source": "WEIGHTS",
-                                    "msg": f"ALERT: Weights not updated (BDay {bday_idx}/5)",
-                                    "val": fmt_date(model_date),
-                                    "exp": f"Update required in {today_d.strftime('%Y-%m')}"
-                                })
-                        else:
-                            self.weights_state = "PENDING"
-                            self.group_health["WEIGHTS"] = f"SOON | Update weights | BDay {bday_idx}/5 | {cal_days} days"
-
-        if view == "ALL" and SWET_CM_RECON_MAPPING:
-            add_section("SWET CM (MODEL VS MARKET)")
-            cm_ok = True
-            market_ready = bool(market_data)
-            for cell, desc, ticker in SWET_CM_RECON_MAPPING:
-                model_val = excel_data.get(coordinate_to_tuple(cell), None)
-                if not market_ready:
-                    add_row(cell, desc, str(model_val), "-", "-", True)
-                    continue
-                mi = safe_float(model_val, 0.0)
-                inf = market_data.get(ticker)
-                if not inf:
-                    cm_ok = False
-                    add_row(cell, desc, str(model_val), "-", "-", False)
-                    self.active_alerts.append({"source": cell, "msg": f"{desc} Missing ticker", "val": "-", "exp": ticker})
-                    continue
-                mv = float(inf.get("price", 0.0))
-                diff = mi - mv
-                ok = abs(diff) < 0.0005
-                cm_ok = cm_ok and ok
-                add_row(cell, desc, f"{mi:,.6f}", f"{mv:,.6f}", f"{diff:+.6f}", ok)
-            self.group_health["SWETCM"] = "OK" if cm_ok else "CHECK"
-
-        return rows_out
+    def _recon_inputs(self) -> dict:
+        """Copy recon inputs with their version tokens (Tk thread)."""
+        ee = self.excel_engine
+        excel_cells = dict(self.cached_excel_data or {})
+        market = self.cached_market_data or {}
+        days = dict(self.current_days_data or {})
+        today = datetime.now().date()
+
+        return {
+            "excel_cells": (excel_cells, (ee.last_loaded_ts, bool(excel_cells))),
+            "recon_data": (dict(ee.recon_data or {}), ee.last_loaded_ts),
+            "market": (market, (FundingModel.market_version(self.last_bbg_meta), bool(market))),
+            "day_calendar": (days, tuple(sorted((str(k), str(v)) for k, v in days.items()))),
+            "weights_file": ({"ok": bool(ee.weights_ok), "parsed": dict(ee.weights_cells_parsed or {})},
+                             (ee.weights_ok, ee.weights_last_loaded_ts, ee.weights_err)),
+            "today": (today, today),
+        }
+
+    def update_recon(self) -> bool:
+        """
+        Start recon evaluation on a worker thread.
+
+        Returns:
+            True if a result (or error) is on its way to _apply_recon_result
+            (or _apply_recon_error), False if the current one is up to date
+        """
+        return self.recon_model.compute_async(
+            self._recon_inputs(),
+            lambda result: self.after(0, self._apply_recon_result, result),
+            on_error=lambda err: self.after(0, self._apply_recon_error, err),
+        )
+
+    def _apply_recon_error(self, error: str):
+        """Recon evaluation failed (Tk thread): end the waiting refresh as failed."""
+        if self._recon_final_status:
+            self._recon_final_status = False
+            self._fail_refresh(f"Recon failed: {error}")
+
+    def _apply_recon_result(self, result):
+        """Swap in a finished ReconResult and re-render (Tk thread only)."""
+        self.recon_result = result
+        self.active_alerts = list(result.alerts)
+        self.group_health = {**self.market_health, **dict(result.group_health)}
+
+        self.status_spot = result.status["spot"]
+        self.status_fwds = result.status["fwds"]
+        self.status_days = result.status["days"]
+        self.status_cells = result.status["cells"]
+        self.status_weights = result.status["weights"]
+        self.weights_state = result.weights_state
+        self.criteria_stats = result.criteria_stats
+        self.match_details = result.match_details
+
+        if self._recon_final_status:
+            self._finish_refresh()
+        self.refresh_ui()
+
+    def _finish_refresh(self):
+        """Set the final run status and announce validation (once per refresh)."""
+        self._recon_final_status = False
+        self._update_run_status()
+        self.refresh_bus.emit(VALIDATED, alerts=len(self.active_alerts), result=self.recon_result)
+
+    def _on_market_loaded(self, _event, payload):
+        # Save daily snapshot after successful data fetch
+        if payload.get("ok") and self.cached_excel_data:
+            self._save_daily_snapshot()
+
+    def _update_run_status(self):
+        if self.cached_excel_data and (self.cached_market_data or not self.engine.has_api) and not self.active_alerts:
+            self.run_status.configure(text="● VALIDATED", fg=THEME["good"])
+        elif self.active_alerts:
+            self.run_status.configure(text=f"● ALERTS ({len(self.active_alerts)})", fg=THEME["bad"])
+        else:
+            self.run_status.configure(text="● PARTIAL", fg=THEME["warn"])
+
+    def build_recon_rows(self, view="ALL"):
+        """Rows for a recon view from the latest result; never evaluates on the Tk thread."""
+        if self.recon_result is None:
+            return []
+        return self.recon_result.rows_for(view)
 
 
 # ==============================================================================
@@ -757,120 +776,29 @@ def run_terminal_mode():
 
     generate_alerts_report()
 
+    STARTUP.mark("terminal report")
+    if IMPORT_PROFILER is not None:
+        print(STARTUP.report())
+        print(IMPORT_PROFILER.report())
+
+    print(METRICS.report())
+    try:
+        print(f"✓ Metrics sparade till: {METRICS.dump_json(METRICS_JSON_FILE)}")
+    except OSError as e:
+        print(f"[Metrics] Kunde inte spara {METRICS_JSON_FILE}: {e}")
+
 
-def generate_alerts_report():
-    """Genererar alerts baserat på filvalidering och sparar till rapport.txt."""
+def generate_alerts_report(dates: list[str] | None = None):
+    """Genererar alerts baserat på filvalidering och sparar till rapport.txt (se report_engine)."""
     print("=" * 60)
     print("  GENERERAR ALERT-RAPPORT")
     print("=" * 60)
 
-    active_alerts = []
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cleanup_copy_cache()
+    report = ReportEngine().run(dates)
+    active_alerts = report["alerts"]
 
-    file_checks = [
-        ("DAY_FILES[0]", DAY_FILES[0], "Nibor days 2025"),
-        ("DAY_FILES[1]", DAY_FILES[1], "Nibor days 2026"),
-        ("RECON_FILE", RECON_FILE, "Recon Workbook"),
-        ("WEIGHTS_FILE", WEIGHTS_FILE, "Weights file"),
-    ]
-
-    for name, path, desc in file_checks:
-        if not path.exists():
-            active_alerts.append({
-                "source": name,
-                "msg": f"{desc} saknas",
-                "val": "SAKNAS",
-                "exp": str(path)
-            })
-
-    engine = ExcelEngine()
-
-    for _ in range(20):
-        if engine._day_data_ready:
-            break
-        time.sleep(0.1)
-
-    if engine._day_data_err:
-        active_alerts.append({
-            "source": "DAY_FILES",
-            "msg": "Fel vid laddning av day files",
-            "val": engine._day_data_err,
-            "exp": "Inga fel"
-        })
-
-    recon_ok, recon_msg = engine.load_recon_direct()
-    if not recon_ok:
-        active_alerts.append({
-            "source": "RECON_FILE",
-            "msg": "Kunde inte ladda recon-fil",
-            "val": recon_msg,
-            "exp": "OK"
-        })
-    else:
-        for rule in RULES_DB:
-            rule_id, top_cell, ref_target, logic, msg = rule
-            val_top = engine.get_recon_value(top_cell)
-            val_bot = engine.get_recon_value(ref_target)
-
-            ok = False
-            try:
-                if logic == "Exakt Match":
-                    try:
-                        ok = abs(float(val_top) - float(val_bot)) < 0.000001
-                    except (TypeError, ValueError):
-                        ok = (str(val_top).strip() == str(val_bot).strip())
-                elif logic == "Avrundat 2 dec":
-                    ok = abs(round(float(val_top), 2) - round(float(val_bot), 2)) < 0.000001
-                elif "-" in logic and logic[0].isdigit():
-                    a, b = logic.split("-")
-                    ok = float(a) <= float(val_top) <= float(b)
-                elif "Exakt" in logic:
-                    target = float(logic.split()[1].replace(",", "."))
-                    ok = abs(float(val_top) - target) < 0.000001
-            except Exception:
-                ok = False
-
-            if not ok:
-                active_alerts.append({
-                    "source": f"Rule {rule_id}: {top_cell}",
-                    "msg": msg,
-                    "val": str(val_top),
-                    "exp": str(val_bot)
-                })
-
-    if not engine.weights_ok:
-        active_alerts.append({
-            "source": "WEIGHTS",
-            "msg": "Weights-fil kunde inte laddas",
-            "val": engine.weights_err or "Okänt fel",
-            "exp": "OK"
-        })
-
-    rapport_path = APP_DIR / "rapport.txt"
-    with open(rapport_path, "w", encoding="utf-8") as f:
-        f.write("=" * 60 + "\n")
-        f.write("  ONYX TERMINAL - ALERT RAPPORT\n")
-        f.write("=" * 60 + "\n")
-        f.write(f"Genererad: {timestamp}\n")
-        f.write(f"Data-katalog: {DATA_DIR}\n\n")
-
-        if not active_alerts:
-            f.write("✓ INGA AKTIVA ALERTS\n")
-            f.write("Alla valideringar godkända.\n")
-        else:
-            f.write(f"⚠ ANTAL AKTIVA ALERTS: {len(active_alerts)}\n")
-            f.write("-" * 60 + "\n\n")
-
-            for i, alert in enumerate(active_alerts, 1):
-                f.write(f"Alert #{i}\n")
-                f.write(f"  Källa:     {alert['source']}\n")
-                f.write(f"  Meddelande: {alert['msg']}\n")
-                f.write(f"  Värde:     {alert['val']}\n")
-                f.write(f"  Förväntat: {alert['exp']}\n")
-                f.write("\n")
-
-        f.write("-" * 60 + "\n")
-        f.write("Slut på rapport\n")
+    rapport_path = write_text(report, APP_DIR / "rapport.txt")
 
     print(f"\nAntal aktiva alerts: {len(active_alerts)}")
     if active_alerts:
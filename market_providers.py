@@ -0,0 +1,333 @@
+"""
+Market data providers for BloombergEngine.
+A provider only knows how to answer one snapshot request; caching,
+coalescing, meta, metrics and threading live in the engine core, so
+every source (blpapi, Excel defaults, random walk, replay) gets them.
+
+Provider interface (duck-typed):
+    name: Short source name, reported as meta["source"]
+    mock: True for offline sources (reported as meta["mock"])
+    start(): Optional warm-up, called once by the engine
+    fetch(tickers, fields, deadline=None, cancel=None) -> {ticker: (price, change, time)}
+        Tickers left out of the result are reported as missing; raise on
+        request failure, or FetchIncomplete with what arrived before the
+        deadline (time.monotonic() value) passed or the request's cancel
+        token (threading.Event, one per request) was set. Sources that
+        answer at once may ignore both.
+"""
+import bisect
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class FetchIncomplete(Exception):
+    """A fetch stopped early; `partial` holds the tickers that did arrive."""
+
+    def __init__(self, partial: dict, reason: str = "timeout"):
+        super().__init__(f"Fetch {reason} with {len(partial)} tickers received")
+        self.partial = partial
+        self.reason = reason
+
+
+class BlpapiProvider:
+    """Reference data requests through blpapi (or a module-compatible mock such as mock_market)."""
+
+    name = "blpapi"
+    mock = False
+    # nextEvent() wait per loop turn; bounds how late a deadline or cancel is noticed
+    POLL_MS = 200
+
+    def __init__(self, api, host: str = "localhost", port: int = 8194):
+        self._api = api
+        self._host = host
+        self._port = port
+        self._session = None
+        self._service = None
+        self._is_ready = False
+        self._request_seq = 0
+        self.last_error: str | None = None
+
+    def _open_session(self):
+        """Start a session and open //blp/refdata; returns (session, service) or raises."""
+        session_options = self._api.SessionOptions()
+        session_options.setServerHost(self._host)
+        session_options.setServerPort(self._port)
+        session = self._api.Session(session_options)
+        if not session.start():
+            raise RuntimeError("Session Start Failed")
+        if not session.openService("//blp/refdata"):
+            session.stop()
+            raise RuntimeError("Service Open Failed")
+        return session, session.getService("//blp/refdata")
+
+    def start(self):
+        """Open the session in the background so the first fetch does not pay for it."""
+        if not self._api:
+            return
+
+        def _starter():
+            try:
+                self._session, self._service = self._open_session()
+                self._is_ready = True
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+        threading.Thread(target=_starter, daemon=True, name="BloombergSession").start()
+
+    def _ensure_ready(self):
+        if not self._api:
+            raise RuntimeError("BLPAPI not installed")
+        if self._is_ready and self._session and self._service:
+            return
+        self._session, self._service = self._open_session()
+        self._is_ready = True
+        self.last_error = None
+
+    def _cancel_request(self, cid):
+        try:
+            self._session.cancel(cid)
+        except Exception as e:
+            print(f"[Bloomberg] Cancel failed: {e}")
+
+    def fetch(self, tickers: tuple[str, ...], fields: list[str], deadline: float | None = None,
+              cancel: threading.Event | None = None) -> dict:
+        if cancel is not None and cancel.is_set():
+            raise FetchIncomplete({}, "cancelled")
+        self._ensure_ready()
+
+        req = self._service.createRequest("ReferenceDataRequest")
+        for t in tickers:
+            req.getElement("securities").appendValue(t)
+        for f in fields:
+            req.getElement("fields").appendValue(f)
+
+        self._request_seq += 1
+        cid = self._api.CorrelationId(self._request_seq)
+        self._session.sendRequest(req, correlationId=cid)
+
+        event = self._api.Event
+        res = {}
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            stop = ("cancelled" if cancel is not None and cancel.is_set()
+                    else "timeout" if remaining is not None and remaining <= 0 else None)
+            if stop:
+                # Stop the server side too, so its late events do not reach the next request
+                self._cancel_request(cid)
+                raise FetchIncomplete(res, stop)
+
+            wait_ms = self.POLL_MS if remaining is None else max(1, min(self.POLL_MS, int(remaining * 1000)))
+            ev = self._session.nextEvent(wait_ms)
+            if ev.eventType() in (event.RESPONSE, event.PARTIAL_RESPONSE):
+                ours = False
+                for msg in ev:
+                    if cid not in msg.correlationIds():
+                        # Left over from an earlier, abandoned request
+                        continue
+                    ours = True
+                    if not msg.hasElement("securityData"):
+                        continue
+                    arr = msg.getElement("securityData")
+                    for i in range(arr.numValues()):
+                        sec = arr.getValueAsElement(i)
+                        t = sec.getElementAsString("security")
+                        if sec.hasElement("securityError"):
+                            continue
+                        if not sec.hasElement("fieldData"):
+                            continue
+                        flds = sec.getElement("fieldData")
+
+                        price = flds.getElementAsFloat("PX_LAST") if flds.hasElement("PX_LAST") else 0.0
+                        change = flds.getElementAsFloat("CHG_NET_1D") if flds.hasElement("CHG_NET_1D") else 0.0
+                        time_str = flds.getElementAsString("LAST_UPDATE") if flds.hasElement("LAST_UPDATE") else ""
+
+                        res[t] = (float(price), float(change), str(time_str))
+
+                if ev.eventType() == event.RESPONSE and ours:
+                    return res
+
+
+class StaticDefaultsProvider:
+    """
+    Fixed prices (the Implied_NOK_Defaults workbook) for verification runs.
+
+    Unknown tickers get 1.0 so every requested ticker responds.
+    """
+
+    name = "excel_defaults"
+    mock = True
+
+    def __init__(self, prices: dict[str, float], delay_ms: float = 50.0):
+        self.prices = dict(prices)
+        self.delay_ms = float(delay_ms)
+
+    def start(self):
+        pass
+
+    def fetch(self, tickers: tuple[str, ...], fields: list[str], deadline: float | None = None,
+              cancel: threading.Event | None = None) -> dict:
+        time_str = datetime.now().strftime("%H:%M:%S")
+        res = {t: (float(self.prices.get(t, 1.0)), 0.0, time_str) for t in tickers}
+        # Simulate small network delay
+        if self.delay_ms > 0:
+            time.sleep(self.delay_ms / 1000.0)
+        return res
+
+
+class RandomWalkProvider:
+    """Seeded random walk from mock_market.MockMarketService, one step per fetch."""
+
+    name = "random_walk"
+    mock = True
+
+    def __init__(self, base_prices: dict[str, float] | None = None, seed: int | None = None,
+                 vol_bps: float = 5.0, delay_ms: float = 50.0, service=None):
+        if service is None:
+            from mock_market import MockMarketService
+            if seed is None:
+                seed = time.time_ns() & 0xFFFFFFFF
+            service = MockMarketService(seed=seed, base_prices=base_prices, vol_bps=vol_bps)
+        self.service = service
+        self.delay_ms = float(delay_ms)
+
+    def start(self):
+        pass
+
+    def fetch(self, tickers: tuple[str, ...], fields: list[str], deadline: float | None = None,
+              cancel: threading.Event | None = None) -> dict:
+        self.service.advance(1)
+        step = self.service.current_step()
+        res = {}
+        for t in tickers:
+            q = self.service.quote(t, step)
+            res[t] = (float(q["PX_LAST"]), float(q["CHG_NET_1D"]), q["LAST_UPDATE"])
+        if self.delay_ms > 0:
+            time.sleep(self.delay_ms / 1000.0)
+        return res
+
+
+class ReplayProvider:
+    """
+    Serves recorded market data back on a replay clock.
+
+    Frames are (timestamp, {ticker: data}) in time order. With speed > 0 the
+    replay clock starts at the first frame on the first fetch and runs at
+    `speed` x wall-clock time (1.0 = as recorded); each fetch gets the last
+    frame at or before the replay time. With speed == 0 every fetch steps to
+    the next frame, for running the pipeline as fast as it goes. Gaps longer
+    than `max_gap_sec` (nights, weekends) are shortened to that length.
+    """
+
+    name = "replay"
+    mock = True
+
+    def __init__(self, frames: list[tuple[datetime, dict]], speed: float = 1.0, loop: bool = False,
+                 max_gap_sec: float | None = None):
+        if not frames:
+            raise ValueError("Replay needs at least one frame")
+        self.frames = sorted(frames, key=lambda f: f[0])
+        self.speed = float(speed)
+        self.loop = bool(loop)
+
+        # Replay-clock offset (s) of each frame after gap compression
+        self._offsets = [0.0]
+        for (prev, _), (ts, _) in zip(self.frames, self.frames[1:]):
+            gap = (ts - prev).total_seconds()
+            if max_gap_sec is not None:
+                gap = min(gap, float(max_gap_sec))
+            self._offsets.append(self._offsets[-1] + gap)
+
+        self._t0: float | None = None
+        self._index = -1
+        self.as_of: datetime | None = None
+
+    @classmethod
+    def from_snapshots(cls, snapshot_engine, start: str, end: str | None = None, **kwargs) -> "ReplayProvider":
+        """
+        Frames from SnapshotEngine history between two dates (inclusive).
+
+        Days with intraday records replay every recorded fetch; other days
+        replay the daily snapshot once, at its save time (noon if unknown).
+
+        Args:
+            snapshot_engine: SnapshotEngine to read from
+            start: First date, YYYY-MM-DD
+            end: Last date, YYYY-MM-DD (default: start)
+            **kwargs: speed, loop, max_gap_sec
+        """
+        first = datetime.strptime(start, "%Y-%m-%d").date()
+        last = datetime.strptime(end, "%Y-%m-%d").date() if end else first
+
+        frames = []
+        day = first
+        while day <= last:
+            date_str = day.strftime("%Y-%m-%d")
+            records = snapshot_engine.load_intraday_records(date_str)
+            if records:
+                frames.extend(records)
+            else:
+                snapshot = snapshot_engine.load_snapshot(date_str)
+                if snapshot:
+                    frames.append((cls._snapshot_time(snapshot, day), cls._flatten(snapshot)))
+            day += timedelta(days=1)
+
+        if not frames:
+            raise ValueError(f"No snapshots or intraday records between {first} and {last}")
+        print(f"[Replay] {len(frames)} frames from {first} to {last}")
+        return cls(frames, **kwargs)
+
+    @staticmethod
+    def _snapshot_time(snapshot: dict, day) -> datetime:
+        try:
+            ts = datetime.fromisoformat(snapshot["metadata"]["timestamp"])
+            if ts.date() == day:
+                return ts
+        except (KeyError, TypeError, ValueError):
+            pass
+        return datetime.combine(day, datetime.min.time()).replace(hour=12)
+
+    @staticmethod
+    def _flatten(snapshot: dict) -> dict:
+        """{ticker: data} from the categorized "bloomberg" section of a daily snapshot."""
+        data = {}
+        for group in (snapshot.get("bloomberg") or {}).values():
+            if isinstance(group, dict):
+                data.update(group)
+        return data
+
+    @property
+    def finished(self) -> bool:
+        """True once the last frame has been served (never when looping)."""
+        return not self.loop and self._index >= len(self.frames) - 1
+
+    def start(self):
+        pass
+
+    def _frame_index(self) -> int:
+        if self.speed <= 0:
+            nxt = self._index + 1
+            if nxt >= len(self.frames):
+                return 0 if self.loop else len(self.frames) - 1
+            return nxt
+
+        now = time.monotonic()
+        if self._t0 is None:
+            self._t0 = now
+        elapsed = (now - self._t0) * self.speed
+        span = self._offsets[-1]
+        if self.loop and span > 0:
+            elapsed %= span
+        return bisect.bisect_right(self._offsets, elapsed) - 1
+
+    def fetch(self, tickers: tuple[str, ...], fields: list[str], deadline: float | None = None,
+              cancel: threading.Event | None = None) -> dict:
+        self._index = self._frame_index()
+        ts, frame = self.frames[self._index]
+        self.as_of = ts
+        res = {}
+        for t in tickers:
+            d = frame.get(t)
+            if isinstance(d, dict) and d.get("price") is not None:
+                res[t] = (float(d["price"]), float(d.get("change") or 0.0), str(d.get("time") or ts.strftime("%H:%M:%S")))
+        return res
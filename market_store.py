@@ -0,0 +1,200 @@
+"""
+Compact market data store for Onyx Terminal.
+Fetch results are kept column-wise (price/change arrays and a time list)
+indexed by a fixed ticker ordinal, and published as immutable, versioned
+MarketSnapshot objects. A snapshot is shared as-is between the fetch
+thread, the cache, the Tk thread and the recon/funding workers; nothing
+copies it. Quote views are built on lookup.
+"""
+import threading
+from array import array
+from collections import deque
+from collections.abc import Mapping
+
+from config import ALL_REAL_TICKERS
+
+_NAN = float("nan")
+
+
+class Quote:
+    """
+    One ticker's market data: price, change and time.
+
+    Reads like the old {"price", "change", "time"} dict (q["price"],
+    q.get("time"), dict(q)) so existing consumers work unchanged.
+    """
+
+    __slots__ = ("price", "change", "time")
+    FIELDS = ("price", "change", "time")
+
+    def __init__(self, price: float, change: float, time: str):
+        object.__setattr__(self, "price", price)
+        object.__setattr__(self, "change", change)
+        object.__setattr__(self, "time", time)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Quote is immutable")
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self) -> dict:
+        return {"price": self.price, "change": self.change, "time": self.time}
+
+    def __eq__(self, other):
+        if isinstance(other, Quote):
+            return (self.price, self.change, self.time) == (other.price, other.change, other.time)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Quote(price={self.price!r}, change={self.change!r}, time={self.time!r})"
+
+
+class MarketSnapshot(Mapping):
+    """
+    Immutable ticker -> Quote mapping over column arrays.
+
+    Only tickers that responded are keys. `version` increases with every
+    snapshot published by the same store.
+    """
+
+    __slots__ = ("version", "_index", "_tickers", "_price", "_change", "_time", "_present", "_count")
+
+    def __init__(self, version: int, index: dict[str, int], tickers: list[str],
+                 price: array, change: array, time: list, present: bytearray):
+        self.version = version
+        self._index = index
+        self._tickers = tickers
+        self._price = price
+        self._change = change
+        self._time = time
+        self._present = present
+        self._count = sum(present)
+
+    def _ordinal(self, ticker) -> int:
+        i = self._index.get(ticker, -1)
+        # The store's index may have grown after this snapshot was published
+        if 0 <= i < len(self._present) and self._present[i]:
+            return i
+        return -1
+
+    def __getitem__(self, ticker: str) -> Quote:
+        i = self._ordinal(ticker)
+        if i < 0:
+            raise KeyError(ticker)
+        return Quote(self._price[i], self._change[i], self._time[i])
+
+    def __contains__(self, ticker) -> bool:
+        return self._ordinal(ticker) >= 0
+
+    def __iter__(self):
+        present = self._present
+        for i in range(len(present)):
+            if present[i]:
+                yield self._tickers[i]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def price(self, ticker: str, default: float | None = None) -> float | None:
+        """Price without building a Quote."""
+        i = self._ordinal(ticker)
+        return self._price[i] if i >= 0 else default
+
+    def to_dict(self) -> dict[str, dict]:
+        """Plain {ticker: {"price", "change", "time"}} for JSON."""
+        return {t: self[t].to_dict() for t in self}
+
+    def __repr__(self):
+        return f"MarketSnapshot(version={self.version}, tickers={self._count})"
+
+
+class MarketDataStore:
+    """
+    Publishes MarketSnapshots and keeps the last `keep` versions.
+
+    Ticker ordinals come from `tickers` (ALL_REAL_TICKERS); tickers outside
+    it get the next free ordinal on first sight, so the layout stays fixed
+    for the life of the store.
+    """
+
+    def __init__(self, tickers: list[str] | None = None, keep: int = 240):
+        self._lock = threading.Lock()
+        self._tickers: list[str] = list(ALL_REAL_TICKERS if tickers is None else tickers)
+        self._index: dict[str, int] = {t: i for i, t in enumerate(self._tickers)}
+        self.version = 0
+        self._history: deque[MarketSnapshot] = deque(maxlen=max(1, int(keep)))
+        self._latest = self._empty()
+
+    def _empty(self) -> MarketSnapshot:
+        n = len(self._tickers)
+        return MarketSnapshot(0, self._index, self._tickers, array("d", [_NAN]) * n,
+                              array("d", [_NAN]) * n, [""] * n, bytearray(n))
+
+    def _ordinal(self, ticker: str) -> int:
+        i = self._index.get(ticker)
+        if i is None:
+            i = len(self._tickers)
+            self._tickers.append(ticker)
+            self._index[ticker] = i
+        return i
+
+    def publish(self, data: Mapping, record: bool = True) -> MarketSnapshot:
+        """
+        Build the next snapshot from fetched data.
+
+        Args:
+            data: {ticker: (price, change, time)} or {ticker: {"price", "change", "time"}}
+                (a MarketSnapshot is returned unchanged)
+            record: Make it latest() and keep it in history; False builds a
+                detached snapshot (still with its own version), e.g. for a
+                partial fetch result
+
+        Returns:
+            The new (or given) snapshot
+        """
+        if isinstance(data, MarketSnapshot):
+            return data
+        with self._lock:
+            for t in data:
+                self._ordinal(t)
+            n = len(self._tickers)
+            price = array("d", [_NAN]) * n
+            change = array("d", [_NAN]) * n
+            times = [""] * n
+            present = bytearray(n)
+            index = self._index
+            for t, v in data.items():
+                i = index[t]
+                if isinstance(v, tuple):
+                    p, c, tm = v
+                else:
+                    p, c, tm = v.get("price"), v.get("change"), v.get("time")
+                price[i] = float(p if p is not None else 0.0)
+                change[i] = float(c or 0.0)
+                times[i] = str(tm or "")
+                present[i] = 1
+            self.version += 1
+            snap = MarketSnapshot(self.version, index, self._tickers, price, change, times, present)
+            if record:
+                self._latest = snap
+                self._history.append(snap)
+            return snap
+
+    def latest(self) -> MarketSnapshot:
+        return self._latest
+
+    def history(self) -> list[MarketSnapshot]:
+        """Kept snapshots, oldest first."""
+        with self._lock:
+            return list(self._history)
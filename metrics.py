@@ -0,0 +1,190 @@
+"""
+Runtime metrics for Onyx Terminal.
+Counters, gauges and HDR-style latency histograms for the hot paths
+(workbook open, cell extraction, day files, market fetch, rule evaluation,
+snapshot I/O, UI repaint). Shown on the Diagnostics page and dumped as
+JSON from terminal mode.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Latencies are stored in whole microseconds; each power-of-two range is split
+# into 2**SUB_BITS linear sub-buckets, so any recorded value is off by < 1/32.
+SUB_BITS = 5
+_SUB_COUNT = 1 << SUB_BITS
+_SUB_TOP = _SUB_COUNT * 2
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram (HDR-style) with bounded relative error.
+
+    Values below 64 us are counted exactly; above that a bucket covers
+    1/32 of its power-of-two range. Only non-empty buckets are stored.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._buckets: dict[tuple[int, int], int] = {}
+            self.count = 0
+            self.total_us = 0
+            self.min_us: int | None = None
+            self.max_us: int | None = None
+
+    @staticmethod
+    def _bucket(us: int) -> tuple[int, int]:
+        if us < _SUB_TOP:
+            return 0, us
+        shift = us.bit_length() - SUB_BITS - 1
+        return shift, us >> shift
+
+    @staticmethod
+    def _bucket_mid_us(key: tuple[int, int]) -> float:
+        shift, top = key
+        lo = top << shift
+        return lo + ((1 << shift) - 1) / 2.0
+
+    def record(self, ms: float):
+        us = max(0, int(round(ms * 1000.0)))
+        key = self._bucket(us)
+        with self._lock:
+            self._buckets[key] = self._buckets.get(key, 0) + 1
+            self.count += 1
+            self.total_us += us
+            self.min_us = us if self.min_us is None else min(self.min_us, us)
+            self.max_us = us if self.max_us is None else max(self.max_us, us)
+
+    def percentile(self, p: float) -> float | None:
+        """Value in ms at percentile `p` (0-100), or None if empty."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, int(round(p / 100.0 * self.count + 0.5 - 1e-9)))
+            seen = 0
+            for key in sorted(self._buckets):
+                seen += self._buckets[key]
+                if seen >= rank:
+                    us = min(max(self._bucket_mid_us(key), self.min_us), self.max_us)
+                    return us / 1000.0
+            return self.max_us / 1000.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            count, total, lo, hi = self.count, self.total_us, self.min_us, self.max_us
+        if not count:
+            return {"count": 0}
+        return {
+            "count": count,
+            "min_ms": round(lo / 1000.0, 3),
+            "mean_ms": round(total / count / 1000.0, 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p90_ms": round(self.percentile(90), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(hi / 1000.0, 3),
+        }
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges and latency histograms, created on first use.
+
+    All methods are thread-safe; workers record from their own threads and
+    the Diagnostics page reads snapshot() on the Tk thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._t0 = time.time()
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+        self.histograms: dict[str, LatencyHistogram] = {}
+
+    def inc(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = LatencyHistogram()
+            return hist
+
+    def observe(self, name: str, ms: float):
+        """Record one latency sample in ms."""
+        self.histogram(name).record(ms)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time a block into histogram `name` (recorded even if the block raises)."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - t0) * 1000.0)
+
+    def reset(self):
+        with self._lock:
+            self._t0 = time.time()
+            self.counters.clear()
+            self.gauges.clear()
+            hists = list(self.histograms.values())
+        for hist in hists:
+            hist.reset()
+
+    def snapshot(self) -> dict:
+        """Plain-dict view of every metric, sorted by name."""
+        with self._lock:
+            counters = dict(sorted(self.counters.items()))
+            gauges = dict(sorted(self.gauges.items()))
+            hists = sorted(self.histograms.items())
+            since = self._t0
+        return {
+            "since": since,
+            "uptime_s": round(time.time() - since, 1),
+            "pid": os.getpid(),
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": {name: hist.snapshot() for name, hist in hists},
+        }
+
+    def dump_json(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+    def report(self) -> str:
+        """Text tables of the histograms, counters and gauges."""
+        snap = self.snapshot()
+        lines = [f"[Metrics] Latency (ms) over {snap['uptime_s']:.0f}s:",
+                 f"  {'name':<28} {'n':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}"]
+        for name, h in snap["histograms"].items():
+            if not h["count"]:
+                continue
+            lines.append(f"  {name:<28} {h['count']:>6} {h['p50_ms']:9.2f} {h['p90_ms']:9.2f} "
+                         f"{h['p99_ms']:9.2f} {h['max_ms']:9.2f}")
+        for title, values in (("Counters", snap["counters"]), ("Gauges", snap["gauges"])):
+            if not values:
+                continue
+            lines.append(f"[Metrics] {title}:")
+            for name, v in values.items():
+                lines.append(f"  {name:<28} {v:>6}")
+        return "\n".join(lines)
+
+
+# Process-wide registry used by the engines, recon model and UI
+METRICS = MetricsRegistry()
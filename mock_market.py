@@ -0,0 +1,378 @@
+"""
+Local stand-in for the Bloomberg reference data service.
+A seeded random walk per ticker served through the subset of the blpapi
+interface BloombergEngine uses (SessionOptions, Session, Event, requests,
+messages and elements), with configurable latency, partial responses,
+securityError, missing tickers and timeouts for offline load testing.
+
+Usage:
+    api = create_mock_api(seed=7, profile="busy_morning")
+    engine = BloombergEngine(api=api)
+"""
+import heapq
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import datetime
+
+
+class LatencyProfile:
+    """
+    How the mock service behaves for one request.
+
+    Args:
+        name: Profile name
+        base_ms: Minimum latency of the first response
+        jitter_ms: Median of the lognormal extra latency
+        chunk: Securities per PARTIAL_RESPONSE (0 = one RESPONSE with everything)
+        chunk_gap_ms: Delay between partial responses
+        error_rate: Probability a security comes back with securityError
+        missing_rate: Probability a security is silently left out
+        timeout_rate: Probability the request never completes (only TIMEOUT events)
+        missing: Tickers that are always left out
+    """
+
+    def __init__(self, name: str, base_ms: float = 0.0, jitter_ms: float = 0.0, chunk: int = 0,
+                 chunk_gap_ms: float = 0.0, error_rate: float = 0.0, missing_rate: float = 0.0,
+                 timeout_rate: float = 0.0, missing: list[str] | None = None):
+        self.name = name
+        self.base_ms = float(base_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.chunk = int(chunk)
+        self.chunk_gap_ms = float(chunk_gap_ms)
+        self.error_rate = float(error_rate)
+        self.missing_rate = float(missing_rate)
+        self.timeout_rate = float(timeout_rate)
+        self.missing = set(missing or [])
+
+
+PROFILES = {
+    "instant": LatencyProfile("instant"),
+    "lan": LatencyProfile("lan", base_ms=15, jitter_ms=10),
+    "busy_morning": LatencyProfile("busy_morning", base_ms=150, jitter_ms=250, chunk=10, chunk_gap_ms=40,
+                                   error_rate=0.01, missing_rate=0.01),
+    "flaky": LatencyProfile("flaky", base_ms=80, jitter_ms=400, chunk=5, chunk_gap_ms=100,
+                            error_rate=0.05, missing_rate=0.05, timeout_rate=0.1),
+    "outage": LatencyProfile("outage", timeout_rate=1.0),
+}
+
+
+class MockMarketService:
+    """
+    Seeded random-walk prices per ticker.
+
+    Each ticker has its own RNG derived from (seed, ticker), so prices at a
+    given step do not depend on which tickers were requested before.
+    Prices move one step per advance() (Session.sendRequest advances once
+    per request); with `tick_ms` set they also move with wall-clock time,
+    like a live tick stream. With `strict`, tickers
+    without a base price get a securityError like an invalid security would.
+    """
+
+    def __init__(self, seed: int = 0, base_prices: dict[str, float] | None = None,
+                 vol_bps: float = 2.0, tick_ms: float = 0.0, profile: LatencyProfile | str = "instant",
+                 strict: bool = False):
+        self.seed = int(seed)
+        self.base_prices = dict(base_prices or {})
+        self.strict = bool(strict)
+        self.vol = float(vol_bps) / 10000.0
+        self.tick_ms = float(tick_ms)
+        self.profile = PROFILES[profile] if isinstance(profile, str) else profile
+
+        self._lock = threading.Lock()
+        self._step = 0
+        self._t0 = time.monotonic()
+        self._walks: dict[str, list[float]] = {}
+        self._rngs: dict[str, random.Random] = {}
+        self._request_rng = random.Random(self.seed ^ 0x5EED)
+        self.requests = 0
+
+    def _ticker_rng(self, ticker: str) -> random.Random:
+        rng = self._rngs.get(ticker)
+        if rng is None:
+            rng = self._rngs[ticker] = random.Random((self.seed << 32) ^ zlib.crc32(ticker.encode("utf-8")))
+        return rng
+
+    def _base(self, ticker: str) -> float:
+        base = self.base_prices.get(ticker)
+        if base is None:
+            # Stable pseudo price for unknown tickers
+            base = 1.0 + (zlib.crc32(ticker.encode("utf-8")) % 10000) / 1000.0
+        return float(base)
+
+    def current_step(self) -> int:
+        with self._lock:
+            step = self._step
+            if self.tick_ms > 0:
+                step += int((time.monotonic() - self._t0) * 1000.0 / self.tick_ms)
+            return step
+
+    def advance(self, steps: int = 1):
+        """Move every walk `steps` ticks forward."""
+        with self._lock:
+            self._step += int(steps)
+
+    def price(self, ticker: str, step: int | None = None) -> float:
+        step = self.current_step() if step is None else int(step)
+        with self._lock:
+            walk = self._walks.get(ticker)
+            if walk is None:
+                walk = self._walks[ticker] = [self._base(ticker)]
+            rng = self._ticker_rng(ticker)
+            while len(walk) <= step:
+                walk.append(walk[-1] * math.exp(rng.gauss(0.0, self.vol)))
+            return round(walk[step], 6)
+
+    def quote(self, ticker: str, step: int | None = None) -> dict:
+        step = self.current_step() if step is None else int(step)
+        px = self.price(ticker, step)
+        return {
+            "PX_LAST": px,
+            "CHG_NET_1D": round(px - self.price(ticker, 0), 6),
+            "LAST_UPDATE": datetime.now().strftime("%H:%M:%S"),
+        }
+
+    def plan(self, tickers: list[str]) -> dict:
+        """
+        Decide how one request will be answered.
+
+        Returns:
+            {"timeout": bool, "events": [(delay_ms, event_type, [security dicts])]}
+        """
+        p = self.profile
+        with self._lock:
+            rng = self._request_rng
+            self.requests += 1
+            timeout = rng.random() < p.timeout_rate
+            latency = p.base_ms + (rng.lognormvariate(math.log(p.jitter_ms), 0.6) if p.jitter_ms > 0 else 0.0)
+            outcome = []
+            for t in tickers:
+                if t in p.missing or rng.random() < p.missing_rate:
+                    continue
+                unknown = self.strict and t not in self.base_prices
+                outcome.append((t, unknown or rng.random() < p.error_rate))
+
+        if timeout:
+            return {"timeout": True, "events": []}
+
+        step = self.current_step()
+        securities = []
+        for t, failed in outcome:
+            if failed:
+                securities.append({"security": t, "securityError": {"message": "Unknown/Invalid security"}})
+            else:
+                securities.append({"security": t, "fieldData": self.quote(t, step)})
+
+        size = p.chunk if p.chunk > 0 else max(1, len(securities))
+        chunks = [securities[i:i + size] for i in range(0, len(securities), size)] or [[]]
+        events = []
+        for i, chunk in enumerate(chunks):
+            kind = Event.RESPONSE if i == len(chunks) - 1 else Event.PARTIAL_RESPONSE
+            events.append((latency + i * p.chunk_gap_ms, kind, chunk))
+        return {"timeout": False, "events": events}
+
+
+# ============================================================================
+# blpapi-shaped interface
+# ============================================================================
+
+class Element:
+    """Read-only view of a dict/list shaped like a blpapi Element."""
+
+    def __init__(self, name: str, value):
+        self._name = name
+        self._value = value
+
+    def name(self) -> str:
+        return self._name
+
+    def hasElement(self, name: str) -> bool:
+        return isinstance(self._value, dict) and name in self._value
+
+    def getElement(self, name: str) -> "Element":
+        if not self.hasElement(name):
+            raise KeyError(f"Element '{name}' not found in '{self._name}'")
+        return Element(name, self._value[name])
+
+    def numValues(self) -> int:
+        return len(self._value) if isinstance(self._value, list) else 1
+
+    def getValueAsElement(self, i: int) -> "Element":
+        return Element(self._name, self._value[i])
+
+    def getElementAsFloat(self, name: str) -> float:
+        return float(self.getElement(name)._value)
+
+    def getElementAsString(self, name: str) -> str:
+        return str(self.getElement(name)._value)
+
+
+class CorrelationId:
+    def __init__(self, value=None):
+        self._value = value
+
+    def value(self):
+        return self._value
+
+    def __eq__(self, other):
+        return isinstance(other, CorrelationId) and other._value == self._value
+
+    def __hash__(self):
+        return hash(self._value)
+
+
+class Message(Element):
+    def __init__(self, securities: list[dict], correlation_id: CorrelationId | None = None):
+        super().__init__("ReferenceDataResponse", {"securityData": securities})
+        self._cids = [correlation_id] if correlation_id is not None else []
+
+    def correlationIds(self) -> list[CorrelationId]:
+        return list(self._cids)
+
+
+class Event:
+    PARTIAL_RESPONSE = 6
+    RESPONSE = 5
+    TIMEOUT = 10
+
+    def __init__(self, event_type: int, messages: list[Message] | None = None):
+        self._type = event_type
+        self._messages = messages or []
+
+    def eventType(self) -> int:
+        return self._type
+
+    def __iter__(self):
+        return iter(self._messages)
+
+
+class _ListElement:
+    def __init__(self):
+        self.values: list[str] = []
+
+    def appendValue(self, value):
+        self.values.append(str(value))
+
+
+class Request:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._elements = {"securities": _ListElement(), "fields": _ListElement()}
+
+    def getElement(self, name: str) -> _ListElement:
+        return self._elements[name]
+
+
+class Service:
+    def __init__(self, name: str):
+        self.name = name
+
+    def createRequest(self, kind: str) -> Request:
+        if kind != "ReferenceDataRequest":
+            raise ValueError(f"Unsupported request type: {kind}")
+        return Request(kind)
+
+
+class SessionOptions:
+    def __init__(self):
+        self.host = "localhost"
+        self.port = 8194
+
+    def setServerHost(self, host: str):
+        self.host = host
+
+    def setServerPort(self, port: int):
+        self.port = port
+
+
+class Session:
+    """Queues planned events with due times; nextEvent() blocks until one is due."""
+
+    def __init__(self, service: MockMarketService, options: SessionOptions | None = None):
+        self._market = service
+        self.options = options or SessionOptions()
+        self._started = False
+        self._services: dict[str, Service] = {}
+        self._queue: list[tuple[float, int, Event]] = []
+        self._seq = 0
+        self._cond = threading.Condition()
+
+    def start(self) -> bool:
+        self._started = True
+        return True
+
+    def stop(self):
+        self._started = False
+
+    def openService(self, name: str) -> bool:
+        if not self._started or name != "//blp/refdata":
+            return False
+        self._services[name] = Service(name)
+        return True
+
+    def getService(self, name: str) -> Service:
+        return self._services[name]
+
+    def sendRequest(self, request: Request, correlationId: CorrelationId | None = None) -> CorrelationId:
+        # One walk step per request, like RandomWalkProvider per fetch
+        self._market.advance(1)
+        plan = self._market.plan(request.getElement("securities").values)
+        now = time.monotonic()
+        with self._cond:
+            if correlationId is None:
+                correlationId = CorrelationId(("auto", self._seq))
+            for delay_ms, kind, securities in plan["events"]:
+                self._seq += 1
+                event = Event(kind, [Message(securities, correlationId)])
+                heapq.heappush(self._queue, (now + delay_ms / 1000.0, self._seq, event))
+            self._cond.notify_all()
+        return correlationId
+
+    def cancel(self, correlationId: CorrelationId):
+        """Drop the events of an outstanding request that have not been delivered yet."""
+        with self._cond:
+            self._queue = [item for item in self._queue
+                           if not any(correlationId in m.correlationIds() for m in item[2])]
+            heapq.heapify(self._queue)
+
+    def nextEvent(self, timeout: int = 0) -> Event:
+        """Next due event, or a TIMEOUT event after `timeout` ms (0 = wait forever)."""
+        deadline = None if not timeout else time.monotonic() + timeout / 1000.0
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._queue and self._queue[0][0] <= now:
+                    return heapq.heappop(self._queue)[2]
+                wait_until = self._queue[0][0] if self._queue else None
+                if deadline is not None:
+                    if now >= deadline:
+                        return Event(Event.TIMEOUT)
+                    wait_until = deadline if wait_until is None else min(wait_until, deadline)
+                self._cond.wait(None if wait_until is None else max(0.0, wait_until - now))
+
+
+class MockBlpapi:
+    """
+    Object with the blpapi names BloombergEngine uses, bound to one service.
+
+    Pass it as BloombergEngine(api=...) in place of the blpapi module.
+    """
+
+    CorrelationId = CorrelationId
+    Event = Event
+    SessionOptions = SessionOptions
+
+    def __init__(self, service: MockMarketService):
+        self.service = service
+
+    def Session(self, options: SessionOptions | None = None) -> Session:
+        return Session(self.service, options)
+
+
+def create_mock_api(seed: int = 0, profile: LatencyProfile | str = "lan",
+                    base_prices: dict[str, float] | None = None, vol_bps: float = 2.0,
+                    tick_ms: float = 0.0, strict: bool = False) -> MockBlpapi:
+    return MockBlpapi(MockMarketService(seed=seed, base_prices=base_prices, vol_bps=vol_bps,
+                                        tick_ms=tick_ms, profile=profile, strict=strict))
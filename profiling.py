@@ -0,0 +1,377 @@
+"""
+Startup profiling for Onyx Terminal.
+StartupTimer records named phases from process start to first paint;
+ImportProfiler records per-module import times when profiling mode is on
+(ONYX_PROFILE_IMPORTS=1 or --profile-imports). SamplingProfiler samples
+all thread stacks into flame-graph (collapsed stack) files on demand;
+StallWatchdog reports Tk event-loop stalls with the blocking callback.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+from metrics import METRICS
+
+
+class StartupTimer:
+    """
+    Records consecutive startup phases.
+
+    mark(name) closes the phase that started at the previous mark;
+    phase(name) times a block explicitly.
+    """
+
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._last = self._t0
+        self.phases: list[tuple[str, float, float]] = []  # (name, start_ms, duration_ms)
+
+    def _ms(self, t: float) -> float:
+        return (t - self._t0) * 1000.0
+
+    def mark(self, name: str) -> float:
+        """Close the current phase under `name`; returns its duration in ms."""
+        now = time.perf_counter()
+        dur = (now - self._last) * 1000.0
+        self.phases.append((name, self._ms(self._last), dur))
+        self._last = now
+        return dur
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, self._ms(start), (end - start) * 1000.0))
+            self._last = max(self._last, end)
+
+    def elapsed_ms(self) -> float:
+        return self._ms(time.perf_counter())
+
+    def report(self) -> str:
+        lines = ["[Startup] Phase timings:"]
+        for name, start, dur in self.phases:
+            lines.append(f"  {name:<24} +{start:8.1f} ms  {dur:8.1f} ms")
+        lines.append(f"  {'total':<24} {self.elapsed_ms():9.1f} ms")
+        return "\n".join(lines)
+
+
+class _TimedLoader:
+    """Wraps a module loader and times exec_module with self/cumulative split."""
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter()
+        t0 = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(module.__name__, (time.perf_counter() - t0) * 1000.0)
+
+
+class ImportProfiler:
+    """
+    Meta path hook that records how long each module takes to import.
+
+    Self time excludes nested imports, cumulative includes them (same
+    split as python -X importtime). Only the main thread is timed.
+    """
+
+    def __init__(self):
+        self.records: dict[str, dict] = {}
+        self._stack: list[float] = []
+        self._busy = False
+
+    # meta path finder protocol
+    def find_spec(self, fullname, path=None, target=None):
+        if self._busy or threading.current_thread() is not threading.main_thread():
+            return None
+        self._busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, self)
+                    return spec
+            return None
+        finally:
+            self._busy = False
+
+    def _enter(self):
+        self._stack.append(0.0)
+
+    def _leave(self, name: str, cumulative_ms: float):
+        nested = self._stack.pop()
+        if self._stack:
+            self._stack[-1] += cumulative_ms
+        self.records[name] = {"self_ms": cumulative_ms - nested, "cumulative_ms": cumulative_ms}
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def report(self, top: int = 25) -> str:
+        rows = sorted(self.records.items(), key=lambda kv: kv[1]["self_ms"], reverse=True)[:top]
+        lines = [f"[Imports] Top {len(rows)} modules by self time (ms):",
+                 f"  {'self':>8} {'cumul':>8}  module"]
+        for name, rec in rows:
+            lines.append(f"  {rec['self_ms']:8.1f} {rec['cumulative_ms']:8.1f}  {name}")
+        total = sum(r["self_ms"] for r in self.records.values())
+        lines.append(f"  {total:8.1f} {'':8}  total ({len(self.records)} modules)")
+        return "\n".join(lines)
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the stacks of every thread via sys._current_frames().
+
+    Samples are aggregated per thread as collapsed stacks
+    ("Thread;outer (file:line);...;inner (file:line) count"), the input
+    format of flamegraph.pl and speedscope. Nothing runs until start();
+    the sampler thread itself is never sampled.
+    """
+
+    def __init__(self, interval_ms: float = 5.0, max_depth: int = 96):
+        self.interval = max(0.001, float(interval_ms) / 1000.0)
+        self.max_depth = int(max_depth)
+        self.stacks: dict[str, int] = {}
+        self.samples = 0
+        self.started_at: float | None = None
+        self.stopped_at: float | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._labels: dict = {}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        with self._lock:
+            self.stacks = {}
+            self.samples = 0
+        self._labels = {}
+        self._stop.clear()
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._thread = threading.Thread(target=self._run, daemon=True, name="SamplingProfiler")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        self.stopped_at = time.time()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample(skip=own)
+            except Exception as e:
+                print(f"[Profiler] Sample failed: {e}")
+
+    def _label(self, code) -> str:
+        # Frame labels are cached per code object; ';' separates frames in the output format
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def sample(self, skip: int | None = None):
+        """Take one sample of every thread except `skip`."""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        collapsed = []
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"Thread-{ident}").replace(";", ":").replace(" ", "_"))
+            collapsed.append(";".join(reversed(stack)))
+
+        with self._lock:
+            for key in collapsed:
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def write_collapsed(self, path: Path) -> Path:
+        """Write the collapsed stacks, one "stack count" line each."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            items = sorted(self.stacks.items())
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in items:
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def report(self, top: int = 15) -> str:
+        """Innermost frames by sample count, per thread."""
+        with self._lock:
+            items = list(self.stacks.items())
+            samples = self.samples
+        leaves: dict[tuple[str, str], int] = {}
+        for stack, count in items:
+            parts = stack.split(";")
+            key = (parts[0], parts[-1] if len(parts) > 1 else "-")
+            leaves[key] = leaves.get(key, 0) + count
+        rows = sorted(leaves.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        lines = [f"[Profiler] {samples} samples, top {len(rows)} leaf frames:"]
+        for (thread, leaf), count in rows:
+            pct = 100.0 * count / samples if samples else 0.0
+            lines.append(f"  {pct:5.1f}%  {thread:<20} {leaf}")
+        return "\n".join(lines)
+
+
+class StallWatchdog:
+    """
+    Measures Tk event-loop latency with heartbeat callbacks.
+
+    The heartbeat is an after() callback re-armed every `heartbeat_ms`; how
+    late it fires is recorded as ui.loop_latency. A watchdog thread notices
+    when no heartbeat has run for `threshold_ms` past its due time and grabs
+    the Tk thread's stack at that moment, so the blocking callback is known
+    even if it never returns. Must be constructed on the Tk thread.
+    """
+
+    def __init__(self, root, heartbeat_ms: int = 100, threshold_ms: int = 500, keep: int = 50):
+        self.root = root
+        self.heartbeat = heartbeat_ms / 1000.0
+        self.threshold_ms = float(threshold_ms)
+        self.stalls: deque[dict] = deque(maxlen=keep)
+        self._tk_ident = threading.get_ident()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_beat = time.perf_counter()
+        self._pending: dict | None = None  # stall seen by the watchdog, not yet ended
+        self._after_id = None
+
+    def start(self):
+        self._stop.clear()
+        self._last_beat = time.perf_counter()
+        self._after_id = self.root.after(int(self.heartbeat * 1000), self._beat)
+        threading.Thread(target=self._watch, daemon=True, name="StallWatchdog").start()
+
+    def stop(self):
+        self._stop.set()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _beat(self):
+        now = time.perf_counter()
+        with self._lock:
+            due = self._last_beat + self.heartbeat
+            self._last_beat = now
+            pending, self._pending = self._pending, None
+        METRICS.observe("ui.loop_latency", max(0.0, (now - due) * 1000.0))
+
+        if pending is not None:
+            pending["duration_ms"] = round((now - pending["due"]) * 1000.0, 1)
+            del pending["due"]
+            self.stalls.append(pending)
+            METRICS.observe("ui.stall", pending["duration_ms"])
+            print(f"[Stall] Tk thread blocked {pending['duration_ms']:.0f} ms in {pending['callback']} "
+                  f"(at {pending['where']})")
+
+        if not self._stop.is_set():
+            self._after_id = self.root.after(int(self.heartbeat * 1000), self._beat)
+
+    def _watch(self):
+        while not self._stop.wait(self.heartbeat / 2):
+            with self._lock:
+                due = self._last_beat + self.heartbeat
+                if self._pending is not None or (time.perf_counter() - due) * 1000.0 < self.threshold_ms:
+                    continue
+                frame = sys._current_frames().get(self._tk_ident)
+                stack = traceback.extract_stack(frame) if frame is not None else []
+                callback, where = self._blocking_callback(stack)
+                self._pending = {
+                    "at": time.strftime("%H:%M:%S"),
+                    "due": due,
+                    "callback": callback,
+                    "where": where,
+                    "stack": traceback.format_list(stack),
+                }
+            METRICS.inc("ui.stalls")
+            print(f"[Stall] Tk thread blocked > {self.threshold_ms:.0f} ms in {callback} (at {where})")
+
+    @staticmethod
+    def _blocking_callback(stack) -> tuple[str, str]:
+        """
+        (callback name, innermost frame) from a Tk-thread stack.
+
+        Tk dispatches through tkinter's CallWrapper/callit frames; the first
+        frame after them is the callback that owns the event loop.
+        """
+        if not stack:
+            return "?", "?"
+        innermost = stack[-1]
+        where = f"{innermost.name} ({os.path.basename(innermost.filename)}:{innermost.lineno})"
+
+        in_tk = False
+        for fs in stack:
+            is_tk = f"{os.sep}tkinter{os.sep}" in fs.filename
+            if is_tk:
+                in_tk = True
+            elif in_tk:
+                return f"{fs.name} ({os.path.basename(fs.filename)}:{fs.lineno})", where
+        return "?", where
+
+    def recent(self) -> list[dict]:
+        """Finished stalls plus one in progress, newest first."""
+        items = list(self.stalls)
+        with self._lock:
+            if self._pending is not None:
+                cur = dict(self._pending)
+                cur["duration_ms"] = round((time.perf_counter() - cur.pop("due")) * 1000.0, 1)
+                cur["ongoing"] = True
+                items.append(cur)
+        return list(reversed(items))
+
+
+def profile_imports_enabled() -> bool:
+    return os.environ.get("ONYX_PROFILE_IMPORTS") == "1" or "--profile-imports" in sys.argv
+
+
+# Started when the app first imports this module
+STARTUP = StartupTimer()
+
+# Installed before the rest of the app is imported (main.py imports this module first)
+IMPORT_PROFILER = ImportProfiler() if profile_imports_enabled() else None
+if IMPORT_PROFILER is not None:
+    IMPORT_PROFILER.install()
@@ -0,0 +1,554 @@
+"""
+Recon evaluation for Onyx Terminal.
+Pure section evaluators (spot, forwards, days, rule cells, weights, SWET CM)
+wired into a DependencyGraph, plus view assembly for the recon table.
+ReconModel runs the graph on a worker thread and hands back immutable
+ReconResult objects for the Tk thread to swap in.
+"""
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
+
+from openpyxl.utils import coordinate_to_tuple
+
+from config import (
+    RULES_DB, RECON_MAPPING, DAYS_MAPPING, SWET_CM_RECON_MAPPING,
+    WEIGHTS_FILE, WEIGHTS_FILE_CELLS, WEIGHTS_MODEL_CELLS
+)
+from dependency_graph import DependencyGraph
+from metrics import METRICS
+from utils import (
+    fmt_date, safe_float, to_date,
+    business_day_index_in_month, calendar_days_since_month_start
+)
+
+TOL_SPOT = 0.0005
+TOL_FWDS = 0.0005
+TOL_W = 1e-9
+
+# Section node names in display order
+SECTION_ORDER = ["spot", "fwds", "days", "cells", "weights", "swetcm"]
+
+# Which sections each recon view shows
+VIEW_SECTIONS = {
+    "ALL": ["spot", "fwds", "days", "cells", "weights", "swetcm"],
+    "SPOT": ["spot"],
+    "FWDS": ["fwds"],
+    "DAYS": ["days"],
+    "CELLS": ["cells"],
+    "WEIGHTS": ["weights"],
+}
+
+
+@lru_cache(maxsize=4096)
+def _coord(cell_ref: str) -> tuple[int, int]:
+    """Cached coordinate_to_tuple; the same mapped cells are parsed on every evaluation."""
+    return coordinate_to_tuple(cell_ref)
+
+
+def _cell_value(data: dict, cell_ref: str):
+    try:
+        return data.get(_coord(cell_ref), None)
+    except Exception:
+        return None
+
+
+def _entry(cell, desc, model, market, diff, ok) -> dict:
+    return {"values": [cell, desc, model, market, diff], "ok": bool(ok)}
+
+
+def _section(blocks, ok=True, alerts=None, health=None, **extra) -> dict:
+    out = {"blocks": blocks, "ok": ok, "alerts": alerts or [], "health": health or {}}
+    out.update(extra)
+    return out
+
+
+def _market_block(title, filter_prefixes, tol, excel_data, market_data):
+    entries = []
+    alerts = []
+    block_ok = True
+    market_ready = bool(market_data)
+
+    for cell, desc, ticker in RECON_MAPPING:
+        if not any(cell.startswith(p) for p in filter_prefixes):
+            continue
+
+        model_val = excel_data.get(_coord(cell), None)
+
+        if not market_ready:
+            entries.append(_entry(cell, desc, str(model_val), "-", "-", True))
+            continue
+
+        market_inf = market_data.get(ticker)
+        if not market_inf:
+            block_ok = False
+            entries.append(_entry(cell, desc, str(model_val), "-", "-", False))
+            alerts.append({"source": cell, "msg": f"{desc} Missing ticker", "val": "-", "exp": ticker})
+            continue
+
+        market_val = float(market_inf.get("price", 0.0))
+        mf = safe_float(model_val, 0.0)
+        diff = mf - market_val
+        ok = abs(diff) < tol
+        block_ok = block_ok and ok
+
+        entries.append(_entry(cell, desc, f"{mf:,.6f}", f"{market_val:,.6f}", f"{diff:+.6f}", ok))
+        if not ok:
+            alerts.append({"source": cell, "msg": f"{desc} Diff", "val": f"{diff:+.6f}", "exp": f"±{tol}"})
+
+    return (title, entries), block_ok, alerts
+
+
+def eval_spot(excel_cells: dict, market: dict) -> dict:
+    """EURNOK/USDNOK spot cells vs Bloomberg."""
+    excel_cells = excel_cells or {}
+    market = market or {}
+    b_n, ok_n, a_n = _market_block("EURNOK SPOT", ["N"], TOL_SPOT, excel_cells, market)
+    b_s, ok_s, a_s = _market_block("USDNOK SPOT", ["S"], TOL_SPOT, excel_cells, market)
+    return _section([b_n, b_s], ok=(ok_n and ok_s) if market else True, alerts=a_n + a_s)
+
+
+def eval_fwds(excel_cells: dict, market: dict) -> dict:
+    """EURNOK/USDNOK forward cells vs Bloomberg."""
+    excel_cells = excel_cells or {}
+    market = market or {}
+    b_o, ok_o, a_o = _market_block("EURNOK FORWARDS", ["O"], TOL_FWDS, excel_cells, market)
+    b_t, ok_t, a_t = _market_block("USDNOK FORWARDS", ["T"], TOL_FWDS, excel_cells, market)
+    return _section([b_o, b_t], ok=(ok_o and ok_t) if market else True, alerts=a_o + a_t)
+
+
+def eval_days(excel_cells: dict, day_calendar: dict) -> dict:
+    """Day-count cells vs the Nibor days calendar."""
+    excel_cells = excel_cells or {}
+    entries = []
+    alerts = []
+    days_ok = True
+    for cell, desc, key in DAYS_MAPPING:
+        model_val = excel_cells.get(_coord(cell), None)
+        ref_val = (day_calendar or {}).get(key, None)
+        try:
+            mi = int(model_val)
+            ri = int(ref_val)
+            diff = mi - ri
+            ok = (diff == 0)
+            days_ok = days_ok and ok
+            entries.append(_entry(cell, desc, str(mi), str(ri), str(diff), ok))
+            if not ok:
+                alerts.append({"source": cell, "msg": f"{desc} Mismatch", "val": str(mi), "exp": str(ri)})
+        except Exception:
+            days_ok = False
+            entries.append(_entry(cell, desc, str(model_val), str(ref_val), "-", False))
+            alerts.append({"source": cell, "msg": f"{desc} Parse error", "val": str(model_val), "exp": str(ref_val)})
+
+    return _section([("DAYS VALIDATION", entries)], ok=days_ok, alerts=alerts,
+                    health={"DAYS": "OK" if days_ok else "CHECK"})
+
+
+def evaluate_rule(rule, recon_data: dict) -> tuple[bool, str, object, object]:
+    """
+    Evaluate one RULES_DB rule.
+
+    Returns:
+        (ok, criteria_type, val_top, val_bot)
+    """
+    rule_id, top_cell, ref_target, logic, msg = rule
+    val_top = _cell_value(recon_data, top_cell)
+    val_bot = "-"
+    ok = False
+    criteria_type = "exact"
+
+    try:
+        if logic == "Exakt Match":
+            criteria_type = "exact"
+            val_bot = _cell_value(recon_data, ref_target)
+            try:
+                ok = abs(float(val_top) - float(val_bot)) < 0.000001
+            except Exception:
+                ok = (str(val_top).strip() == str(val_bot).strip())
+
+        elif logic == "Avrundat 2 dec":
+            criteria_type = "rounded"
+            val_bot = _cell_value(recon_data, ref_target)
+            ok = abs(round(float(val_top), 2) - round(float(val_bot), 2)) < 0.000001
+
+        elif "-" in logic and logic[0].isdigit():
+            criteria_type = "range"
+            a, b = logic.split("-")
+            ok = float(a) <= float(val_top) <= float(b)
+            val_bot = f"Range {logic}"
+
+        elif "Exakt" in logic:
+            criteria_type = "fixed"
+            target = float(logic.split()[1].replace(",", "."))
+            ok = abs(float(val_top) - target) < 0.000001
+            val_bot = f"== {target}"
+    except Exception:
+        ok = False
+
+    return ok, criteria_type, val_top, val_bot
+
+
+def eval_cells(recon_data: dict) -> dict:
+    """RULES_DB consistency checks on the fixing workbook."""
+    recon_data = recon_data or {}
+    entries = []
+    alerts = []
+    cells_ok = True
+    stats = {
+        "exact": {"passed": 0, "failed": 0},
+        "rounded": {"passed": 0, "failed": 0},
+        "range": {"passed": 0, "failed": 0},
+        "fixed": {"passed": 0, "failed": 0}
+    }
+    match_details = []
+    t0 = time.perf_counter()
+
+    for rule in RULES_DB:
+        rule_id, top_cell, ref_target, logic, msg = rule
+        ok, criteria_type, val_top, val_bot = evaluate_rule(rule, recon_data)
+
+        stats[criteria_type]["passed" if ok else "failed"] += 1
+        match_details.append({
+            "rule_id": rule_id,
+            "cell": top_cell,
+            "ref_cell": ref_target,
+            "desc": msg,
+            "model": str(val_top),
+            "market": str(val_bot),
+            "logic": logic,
+            "status": ok,
+            "diff": "-"
+        })
+
+        cells_ok = cells_ok and ok
+        entries.append(_entry(top_cell, msg, str(val_top), str(val_bot), "-", ok))
+        if not ok:
+            alerts.append({"source": top_cell, "msg": msg, "val": str(val_top), "exp": str(val_bot)})
+
+    METRICS.observe("recon.rules", (time.perf_counter() - t0) * 1000.0)
+    return _section([("EXCEL CONSISTENCY CHECKS", entries)], ok=cells_ok, alerts=alerts,
+                    health={"CELLS": "OK" if cells_ok else "CHECK"},
+                    criteria_stats=stats, match_details=match_details)
+
+
+def eval_weights(recon_data: dict, weights_file: dict, today: date) -> dict:
+    """Weights.xlsx vs the model sheet, plus the monthly update control."""
+    recon_data = recon_data or {}
+    weights = weights_file or {}
+    entries = []
+    alerts = []
+
+    bday_idx = business_day_index_in_month(today)
+    cal_days = calendar_days_since_month_start(today)
+
+    model_date = to_date(_cell_value(recon_data, WEIGHTS_MODEL_CELLS["DATE"]))
+
+    model_usd = safe_float(_cell_value(recon_data, WEIGHTS_MODEL_CELLS["USD"]), None)
+    model_eur = safe_float(_cell_value(recon_data, WEIGHTS_MODEL_CELLS["EUR"]), None)
+    model_nok = safe_float(_cell_value(recon_data, WEIGHTS_MODEL_CELLS["NOK"]), None)
+
+    blocks = [("WEIGHTS — FILE VS MODEL (MONTHLY)", entries)]
+
+    if not weights.get("ok"):
+        entries.append(_entry("WEIGHTS.xlsx", "Weights file not available", "-", "-", "-", False))
+        alerts.append({"source": "WEIGHTS.xlsx", "msg": "Weights file missing/unreadable", "val": "-", "exp": str(WEIGHTS_FILE)})
+        return _section(blocks, ok=False, alerts=alerts, state="FAIL",
+                        health={"WEIGHTS": "FAIL | Weights.xlsx not readable"})
+
+    p = weights.get("parsed") or {}
+    file_usd = p.get("USD")
+    file_eur = p.get("EUR")
+    file_nok = p.get("NOK")
+
+    dates_to_check = [("H3", p.get("H3")), ("H4", p.get("H4")), ("H5", p.get("H5")), ("H6", p.get("H6"))]
+    date_ok = True
+    for label, dval in dates_to_check:
+        if label != "H3" and dval is None:
+            continue
+        ok = (model_date is not None and dval is not None and model_date == dval)
+        date_ok = date_ok and ok
+        entries.append(_entry(
+            f"{WEIGHTS_MODEL_CELLS['DATE']} ↔ {label}",
+            f"Weights effective date ({label} in Weights.xlsx)",
+            fmt_date(model_date),
+            fmt_date(dval),
+            "" if ok else "DIFF",
+            ok
+        ))
+        if not ok:
+            alerts.append({"source": "WEIGHTS DATE", "msg": f"Date mismatch ({label})", "val": fmt_date(model_date), "exp": fmt_date(dval)})
+
+    w_ok = True
+
+    def w_cmp(name, model_val, file_val, model_cell, file_cell):
+        nonlocal w_ok
+        if model_val is None or file_val is None:
+            ok = False
+            diff = "-"
+        else:
+            diffv = float(model_val) - float(file_val)
+            ok = abs(diffv) <= TOL_W
+            diff = f"{diffv:+.6f}"
+        w_ok = w_ok and ok
+        entries.append(_entry(
+            f"{model_cell} ↔ {file_cell}",
+            f"{name} weight",
+            "-" if model_val is None else f"{float(model_val):.6f}",
+            "-" if file_val is None else f"{float(file_val):.6f}",
+            diff,
+            ok
+        ))
+        if not ok:
+            alerts.append({"source": f"WEIGHTS {name}", "msg": f"{name} weight mismatch", "val": str(model_val), "exp": str(file_val)})
+
+    w_cmp("USD", model_usd, file_usd, WEIGHTS_MODEL_CELLS["USD"], WEIGHTS_FILE_CELLS["USD"])
+    w_cmp("EUR", model_eur, file_eur, WEIGHTS_MODEL_CELLS["EUR"], WEIGHTS_FILE_CELLS["EUR"])
+    w_cmp("NOK", model_nok, file_nok, WEIGHTS_MODEL_CELLS["NOK"], WEIGHTS_FILE_CELLS["NOK"])
+
+    sum_file = None
+    if file_usd is not None and file_eur is not None and file_nok is not None:
+        sum_file = float(file_usd) + float(file_eur) + float(file_nok)
+
+    weights_match_ok = bool(date_ok and w_ok)
+
+    updated_this_month = False
+    if weights_match_ok and model_date is not None:
+        updated_this_month = (model_date.year == today.year and model_date.month == today.month)
+
+    if not weights_match_ok:
+        state = "FAIL"
+        health = "FAIL | Mismatch"
+    elif updated_this_month:
+        state = "OK"
+        sf = "-" if sum_file is None else f"{sum_file:.3f}"
+        health = f"OK | Updated {fmt_date(model_date)} | Sum {sf}"
+    elif bday_idx >= 5:
+        state = "ALERT"
+        health = f"ALERT | Not updated | BDay {bday_idx}/5 | {cal_days} days"
+        alerts.append({
+            "source": "WEIGHTS",
+            "msg": f"ALERT: Weights not updated (BDay {bday_idx}/5)",
+            "val": fmt_date(model_date),
+            "exp": f"Update required in {today.strftime('%Y-%m')}"
+        })
+    else:
+        state = "PENDING"
+        health = f"SOON | Update weights | BDay {bday_idx}/5 | {cal_days} days"
+
+    return _section(blocks, ok=weights_match_ok, alerts=alerts, state=state, health={"WEIGHTS": health})
+
+
+def eval_swetcm(excel_cells: dict, market: dict) -> dict:
+    """SWET CM model cells vs Bloomberg (only when SWET_CM_RECON_MAPPING is configured)."""
+    if not SWET_CM_RECON_MAPPING:
+        return _section([], ok=True)
+
+    excel_cells = excel_cells or {}
+    market = market or {}
+    entries = []
+    alerts = []
+    cm_ok = True
+    market_ready = bool(market)
+    for cell, desc, ticker in SWET_CM_RECON_MAPPING:
+        model_val = excel_cells.get(_coord(cell), None)
+        if not market_ready:
+            entries.append(_entry(cell, desc, str(model_val), "-", "-", True))
+            continue
+        mi = safe_float(model_val, 0.0)
+        inf = market.get(ticker)
+        if not inf:
+            cm_ok = False
+            entries.append(_entry(cell, desc, str(model_val), "-", "-", False))
+            alerts.append({"source": cell, "msg": f"{desc} Missing ticker", "val": "-", "exp": ticker})
+            continue
+        mv = float(inf.get("price", 0.0))
+        diff = mi - mv
+        ok = abs(diff) < 0.0005
+        cm_ok = cm_ok and ok
+        entries.append(_entry(cell, desc, f"{mi:,.6f}", f"{mv:,.6f}", f"{diff:+.6f}", ok))
+
+    return _section([("SWET CM (MODEL VS MARKET)", entries)], ok=cm_ok, alerts=alerts,
+                    health={"SWETCM": "OK" if cm_ok else "CHECK"})
+
+
+def build_recon_graph() -> DependencyGraph:
+    """
+    Recon dependency graph.
+
+    Inputs: excel_cells (cached recon cells), recon_data (engine cells used by
+    rules/weights), market, day_calendar, weights_file, today.
+    """
+    g = DependencyGraph()
+    for name in ("excel_cells", "recon_data", "market", "day_calendar", "weights_file", "today"):
+        g.add_input(name)
+
+    g.add_node("spot", eval_spot, ["excel_cells", "market"])
+    g.add_node("fwds", eval_fwds, ["excel_cells", "market"])
+    g.add_node("days", eval_days, ["excel_cells", "day_calendar"])
+    g.add_node("cells", eval_cells, ["recon_data"])
+    g.add_node("weights", eval_weights, ["recon_data", "weights_file", "today"])
+    g.add_node("swetcm", eval_swetcm, ["excel_cells", "market"])
+    return g
+
+
+def assemble_rows(sections: dict, view: str = "ALL") -> list[dict]:
+    """
+    Build recon table rows for a view from section results.
+
+    ALL only lists failing rule cells; the CELLS view lists every rule.
+    Passing rows are styled "good" in focused views and "normal" in ALL.
+    """
+    rows_out = []
+
+    for name in VIEW_SECTIONS.get(view, VIEW_SECTIONS["ALL"]):
+        sec = sections.get(name)
+        if not sec:
+            continue
+        for title, entries in sec["blocks"]:
+            rows_out.append({"values": [title, "", "", "", "", ""], "style": "section"})
+            for e in entries:
+                ok = e["ok"]
+                if name == "cells" and view == "ALL" and ok:
+                    continue
+                style = "good" if ok and view != "ALL" else ("normal" if ok else "bad")
+                rows_out.append({"values": list(e["values"]) + ["✔" if ok else "✘"], "style": style})
+
+    return rows_out
+
+
+# Graph inputs in the order ReconModel expects them
+RECON_INPUTS = ["excel_cells", "recon_data", "market", "day_calendar", "weights_file", "today"]
+
+
+class ReconResult:
+    """
+    Immutable outcome of one recon evaluation.
+
+    Lists are stored as tuples and dicts as read-only mappings, so the Tk
+    thread can hold on to a result while a worker builds the next one.
+    Rows for every view are assembled once here, on the worker, so switching
+    views is a lookup.
+    """
+
+    __slots__ = ("version", "sections", "rows", "view_rows", "alerts", "criteria_stats",
+                 "match_details", "match_by_cell", "group_health", "status", "weights_state",
+                 "elapsed_ms")
+
+    def __init__(self, version: tuple, sections: dict, elapsed_ms: float = 0.0):
+        cells = sections.get("cells") or {}
+        weights = sections.get("weights") or {}
+
+        alerts = []
+        health = {}
+        for name in SECTION_ORDER:
+            sec = sections.get(name) or {}
+            alerts.extend(sec.get("alerts", []))
+            health.update(sec.get("health", {}))
+
+        status = {name: bool((sections.get(name) or {}).get("ok", False)) for name in SECTION_ORDER}
+        default_stats = {k: {"passed": 0, "failed": 0} for k in ("exact", "rounded", "range", "fixed")}
+        view_rows = {view: tuple(assemble_rows(sections, view)) for view in VIEW_SECTIONS}
+        match_details = tuple(cells.get("match_details") or ())
+
+        _set = object.__setattr__
+        _set(self, "version", version)
+        _set(self, "sections", MappingProxyType(dict(sections)))
+        _set(self, "view_rows", MappingProxyType(view_rows))
+        _set(self, "rows", view_rows["ALL"])
+        _set(self, "alerts", tuple(alerts))
+        _set(self, "criteria_stats", MappingProxyType(cells.get("criteria_stats") or default_stats))
+        _set(self, "match_details", match_details)
+        _set(self, "match_by_cell", MappingProxyType({d["cell"]: d for d in match_details}))
+        _set(self, "group_health", MappingProxyType(health))
+        _set(self, "status", MappingProxyType(status))
+        _set(self, "weights_state", weights.get("state", "FAIL"))
+        _set(self, "elapsed_ms", round(elapsed_ms, 3))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ReconResult is immutable")
+
+    def rows_for(self, view: str = "ALL") -> tuple[dict, ...]:
+        """Recon table rows for a view (unknown views fall back to ALL)."""
+        return self.view_rows.get(view, self.rows)
+
+
+class ReconModel:
+    """
+    Runs the recon graph off the Tk thread.
+
+    Callers pass {input name: (value, version token)} with values already
+    copied on their own thread. The callback gets a ReconResult and runs
+    on the worker thread, so GUI callers marshal it with after().
+    Results for superseded requests are dropped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._eval_lock = threading.Lock()
+        self._graph = build_recon_graph()
+        self._result: ReconResult | None = None
+        self._pending_version: tuple | None = None
+
+    def current(self) -> ReconResult | None:
+        return self._result
+
+    def timings(self) -> dict:
+        return self._graph.timings()
+
+    def evaluate(self, inputs: dict) -> ReconResult:
+        """Evaluate synchronously (used by the worker and headless callers)."""
+        version = tuple(inputs[name][1] for name in RECON_INPUTS)
+        with self._eval_lock:
+            t0 = time.perf_counter()
+            for name in RECON_INPUTS:
+                value, token = inputs[name]
+                self._graph.set_input(name, value, token)
+            sections = self._graph.evaluate()
+            result = ReconResult(version, sections, (time.perf_counter() - t0) * 1000.0)
+        METRICS.observe("recon.evaluate", result.elapsed_ms)
+        return result
+
+    def compute_async(self, inputs: dict, callback, on_error=None) -> bool:
+        """
+        Evaluate `inputs` on a worker thread unless the same version is current or in flight.
+
+        Args:
+            inputs: {name: (value, version token)} for every RECON_INPUTS name
+            callback: Called with the ReconResult (on the worker thread)
+            on_error: Called with the error message if evaluation fails
+
+        Returns:
+            True if a result or an error for these inputs will be delivered
+            to a callback, False if the current result already matches
+        """
+        version = tuple(inputs[name][1] for name in RECON_INPUTS)
+        with self._lock:
+            if self._result is not None and self._result.version == version:
+                return False
+            if self._pending_version == version:
+                return True
+            self._pending_version = version
+
+        def _worker():
+            try:
+                result = self.evaluate(inputs)
+            except Exception as e:
+                print(f"[Recon] Evaluation failed: {e}")
+                with self._lock:
+                    if self._pending_version != version:
+                        return
+                    self._pending_version = None
+                if on_error is not None:
+                    on_error(str(e))
+                return
+            with self._lock:
+                if self._pending_version != version:
+                    return
+                self._result = result
+                self._pending_version = None
+            callback(result)
+
+        threading.Thread(target=_worker, daemon=True, name="ReconWorker").start()
+        return True
@@ -0,0 +1,98 @@
+"""
+Refresh lifecycle bus for Onyx Terminal.
+Pages subscribe to refresh stages instead of polling the app's busy flag.
+"""
+import threading
+from concurrent.futures import Future
+
+# Lifecycle events, in the order a normal refresh emits them
+REFRESH_STARTED = "started"
+EXCEL_LOADED = "excel_loaded"
+MARKET_LOADED = "market_loaded"
+VALIDATED = "validated"
+FAILED = "failed"
+
+REFRESH_EVENTS = [REFRESH_STARTED, EXCEL_LOADED, MARKET_LOADED, VALIDATED, FAILED]
+
+# A refresh ends with exactly one of these
+TERMINAL_EVENTS = (VALIDATED, FAILED)
+
+
+class RefreshBus:
+    """
+    Minimal publish/subscribe bus for refresh stages.
+
+    Callbacks are called as callback(event, payload) on the thread that
+    emits; the app emits from the Tk thread, so subscribers may touch widgets.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs: dict[str, list] = {name: [] for name in REFRESH_EVENTS}
+        self._last: dict[str, dict] = {}
+
+    def subscribe(self, events, callback, once: bool = False):
+        """
+        Subscribe to one event name or a list of names.
+
+        Args:
+            events: Event name or iterable of names
+            callback: Called with (event, payload dict)
+            once: Remove the subscription (for all listed events) after the first call
+
+        Returns:
+            Token for unsubscribe()
+        """
+        names = [events] if isinstance(events, str) else list(events)
+        token = {"callback": callback, "once": once, "events": names, "active": True}
+        with self._lock:
+            for name in names:
+                if name not in self._subs:
+                    raise ValueError(f"Unknown refresh event: {name}")
+                self._subs[name].append(token)
+        return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            token["active"] = False
+            for name in token["events"]:
+                subs = self._subs.get(name, [])
+                if token in subs:
+                    subs.remove(token)
+
+    def emit(self, event: str, **payload):
+        """Notify subscribers of `event`. Errors in one subscriber do not stop the others."""
+        with self._lock:
+            self._last[event] = payload
+            subs = list(self._subs.get(event, []))
+
+        for token in subs:
+            if not token["active"]:
+                continue
+            if token["once"]:
+                self.unsubscribe(token)
+            try:
+                token["callback"](event, payload)
+            except Exception as e:
+                print(f"[RefreshBus] Subscriber for '{event}' failed: {e}")
+
+    def wait_for(self, events=TERMINAL_EVENTS) -> Future:
+        """
+        Future resolved with (event, payload) at the next matching event.
+
+        Done-callbacks run on the emitting (Tk) thread; never call
+        result() on the Tk thread, it would block the event loop.
+        """
+        fut = Future()
+
+        def _resolve(event, payload):
+            if not fut.done():
+                fut.set_result((event, payload))
+
+        self.subscribe(events, _resolve, once=True)
+        return fut
+
+    def last(self, event: str) -> dict | None:
+        """Payload of the most recent `event`, if any."""
+        with self._lock:
+            return self._last.get(event)
@@ -0,0 +1,195 @@
+"""
+Refresh orchestrator for Onyx Terminal.
+Runs recon workbook parsing, weights parsing and the market data fetch
+concurrently and records per-stage wall time in a RefreshTrace.
+"""
+import threading
+import time
+
+from metrics import METRICS
+
+STAGE_RECON = "recon"
+STAGE_WEIGHTS = "weights"
+STAGE_MARKET = "market"
+
+
+class RefreshTrace:
+    """Per-stage timings for one refresh. Offsets are ms since the refresh started."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self.stages: dict[str, dict] = {}
+        self.total_ms: float | None = None
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000.0
+
+    def start(self, stage: str):
+        with self._lock:
+            self.stages[stage] = {"start_ms": round(self._now_ms(), 1), "ms": None, "ok": None, "detail": ""}
+
+    def finish(self, stage: str, ok: bool, detail: str = ""):
+        with self._lock:
+            st = self.stages.setdefault(stage, {"start_ms": 0.0})
+            st["ms"] = round(self._now_ms() - st["start_ms"], 1)
+            st["ok"] = bool(ok)
+            st["detail"] = str(detail or "")
+
+    def close(self):
+        with self._lock:
+            self.total_ms = round(self._now_ms(), 1)
+
+    def stage_sum_ms(self) -> float:
+        """Sum of stage times, i.e. what a sequential refresh would have taken."""
+        with self._lock:
+            return round(sum(st["ms"] or 0.0 for st in self.stages.values()), 1)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "stages": {k: dict(v) for k, v in self.stages.items()},
+                "total_ms": self.total_ms,
+            }
+
+    def summary(self) -> str:
+        """One-line summary, e.g. 'recon 820ms | weights 95ms | market 60ms | total 830ms'."""
+        with self._lock:
+            parts = []
+            for name, st in self.stages.items():
+                ms = "…" if st["ms"] is None else f"{st['ms']:.0f}ms"
+                flag = "" if st["ok"] in (True, None) else " ✘"
+                parts.append(f"{name} {ms}{flag}")
+            if self.total_ms is not None:
+                parts.append(f"total {self.total_ms:.0f}ms")
+            return " | ".join(parts)
+
+
+class RefreshOrchestrator:
+    """
+    Runs the refresh stages in parallel and joins them.
+
+    Recon and weights parsing together make up the Excel result; it is
+    handed to on_excel as soon as both are done. The market result is
+    handed to on_market after on_excel, so consumers always see the
+    workbook first. All callbacks run on the orchestrator thread.
+    """
+
+    def __init__(self, excel_engine, bbg_engine=None, skip_unchanged: bool = True):
+        self.excel_engine = excel_engine
+        self.bbg_engine = bbg_engine
+        # Reuse the parsed recon workbook when its mtime/size did not change
+        self.skip_unchanged = skip_unchanged
+
+    @staticmethod
+    def _record_metrics(trace: RefreshTrace):
+        for name, st in trace.as_dict()["stages"].items():
+            if st.get("ms") is not None:
+                METRICS.observe(f"refresh.{name}", st["ms"])
+            if st.get("ok") is False:
+                METRICS.inc(f"refresh.{name}.failed")
+        METRICS.observe("refresh.total", trace.total_ms or 0.0)
+
+    def _load_recon(self):
+        return self.excel_engine.load_recon_direct(include_weights=False, force=not self.skip_unchanged)
+
+    def run(self, tickers: list[str] | None = None, on_excel=None, on_market=None, on_done=None,
+            fields: list[str] | None = None, market_error: str | None = None,
+            market_timeout: float | None = None) -> RefreshTrace:
+        """
+        Run one refresh synchronously.
+
+        Args:
+            tickers: Tickers to fetch; None or no bbg_engine skips the market stage
+            on_excel: Called with (excel_ok, excel_msg)
+            on_market: Called with (data, meta, error)
+            on_done: Called with the finished RefreshTrace
+            fields: Bloomberg fields
+            market_error: If set, the market stage is skipped and reported with this error
+            market_timeout: Seconds to wait for the market callback (default: the
+                engine's own fetch deadline plus a small margin, else 30)
+
+        Returns:
+            The finished RefreshTrace
+        """
+        trace = RefreshTrace()
+        results: dict[str, tuple] = {}
+
+        def _stage(name, func):
+            trace.start(name)
+            try:
+                res = func()
+            except Exception as e:
+                res = (False, str(e))
+            results[name] = res
+            trace.finish(name, res[0], res[1])
+
+        def _weights():
+            ok = self.excel_engine.load_weights_file()
+            return ok, "" if ok else (self.excel_engine.weights_err or "")
+
+        threads = [
+            threading.Thread(target=_stage, args=(STAGE_RECON, self._load_recon),
+                             daemon=True, name="RefreshRecon"),
+            threading.Thread(target=_stage, args=(STAGE_WEIGHTS, _weights), daemon=True, name="RefreshWeights"),
+        ]
+
+        market_done = threading.Event()
+        market_res: dict = {"data": {}, "meta": {}, "error": market_error}
+        fetch_market = market_error is None and self.bbg_engine is not None and tickers is not None
+
+        if fetch_market:
+            trace.start(STAGE_MARKET)
+
+            def _on_data(data, meta):
+                if market_done.is_set():
+                    return
+                market_res.update(data=data, meta=meta, error=None)
+                detail = f"{(meta or {}).get('responded_count', len(data or {}))} tickers"
+                if (meta or {}).get("timed_out"):
+                    detail += " (timeout)"
+                trace.finish(STAGE_MARKET, True, detail)
+                market_done.set()
+
+            def _on_error(err):
+                if market_done.is_set():
+                    return
+                market_res.update(data={}, meta={}, error=str(err))
+                trace.finish(STAGE_MARKET, False, str(err))
+                market_done.set()
+
+            try:
+                self.bbg_engine.fetch_snapshot(tickers, _on_data, _on_error, fields=fields)
+            except Exception as e:
+                _on_error(e)
+        else:
+            market_done.set()
+
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        excel_ok, excel_msg = results.get(STAGE_RECON, (False, "Recon stage did not run"))
+        if on_excel:
+            on_excel(excel_ok, excel_msg)
+
+        if market_timeout is None:
+            engine_timeout = getattr(self.bbg_engine, "timeout_sec", 0)
+            market_timeout = engine_timeout + 2.0 if engine_timeout > 0 else 30.0
+        if not market_done.wait(market_timeout):
+            market_done.set()
+            if hasattr(self.bbg_engine, "cancel"):
+                self.bbg_engine.cancel()
+            market_res.update(data={}, meta={}, error=f"Market fetch timed out after {market_timeout:.0f}s")
+            trace.finish(STAGE_MARKET, False, market_res["error"])
+
+        trace.close()
+        print(f"[Refresh] {trace.summary()}")
+        self._record_metrics(trace)
+
+        if on_market:
+            on_market(market_res["data"], market_res["meta"], market_res["error"])
+        if on_done:
+            on_done(trace)
+        return trace
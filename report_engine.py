@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Headless alert reports for Onyx Terminal.
+Validates recon sheets against RULES_DB for one or many dates in one or
+many fixing workbooks. Each workbook is opened once and its sheets are
+parsed in one pass; long runs split the sheets over worker processes,
+since parsing is CPU-bound and threads would share the GIL. The day
+calendar and the weights file are loaded once, alongside the sheets.
+Reports are written as text (the rapport.txt layout), JSON or CSV.
+
+Usage:
+    python report_engine.py                                  # latest sheet -> rapport.txt
+    python report_engine.py --dates 2025-11-03 2025-11-10
+    python report_engine.py --dates 2025-11-01:2025-11-30 --format text json csv
+    python report_engine.py --workbook a.xlsx b.xlsx --days --out reports/
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from openpyxl.utils import coordinate_to_tuple
+
+from config import APP_DIR, DATA_DIR, DAY_FILES, DAYS_MAPPING, RECON_FILE, WEIGHTS_FILE, RULES_DB
+from engines import ExcelEngine, HistoricalDataManager, read_cells, required_cells
+from metrics import METRICS
+from recon_engine import eval_days, evaluate_rule
+from workbook_access import list_sheets, load_workbook_shared
+
+CSV_COLUMNS = ["workbook", "sheet", "date", "source", "msg", "val", "exp"]
+
+# Starting a worker process costs about as much as parsing 40 sheets, so
+# shorter runs stay in this process and a chunk is never smaller than this
+MIN_CHUNK_SHEETS = 40
+
+
+def _cell(recon: dict, cell_ref: str):
+    try:
+        return recon.get(coordinate_to_tuple(cell_ref))
+    except Exception:
+        return None
+
+
+def _parse_dates(dates: list[str] | None) -> list[tuple[str, str]]:
+    """["2025-11-03", "2025-11-01:2025-11-30"] -> [(first, last)] date ranges."""
+    ranges = []
+    for d in dates or []:
+        first, _, last = str(d).partition(":")
+        ranges.append((first, last or first))
+    return ranges
+
+
+def _validate_sheet(job: dict, ws, check_days: bool) -> dict:
+    """Rule results for one sheet; with check_days also its day-count cells for the calendar check."""
+    t0 = time.perf_counter()
+    recon = read_cells(ws, required_cells())
+
+    alerts = []
+    passed = 0
+    for rule in RULES_DB:
+        rule_id, top_cell, ref_target, logic, msg = rule
+        ok, _, val_top, _ = evaluate_rule(rule, recon)
+        if ok:
+            passed += 1
+            continue
+        alerts.append({"source": f"Rule {rule_id}: {top_cell}", "msg": msg,
+                       "val": str(val_top), "exp": str(_cell(recon, ref_target))})
+
+    days_cells = None
+    if check_days and job["date"]:
+        coords = [coordinate_to_tuple(cell) for cell, _, _ in DAYS_MAPPING]
+        days_cells = {rc: recon.get(rc) for rc in coords}
+
+    ms = (time.perf_counter() - t0) * 1000.0
+    return dict(job, ok=not alerts, alerts=alerts, rules_passed=passed,
+                rules_failed=len(RULES_DB) - passed, ms=round(ms, 1), days_cells=days_cells)
+
+
+def _validate_chunk(wb_path: Path, jobs: list[dict], check_days: bool) -> list[dict]:
+    """
+    Open the workbook once with only this chunk's sheets and validate them in order.
+
+    Module-level so worker processes can run it.
+    """
+    wanted = {j["sheet"] for j in jobs}
+    try:
+        wb = load_workbook_shared(wb_path, select=lambda names: [n for n in names if n in wanted])
+    except Exception as e:
+        return [_failed(j, str(e)) for j in jobs]
+    try:
+        results = []
+        for job in jobs:
+            try:
+                results.append(_validate_sheet(job, wb[job["sheet"]], check_days))
+            except Exception as e:
+                results.append(_failed(job, str(e)))
+        return results
+    finally:
+        wb.close()
+
+
+def _failed(job: dict, err: str) -> dict:
+    alert = {"source": "RECON_FILE", "msg": "Kunde inte ladda recon-fil", "val": err, "exp": "OK"}
+    return dict(job, ok=False, alerts=[alert], rules_passed=0, rules_failed=0, ms=0.0, days_cells=None)
+
+
+class ReportEngine:
+    """
+    Validates recon sheets and collects the alerts of one report.
+
+    Args:
+        workbooks: Fixing workbooks (default RECON_FILE)
+        day_files: Day-count calendar files (default DAY_FILES)
+        weights_file: Weights workbook (default WEIGHTS_FILE)
+        workers: Worker processes for long runs (default: CPU count, at most 8)
+        check_days: Also check each sheet's day counts against the calendar
+    """
+
+    def __init__(self, workbooks: list[Path] | None = None, day_files: list[Path] | None = None,
+                 weights_file: Path | None = None, workers: int | None = None, check_days: bool = False):
+        self.workbooks = [Path(p) for p in workbooks] if workbooks else [RECON_FILE]
+        self.day_files = [Path(p) for p in day_files] if day_files is not None else list(DAY_FILES)
+        self.weights_file = Path(weights_file) if weights_file else WEIGHTS_FILE
+        self.workers = max(1, int(workers or min(8, os.cpu_count() or 1)))
+        self.check_days = bool(check_days)
+        # Shared day calendar and weights; the recon workbooks are read per chunk
+        self.engine = ExcelEngine(weights_file=self.weights_file, day_files=self.day_files, load_days=False)
+
+    def plan(self, dates: list[str] | None = None) -> list[dict]:
+        """
+        Sheets to validate, as jobs {"workbook", "sheet", "date"}.
+
+        Without dates the latest sheet of each workbook is used. A date picks
+        the last sheet for that day (so "… correct version" sheets win); a
+        range "first:last" picks one sheet per day that has one. A date
+        without a sheet gives a job with sheet None.
+        """
+        ranges = _parse_dates(dates)
+        jobs = []
+        for wb_path in self.workbooks:
+            try:
+                names = list_sheets(wb_path) if wb_path.exists() else []
+            except Exception as e:
+                print(f"[Report] Could not list sheets in {wb_path.name}: {e}")
+                names = []
+
+            if not ranges:
+                jobs.append({"workbook": wb_path, "sheet": names[-1] if names else None,
+                             "date": HistoricalDataManager.identify_sheet_date(names[-1]) if names else None})
+                continue
+
+            by_date: dict[str, str] = {}
+            for name in names:
+                d = HistoricalDataManager.identify_sheet_date(name)
+                if d:
+                    by_date[d] = name
+            for first, last in ranges:
+                picked = sorted(d for d in by_date if first <= d <= last)
+                if not picked and first == last:
+                    jobs.append({"workbook": wb_path, "sheet": None, "date": first})
+                for d in picked:
+                    jobs.append({"workbook": wb_path, "sheet": by_date[d], "date": d})
+        return jobs
+
+    def _file_alerts(self) -> list[dict]:
+        checks = [(f"DAY_FILES[{i}]", p, p.stem) for i, p in enumerate(self.day_files)]
+        checks += [("RECON_FILE", p, "Recon Workbook") for p in self.workbooks]
+        checks.append(("WEIGHTS_FILE", self.weights_file, "Weights file"))
+        return [{"source": name, "msg": f"{desc} saknas", "val": "SAKNAS", "exp": str(path)}
+                for name, path, desc in checks if not path.exists()]
+
+    def _chunks(self, jobs: list[dict]) -> list[tuple[Path, list[dict]]]:
+        by_wb: dict[Path, list[dict]] = {}
+        for job in jobs:
+            by_wb.setdefault(job["workbook"], []).append(job)
+        chunks = []
+        for wb_path, wb_jobs in by_wb.items():
+            n = max(1, min(self.workers, len(wb_jobs) // MIN_CHUNK_SHEETS))
+            size = -(-len(wb_jobs) // n)
+            chunks += [(wb_path, wb_jobs[i:i + size]) for i in range(0, len(wb_jobs), size)]
+        return chunks
+
+    def _validate_chunks(self, chunks: list[tuple[Path, list[dict]]], loaders: ThreadPoolExecutor) -> tuple[list, list]:
+        """
+        Validate chunks in worker processes when the run is long enough to
+        pay for starting them, otherwise in this thread. The calendar and
+        weights loads run on `loaders` meanwhile, started once the
+        processes are up.
+
+        Returns:
+            (sheet results, futures of the calendar and weights loads)
+        """
+        n_sheets = sum(len(jobs) for _, jobs in chunks)
+        if self.workers == 1 or len(chunks) <= 1 or n_sheets < 2 * MIN_CHUNK_SHEETS:
+            loads = self._start_loads(loaders)
+            return [res for wb_path, jobs in chunks for res in _validate_chunk(wb_path, jobs, self.check_days)], loads
+
+        # spawn, as on Windows: the GUI process has threads of its own, so forking it is unsafe
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)), mp_context=ctx) as pool:
+            futures = [pool.submit(_validate_chunk, wb_path, jobs, self.check_days) for wb_path, jobs in chunks]
+            loads = self._start_loads(loaders)
+            return [res for fut in futures for res in fut.result()], loads
+
+    def _start_loads(self, loaders: ThreadPoolExecutor) -> list:
+        return [loaders.submit(self.engine.reload_days), loaders.submit(self.engine.load_weights_file)]
+
+    def _check_days(self, res: dict):
+        """Day counts of a validated sheet against the calendar (after it has loaded)."""
+        days_cells = res.pop("days_cells", None)
+        if days_cells is None:
+            return
+        calendar = self.engine.get_days_for_date(res["date"], timeout=None)
+        if calendar is None:
+            res["alerts"].append({"source": "DAY_FILES", "msg": f"Inga day counts för {res['date']}",
+                                  "val": "SAKNAS", "exp": "Rad i day files"})
+        else:
+            res["alerts"].extend(eval_days(days_cells, calendar)["alerts"])
+        res["ok"] = not res["alerts"]
+
+    def run(self, dates: list[str] | None = None) -> dict:
+        """
+        Build one report.
+
+        Alerts are ordered as in the single-sheet report: missing files,
+        day-file errors, sheets in plan order, weights.
+
+        Returns:
+            {"generated", "data_dir", "alerts", "sheets", "day_files_error", "weights_ok", "elapsed_ms"}
+        """
+        t0 = time.perf_counter()
+        generated = datetime.now()
+        file_alerts = self._file_alerts()
+        jobs = self.plan(dates)
+
+        missing_jobs = {id(j) for j in jobs if not j["workbook"].exists() or j["sheet"] is None}
+        chunks = self._chunks([j for j in jobs if id(j) not in missing_jobs])
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="ReportLoad") as loaders:
+            validated, loads = self._validate_chunks(chunks, loaders)
+            for fut in loads:
+                fut.result()
+        done = {(res["workbook"], res["sheet"]): res for res in validated}
+
+        results: list[dict] = []
+        for job in jobs:
+            if id(job) in missing_jobs:
+                reason = "File Not Found" if not job["workbook"].exists() else f"Inget blad för {job['date']}"
+                res = _failed(job, reason)
+            else:
+                res = done[(job["workbook"], job["sheet"])]
+                METRICS.observe("report.sheet", res["ms"])
+            self._check_days(res)
+            results.append(res)
+
+        alerts = list(file_alerts)
+        if self.engine._day_data_err:
+            alerts.append({"source": "DAY_FILES", "msg": "Fel vid laddning av day files",
+                           "val": self.engine._day_data_err, "exp": "Inga fel"})
+        multi = len(results) > 1
+        for res in results:
+            for alert in res["alerts"]:
+                alert = dict(alert, workbook=res["workbook"].name, sheet=res["sheet"], date=res["date"])
+                if multi:
+                    alert["source"] = f"[{res['sheet'] or res['date']}] {alert['source']}"
+                alerts.append(alert)
+        if not self.engine.weights_ok:
+            alerts.append({"source": "WEIGHTS", "msg": "Weights-fil kunde inte laddas",
+                           "val": self.engine.weights_err or "Okänt fel", "exp": "OK"})
+
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        METRICS.observe("report.total", elapsed_ms)
+        print(f"[Report] {len(results)} sheets in {elapsed_ms:.0f} ms ({len(chunks)} workbook reads)")
+        return {
+            "generated": generated,
+            "data_dir": DATA_DIR,
+            "alerts": alerts,
+            "sheets": results,
+            "day_files_error": self.engine._day_data_err,
+            "weights_ok": self.engine.weights_ok,
+            "elapsed_ms": round(elapsed_ms, 1),
+        }
+
+
+# ============================================================================
+# Output
+# ============================================================================
+
+def write_text(report: dict, path: Path) -> Path:
+    """Swedish text report in the rapport.txt layout."""
+    alerts = report["alerts"]
+    sheets = report["sheets"]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("=" * 60 + "\n")
+        f.write("  ONYX TERMINAL - ALERT RAPPORT\n")
+        f.write("=" * 60 + "\n")
+        f.write(f"Genererad: {report['generated']:%Y-%m-%d %H:%M:%S}\n")
+        f.write(f"Data-katalog: {report['data_dir']}\n")
+        if len(sheets) > 1:
+            failed = sum(1 for s in sheets if not s["ok"])
+            f.write(f"Blad: {len(sheets)} ({failed} med alerts)\n")
+        f.write("\n")
+
+        if not alerts:
+            f.write("✓ INGA AKTIVA ALERTS\n")
+            f.write("Alla valideringar godkända.\n")
+        else:
+            f.write(f"⚠ ANTAL AKTIVA ALERTS: {len(alerts)}\n")
+            f.write("-" * 60 + "\n\n")
+
+            for i, alert in enumerate(alerts, 1):
+                f.write(f"Alert #{i}\n")
+                f.write(f"  Källa:     {alert['source']}\n")
+                f.write(f"  Meddelande: {alert['msg']}\n")
+                f.write(f"  Värde:     {alert['val']}\n")
+                f.write(f"  Förväntat: {alert['exp']}\n")
+                f.write("\n")
+
+        f.write("-" * 60 + "\n")
+        f.write("Slut på rapport\n")
+    return path
+
+
+def write_json(report: dict, path: Path) -> Path:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+    return path
+
+
+def write_csv(report: dict, path: Path) -> Path:
+    """One row per alert; report-level alerts have no workbook/sheet."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for alert in report["alerts"]:
+            writer.writerow({k: alert.get(k, "") for k in CSV_COLUMNS})
+    return path
+
+
+WRITERS = {"text": (write_text, "txt"), "json": (write_json, "json"), "csv": (write_csv, "csv")}
+
+
+def write_report(report: dict, out_dir: Path, formats: list[str], stem: str = "rapport") -> list[Path]:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        writer, ext = WRITERS[fmt]
+        paths.append(writer(report, out_dir / f"{stem}.{ext}"))
+    return paths
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Onyx Terminal alert reports")
+    parser.add_argument("--dates", nargs="*", help="YYYY-MM-DD or YYYY-MM-DD:YYYY-MM-DD (default: latest sheet)")
+    parser.add_argument("--workbook", nargs="*", type=Path, help="Fixing workbooks (default RECON_FILE)")
+    parser.add_argument("--format", nargs="*", default=["text"], choices=sorted(WRITERS), help="Output formats")
+    parser.add_argument("--out", type=Path, default=APP_DIR, help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for long runs")
+    parser.add_argument("--days", action="store_true", help="Also check day counts against the day calendar")
+    args = parser.parse_args(argv)
+
+    engine = ReportEngine(workbooks=args.workbook, workers=args.workers, check_days=args.days)
+    report = engine.run(args.dates)
+    for path in write_report(report, args.out, args.format):
+        print(f"[Report] Written {path}")
+    print(f"Antal aktiva alerts: {len(report['alerts'])}")
+    return 1 if report["alerts"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
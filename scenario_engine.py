@@ -0,0 +1,203 @@
+"""
+Scenario Engine for NOK implied funding rates.
+Evaluates bumped spot/pips/CM rate/weight inputs in vectorized form and
+returns sensitivity grids and per-tenor DV01-style deltas.
+"""
+import time
+
+import numpy as np
+
+from config import FUNDING_SPREADS
+from funding_model import FUNDING_TENORS, resolve_weights
+
+# Per-tenor inputs, same keys as DashboardPage stores in app.funding_calc_data
+INPUT_KEYS = [
+    "eur_spot", "eur_pips", "eur_rate", "eur_days",
+    "usd_spot", "usd_pips", "usd_rate", "usd_days",
+    "nok_cm",
+]
+
+# Factors bumped by dv01(); spot is bumped relatively (bp of spot), pips in pips, rates in bp
+DV01_FACTORS = ["eur_spot", "usd_spot", "eur_pips", "usd_pips", "eur_rate", "usd_rate", "nok_cm"]
+
+
+def implied_yield_vec(spot, pips, base_rate, days) -> np.ndarray:
+    """
+    Vectorized calc_implied_yield.
+
+    All arguments broadcast against each other. Invalid inputs
+    (missing values, days <= 0, zero spot) give NaN instead of None.
+    """
+    spot = np.asarray(spot, dtype=float)
+    pips = np.asarray(pips, dtype=float)
+    base_rate = np.asarray(base_rate, dtype=float)
+    days = np.asarray(days, dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fwd_price = spot + pips / 10000.0
+        base_factor = 1.0 + (base_rate * days) / 36000.0
+        term_factor = (fwd_price / spot) * base_factor
+        r_nok = (term_factor - 1.0) * (36000.0 / days)
+
+    valid = (days > 0) & (spot != 0)
+    return np.where(valid, r_nok, np.nan)
+
+
+def funding_rate_vec(eur_implied, usd_implied, nok_cm, w_eur, w_usd, w_nok) -> np.ndarray:
+    """Vectorized calc_funding_rate (weights as decimals)."""
+    return (np.asarray(eur_implied, dtype=float) * w_eur +
+            np.asarray(usd_implied, dtype=float) * w_usd +
+            np.asarray(nok_cm, dtype=float) * w_nok)
+
+
+class ScenarioEngine:
+    """
+    What-if engine for final funding rates (funding rate + FUNDING_SPREADS).
+
+    Base inputs are one dict per tenor with INPUT_KEYS. Tenors with missing
+    inputs stay in the output as NaN so array shapes are stable.
+    """
+
+    def __init__(self, base_inputs: dict[str, dict], weights: dict, spreads: dict | None = None):
+        self.weights = {k: float(weights.get(k, 0.0)) for k in ("EUR", "USD", "NOK")}
+        self.spreads = dict(spreads if spreads is not None else FUNDING_SPREADS)
+        self.tenors = [t for t in FUNDING_TENORS if t in base_inputs]
+
+        # One float array per input key, aligned with self.tenors
+        self._base = {}
+        for key in INPUT_KEYS:
+            vals = []
+            for t in self.tenors:
+                v = (base_inputs.get(t) or {}).get(key)
+                vals.append(np.nan if v is None else float(v))
+            self._base[key] = np.array(vals, dtype=float)
+
+        self._spread = np.array([float(self.spreads.get(t, 0.20)) for t in self.tenors], dtype=float)
+
+    @classmethod
+    def from_funding_data(cls, funding_calc_data: dict, excel_engine=None) -> "ScenarioEngine":
+        """
+        Build engine from the funding model's per-tenor breakdown (app.funding_calc_data).
+
+        Uses the weights the breakdown was computed with; without any, the
+        weights resolve_weights() gives for `excel_engine`.
+        """
+        weights = None
+        for data in (funding_calc_data or {}).values():
+            if data and data.get("weights"):
+                weights = data["weights"]
+                break
+        if weights is None:
+            weights = resolve_weights(excel_engine)
+        return cls(funding_calc_data or {}, weights)
+
+    def _final_rates(self, inp: dict, w_eur, w_usd, w_nok) -> np.ndarray:
+        eur_impl = implied_yield_vec(inp["eur_spot"], inp["eur_pips"], inp["eur_rate"], inp["eur_days"])
+        usd_impl = implied_yield_vec(inp["usd_spot"], inp["usd_pips"], inp["usd_rate"], inp["usd_days"])
+        funding = funding_rate_vec(eur_impl, usd_impl, inp["nok_cm"], w_eur, w_usd, w_nok)
+        return funding + self._spread
+
+    def base_rates(self) -> dict[str, float | None]:
+        """Unshocked final rate per tenor."""
+        w = self.weights
+        final = self._final_rates(self._base, w["EUR"], w["USD"], w["NOK"])
+        return {t: (None if np.isnan(v) else float(v)) for t, v in zip(self.tenors, final)}
+
+    def run_grid(self, spot_shifts_pct=(0.0,), pips_shifts=(0.0,), rate_shifts_bp=(0.0,),
+                 weight_shifts=({"USD": 0.0, "EUR": 0.0},)) -> dict:
+        """
+        Evaluate the full cartesian product of shocks.
+
+        Args:
+            spot_shifts_pct: Relative spot moves in percent, applied to EURNOK and USDNOK
+            pips_shifts: Parallel forward-pip shifts (in pips)
+            rate_shifts_bp: Parallel CM rate shifts in bp (EUR CM, USD CM and NOK CM)
+            weight_shifts: Weight changes as {"USD": d, "EUR": d} decimals, NOK absorbs the rest
+
+        Returns:
+            Dict with axes, "final" array of shape
+            (spot, pips, rate, weight, tenor) and "change_bp" versus base.
+        """
+        t0 = time.perf_counter()
+
+        spot = np.asarray(spot_shifts_pct, dtype=float).reshape(-1, 1, 1, 1, 1)
+        pips = np.asarray(pips_shifts, dtype=float).reshape(1, -1, 1, 1, 1)
+        rate = np.asarray(rate_shifts_bp, dtype=float).reshape(1, 1, -1, 1, 1)
+
+        d_usd = np.array([float(w.get("USD", 0.0)) for w in weight_shifts], dtype=float)
+        d_eur = np.array([float(w.get("EUR", 0.0)) for w in weight_shifts], dtype=float)
+        w_usd = (self.weights["USD"] + d_usd).reshape(1, 1, 1, -1, 1)
+        w_eur = (self.weights["EUR"] + d_eur).reshape(1, 1, 1, -1, 1)
+        w_nok = (self.weights["NOK"] - d_usd - d_eur).reshape(1, 1, 1, -1, 1)
+
+        b = self._base
+        inp = {
+            "eur_spot": b["eur_spot"] * (1.0 + spot / 100.0),
+            "usd_spot": b["usd_spot"] * (1.0 + spot / 100.0),
+            "eur_pips": b["eur_pips"] + pips,
+            "usd_pips": b["usd_pips"] + pips,
+            "eur_rate": b["eur_rate"] + rate / 100.0,
+            "usd_rate": b["usd_rate"] + rate / 100.0,
+            "nok_cm": b["nok_cm"] + rate / 100.0,
+            "eur_days": b["eur_days"],
+            "usd_days": b["usd_days"],
+        }
+
+        final = self._final_rates(inp, w_eur, w_usd, w_nok)
+        # Broadcast up to the full grid even when some axes only touch part of the formula
+        final = np.broadcast_to(final, (spot.size, pips.size, rate.size, len(weight_shifts), len(self.tenors)))
+
+        w = self.weights
+        base = self._final_rates(self._base, w["EUR"], w["USD"], w["NOK"])
+        change_bp = (final - base) * 100.0
+
+        return {
+            "tenors": list(self.tenors),
+            "axes": {
+                "spot_pct": np.asarray(spot_shifts_pct, dtype=float),
+                "pips": np.asarray(pips_shifts, dtype=float),
+                "rate_bp": np.asarray(rate_shifts_bp, dtype=float),
+                "weights": [dict(w) for w in weight_shifts],
+            },
+            "base": base,
+            "final": final,
+            "change_bp": change_bp,
+            "scenarios": int(final.size // max(1, len(self.tenors))),
+            "elapsed_ms": int(round((time.perf_counter() - t0) * 1000)),
+        }
+
+    def dv01(self, bump: float = 1.0) -> dict[str, dict[str, float | None]]:
+        """
+        Per-tenor sensitivities of the final rate, in bp per unit bump.
+
+        Rates are bumped by `bump` bp, pips by `bump` pips and spots by
+        `bump` bp of their level. Uses central differences, evaluated in one pass.
+        """
+        n_f = len(DV01_FACTORS)
+        sign = np.concatenate([np.ones(n_f), -np.ones(n_f)]).reshape(-1, 1)
+
+        inp = {}
+        for key in INPUT_KEYS:
+            base = np.broadcast_to(self._base[key], (2 * n_f, len(self.tenors))).copy()
+            if key in DV01_FACTORS:
+                i = DV01_FACTORS.index(key)
+                rows = [i, i + n_f]
+                if key.endswith("_spot"):
+                    base[rows] = base[rows] * (1.0 + sign[rows] * bump / 10000.0)
+                elif key.endswith("_pips"):
+                    base[rows] = base[rows] + sign[rows] * bump
+                else:
+                    base[rows] = base[rows] + sign[rows] * bump / 100.0
+            inp[key] = base
+
+        w = self.weights
+        final = self._final_rates(inp, w["EUR"], w["USD"], w["NOK"])
+        deltas = (final[:n_f] - final[n_f:]) / 2.0 * 100.0
+
+        out = {}
+        for j, tenor in enumerate(self.tenors):
+            out[tenor] = {
+                f: (None if np.isnan(deltas[i, j]) else float(deltas[i, j]))
+                for i, f in enumerate(DV01_FACTORS)
+            }
+        return out
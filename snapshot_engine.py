@@ -3,18 +3,27 @@ Snapshot Engine for daily JSON exports.
 Handles serialization of Bloomberg and Excel data.
 """
 import json
-from datetime import datetime
+from datetime import datetime, date, timedelta
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from config import BASE_HISTORY_PATH
+from config import BASE_HISTORY_PATH, CHART_LOOKBACK_DAYS
+from metrics import METRICS
+
+# Tenor -> NIBOR ticker used for the history chart
+NIBOR_CHART_TICKERS = {
+    "1M": "NKCM1M SWET Curncy",
+    "2M": "NKCM2M SWET Curncy",
+    "3M": "NKCM3M SWET Curncy",
+    "6M": "NKCM6M SWET Curncy"
+}
 
 
 class SnapshotEngine:
     """Manages daily JSON snapshots for Nibor rates and Swedbank contributions."""
 
-    def __init__(self):
-        self.base_path = BASE_HISTORY_PATH
+    def __init__(self, base_path: Path | None = None):
+        self.base_path = Path(base_path) if base_path else BASE_HISTORY_PATH
 
     def save_daily_snapshot(
         self,
@@ -61,7 +70,7 @@ class SnapshotEngine:
             }
 
             # Write JSON (pretty-printed for human readability)
-            with open(file_path, 'w', encoding='utf-8') as f:
+            with METRICS.timer("snapshot.save"), open(file_path, 'w', encoding='utf-8') as f:
                 json.dump(snapshot, f, indent=2, ensure_ascii=False)
 
             return True, f"Snapshot saved: {file_path}"
@@ -79,6 +88,8 @@ class SnapshotEngine:
         }
 
         for ticker, data in raw_data.items():
+            # MarketSnapshot quotes -> plain dicts for JSON
+            data = data.to_dict() if hasattr(data, "to_dict") else data
             if "NKCM" in ticker and "SWET" in ticker:
                 categorized["nibor_rates"][ticker] = data
             elif "F033" in ticker and ("NOK" in ticker or "NKEU" in ticker):
@@ -101,7 +112,7 @@ class SnapshotEngine:
             if not file_path.exists():
                 return None
 
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with METRICS.timer("snapshot.load"), open(file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
 
         except json.JSONDecodeError:
@@ -110,6 +121,53 @@ class SnapshotEngine:
         except Exception:
             return None
 
+    def _intraday_path(self, date_str: str) -> Path:
+        year = datetime.strptime(date_str, "%Y-%m-%d").year
+        return self.base_path / str(year) / "intraday" / f"{date_str}.jsonl"
+
+    def append_intraday_record(self, bloomberg_data: Dict[str, Any], ts: datetime | None = None) -> bool:
+        """
+        Append one market fetch to the day's intraday log (one JSON object per line).
+
+        Args:
+            bloomberg_data: MarketSnapshot (or {ticker: {"price", "change", "time"}}) from BloombergEngine
+            ts: Fetch time (default: now)
+
+        Returns:
+            True if written
+        """
+        ts = ts or datetime.now()
+        if hasattr(bloomberg_data, "to_dict"):
+            bloomberg_data = bloomberg_data.to_dict()
+        try:
+            file_path = self._intraday_path(ts.strftime("%Y-%m-%d"))
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            line = json.dumps({"ts": ts.isoformat(timespec="seconds"), "data": bloomberg_data}, ensure_ascii=False)
+            with open(file_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            return True
+        except Exception as e:
+            print(f"[Snapshot] Intraday record failed: {e}")
+            return False
+
+    def load_intraday_records(self, date_str: str) -> list[tuple[datetime, Dict[str, Any]]]:
+        """Intraday fetches for a date as [(timestamp, {ticker: data})], oldest first."""
+        file_path = self._intraday_path(date_str)
+        if not file_path.exists():
+            return []
+
+        records = []
+        with METRICS.timer("snapshot.load"), open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                    records.append((datetime.fromisoformat(rec["ts"]), rec["data"]))
+                except (ValueError, KeyError, TypeError):
+                    # Partially written last line or hand-edited file
+                    continue
+        records.sort(key=lambda r: r[0])
+        return records
+
     def list_available_snapshots(self, year: int) -> list[str]:
         """List all snapshot dates for a given year."""
         daily_dir = self.base_path / str(year) / "daily"
@@ -123,3 +181,33 @@ class SnapshotEngine:
             snapshots.append(date_str)
 
         return snapshots
+
+    def load_nibor_history(self, lookback_days: int = CHART_LOOKBACK_DAYS,
+                           today: date | None = None) -> tuple[list[date], Dict[str, list]]:
+        """
+        NIBOR fixings from the daily snapshots of the last `lookback_days` days.
+
+        Args:
+            lookback_days: Number of calendar days before `today` to include
+            today: Last day to include (default: today)
+
+        Returns:
+            (dates with a snapshot, {tenor: [price or None per date]})
+        """
+        today = today or datetime.now().date()
+        dates = []
+        rates_by_tenor = {tenor: [] for tenor in NIBOR_CHART_TICKERS}
+
+        for i in range(lookback_days, -1, -1):
+            check_date = today - timedelta(days=i)
+            snapshot = self.load_snapshot(check_date.strftime("%Y-%m-%d"))
+            if not snapshot:
+                continue
+
+            dates.append(check_date)
+            nibor_rates = snapshot.get("bloomberg", {}).get("nibor_rates", {})
+            for tenor, ticker in NIBOR_CHART_TICKERS.items():
+                rates_by_tenor[tenor].append(nibor_rates.get(ticker, {}).get("price"))
+
+        METRICS.set_gauge("snapshot.history_days", len(dates))
+        return dates, rates_by_tenor
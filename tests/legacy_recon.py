@@ -0,0 +1,292 @@
+"""
+Reference copy of the recon table logic from before recon_engine existed
+(OnyxTerminalTK.build_recon_rows), with the app state it read passed in
+and the state it wrote returned. Used to check that ReconModel produces
+the same rows, alerts and statuses.
+"""
+from openpyxl.utils import coordinate_to_tuple
+
+from config import (
+    RULES_DB, RECON_MAPPING, DAYS_MAPPING, SWET_CM_RECON_MAPPING,
+    WEIGHTS_FILE, WEIGHTS_FILE_CELLS, WEIGHTS_MODEL_CELLS
+)
+from utils import fmt_date, safe_float, to_date, business_day_index_in_month, calendar_days_since_month_start
+
+
+def legacy_build_recon_rows(excel_data: dict, market_data: dict, days_data: dict, weights_ok: bool,
+                            weights_parsed: dict, today_d, view: str = "ALL") -> dict:
+    """
+    Returns:
+        {"rows", "alerts", "status", "group_health", "weights_state", "criteria_stats"}
+    """
+    def get_recon_value(cell_ref):
+        try:
+            return excel_data.get(coordinate_to_tuple(cell_ref), None)
+        except Exception:
+            return None
+
+    rows_out = []
+    alerts = []
+    status = {}
+    group_health = {}
+    state = {"weights_state": None, "criteria_stats": None}
+
+    TOL_SPOT = 0.0005
+    TOL_FWDS = 0.0005
+    TOL_W = 1e-9
+
+    def add_section(title):
+        rows_out.append({"values": [title, "", "", "", "", ""], "style": "section"})
+
+    def add_row(cell, desc, model, market, diff, ok, style_override=None):
+        mark = "✔" if ok else "✘"
+        style = style_override if style_override else ("good" if ok and view != "ALL" else ("normal" if ok else "bad"))
+        rows_out.append({"values": [cell, desc, model, market, diff, mark], "style": style})
+        return ok
+
+    def collect_market_section(title, filter_prefixes, tol):
+        add_section(title)
+        section_ok = True
+        market_ready = bool(market_data)
+
+        for cell, desc, ticker in RECON_MAPPING:
+            if not any(cell.startswith(p) for p in filter_prefixes):
+                continue
+
+            model_val = excel_data.get(coordinate_to_tuple(cell), None)
+
+            if not market_ready:
+                add_row(cell, desc, str(model_val), "-", "-", True)
+                continue
+
+            market_inf = market_data.get(ticker)
+            if not market_inf:
+                section_ok = False
+                add_row(cell, desc, str(model_val), "-", "-", False)
+                if view == "ALL":
+                    alerts.append({"source": cell, "msg": f"{desc} Missing ticker", "val": "-", "exp": ticker})
+                continue
+
+            market_val = float(market_inf.get("price", 0.0))
+            mf = safe_float(model_val, 0.0)
+            diff = mf - market_val
+            ok = abs(diff) < tol
+            section_ok = section_ok and ok
+
+            add_row(cell, desc, f"{mf:,.6f}", f"{market_val:,.6f}", f"{diff:+.6f}", ok)
+
+            if view == "ALL" and not ok:
+                alerts.append({"source": cell, "msg": f"{desc} Diff", "val": f"{diff:+.6f}", "exp": f"±{tol}"})
+        return section_ok
+
+    if view in ("ALL", "SPOT"):
+        ok_n = collect_market_section("EURNOK SPOT", ["N"], TOL_SPOT)
+        ok_s = collect_market_section("USDNOK SPOT", ["S"], TOL_SPOT)
+        if view == "ALL":
+            status["spot"] = (ok_n and ok_s) if market_data else True
+
+    if view in ("ALL", "FWDS"):
+        ok_o = collect_market_section("EURNOK FORWARDS", ["O"], TOL_FWDS)
+        ok_t = collect_market_section("USDNOK FORWARDS", ["T"], TOL_FWDS)
+        if view == "ALL":
+            status["fwds"] = (ok_o and ok_t) if market_data else True
+
+    if view in ("ALL", "DAYS"):
+        add_section("DAYS VALIDATION")
+        days_ok = True
+        for cell, desc, key in DAYS_MAPPING:
+            model_val = excel_data.get(coordinate_to_tuple(cell), None)
+            ref_val = (days_data or {}).get(key, None)
+            try:
+                mi = int(model_val)
+                ri = int(ref_val)
+                diff = mi - ri
+                ok = (diff == 0)
+                days_ok = days_ok and ok
+                add_row(cell, desc, str(mi), str(ri), str(diff), ok)
+                if view == "ALL" and not ok:
+                    alerts.append({"source": cell, "msg": f"{desc} Mismatch", "val": str(mi), "exp": str(ri)})
+            except Exception:
+                days_ok = False
+                add_row(cell, desc, str(model_val), str(ref_val), "-", False)
+                if view == "ALL":
+                    alerts.append({"source": cell, "msg": f"{desc} Parse error", "val": str(model_val), "exp": str(ref_val)})
+        if view == "ALL":
+            status["days"] = days_ok
+            group_health["DAYS"] = "OK" if days_ok else "CHECK"
+
+    if view in ("ALL", "CELLS"):
+        add_section("EXCEL CONSISTENCY CHECKS")
+        cells_ok = True
+        criteria_stats = {
+            "exact": {"passed": 0, "failed": 0},
+            "rounded": {"passed": 0, "failed": 0},
+            "range": {"passed": 0, "failed": 0},
+            "fixed": {"passed": 0, "failed": 0}
+        }
+
+        for rule in RULES_DB:
+            rule_id, top_cell, ref_target, logic, msg = rule
+            val_top = get_recon_value(top_cell)
+            val_bot = "-"
+            ok = False
+            criteria_type = "exact"
+
+            try:
+                if logic == "Exakt Match":
+                    criteria_type = "exact"
+                    val_bot = get_recon_value(ref_target)
+                    try:
+                        ok = abs(float(val_top) - float(val_bot)) < 0.000001
+                    except Exception:
+                        ok = (str(val_top).strip() == str(val_bot).strip())
+
+                elif logic == "Avrundat 2 dec":
+                    criteria_type = "rounded"
+                    val_bot = get_recon_value(ref_target)
+                    ok = abs(round(float(val_top), 2) - round(float(val_bot), 2)) < 0.000001
+
+                elif "-" in logic and logic[0].isdigit():
+                    criteria_type = "range"
+                    a, b = logic.split("-")
+                    ok = float(a) <= float(val_top) <= float(b)
+                    val_bot = f"Range {logic}"
+
+                elif "Exakt" in logic:
+                    criteria_type = "fixed"
+                    target = float(logic.split()[1].replace(",", "."))
+                    ok = abs(float(val_top) - target) < 0.000001
+                    val_bot = f"== {target}"
+            except Exception:
+                ok = False
+
+            criteria_stats[criteria_type]["passed" if ok else "failed"] += 1
+            cells_ok = cells_ok and ok
+
+            show = (view == "CELLS") or (view == "ALL" and not ok)
+            if show:
+                add_row(top_cell, msg, str(val_top), str(val_bot), "-", ok)
+
+            if view == "ALL" and not ok:
+                alerts.append({"source": top_cell, "msg": msg, "val": str(val_top), "exp": str(val_bot)})
+
+        if view == "ALL":
+            status["cells"] = cells_ok
+            group_health["CELLS"] = "OK" if cells_ok else "CHECK"
+            state["criteria_stats"] = criteria_stats
+
+    if view in ("ALL", "WEIGHTS"):
+        add_section("WEIGHTS — FILE VS MODEL (MONTHLY)")
+
+        bday_idx = business_day_index_in_month(today_d)
+        cal_days = calendar_days_since_month_start(today_d)
+
+        model_date = to_date(get_recon_value(WEIGHTS_MODEL_CELLS["DATE"]))
+        model_usd = safe_float(get_recon_value(WEIGHTS_MODEL_CELLS["USD"]), None)
+        model_eur = safe_float(get_recon_value(WEIGHTS_MODEL_CELLS["EUR"]), None)
+        model_nok = safe_float(get_recon_value(WEIGHTS_MODEL_CELLS["NOK"]), None)
+
+        if not weights_ok:
+            status["weights"] = False
+            state["weights_state"] = "FAIL"
+            group_health["WEIGHTS"] = "FAIL | Weights.xlsx not readable"
+
+            add_row("WEIGHTS.xlsx", "Weights file not available", "-", "-", "-", False)
+            if view == "ALL":
+                alerts.append({"source": "WEIGHTS.xlsx", "msg": "Weights file missing/unreadable", "val": "-", "exp": str(WEIGHTS_FILE)})
+        else:
+            p = weights_parsed or {}
+            file_usd = p.get("USD")
+            file_eur = p.get("EUR")
+            file_nok = p.get("NOK")
+
+            date_ok = True
+            for label in ("H3", "H4", "H5", "H6"):
+                dval = p.get(label)
+                if label != "H3" and dval is None:
+                    continue
+                ok = (model_date is not None and dval is not None and model_date == dval)
+                date_ok = date_ok and ok
+                add_row(f"{WEIGHTS_MODEL_CELLS['DATE']} ↔ {label}", f"Weights effective date ({label} in Weights.xlsx)",
+                        fmt_date(model_date), fmt_date(dval), "" if ok else "DIFF", ok)
+                if view == "ALL" and not ok:
+                    alerts.append({"source": "WEIGHTS DATE", "msg": f"Date mismatch ({label})", "val": fmt_date(model_date), "exp": fmt_date(dval)})
+
+            w_ok = True
+
+            def w_cmp(name, model_val, file_val, model_cell, file_cell):
+                nonlocal w_ok
+                if model_val is None or file_val is None:
+                    ok = False
+                    diff = "-"
+                else:
+                    diffv = float(model_val) - float(file_val)
+                    ok = abs(diffv) <= TOL_W
+                    diff = f"{diffv:+.6f}"
+                w_ok = w_ok and ok
+                add_row(f"{model_cell} ↔ {file_cell}", f"{name} weight",
+                        "-" if model_val is None else f"{float(model_val):.6f}",
+                        "-" if file_val is None else f"{float(file_val):.6f}", diff, ok)
+                if view == "ALL" and not ok:
+                    alerts.append({"source": f"WEIGHTS {name}", "msg": f"{name} weight mismatch", "val": str(model_val), "exp": str(file_val)})
+
+            w_cmp("USD", model_usd, file_usd, WEIGHTS_MODEL_CELLS["USD"], WEIGHTS_FILE_CELLS["USD"])
+            w_cmp("EUR", model_eur, file_eur, WEIGHTS_MODEL_CELLS["EUR"], WEIGHTS_FILE_CELLS["EUR"])
+            w_cmp("NOK", model_nok, file_nok, WEIGHTS_MODEL_CELLS["NOK"], WEIGHTS_FILE_CELLS["NOK"])
+
+            sum_file = None
+            if file_usd is not None and file_eur is not None and file_nok is not None:
+                sum_file = float(file_usd) + float(file_eur) + float(file_nok)
+
+            weights_match_ok = bool(date_ok and w_ok)
+            status["weights"] = weights_match_ok
+
+            updated_this_month = False
+            if weights_match_ok and model_date is not None:
+                updated_this_month = (model_date.year == today_d.year and model_date.month == today_d.month)
+
+            if not weights_match_ok:
+                state["weights_state"] = "FAIL"
+                group_health["WEIGHTS"] = "FAIL | Mismatch"
+            elif updated_this_month:
+                state["weights_state"] = "OK"
+                sf = "-" if sum_file is None else f"{sum_file:.3f}"
+                group_health["WEIGHTS"] = f"OK | Updated {fmt_date(model_date)} | Sum {sf}"
+            elif bday_idx >= 5:
+                state["weights_state"] = "ALERT"
+                group_health["WEIGHTS"] = f"ALERT | Not updated | BDay {bday_idx}/5 | {cal_days} days"
+                if view == "ALL":
+                    alerts.append({
+                        "source": "WEIGHTS",
+                        "msg": f"ALERT: Weights not updated (BDay {bday_idx}/5)",
+                        "val": fmt_date(model_date),
+                        "exp": f"Update required in {today_d.strftime('%Y-%m')}"
+                    })
+            else:
+                state["weights_state"] = "PENDING"
+                group_health["WEIGHTS"] = f"SOON | Update weights | BDay {bday_idx}/5 | {cal_days} days"
+
+    if view == "ALL" and SWET_CM_RECON_MAPPING:
+        add_section("SWET CM (MODEL VS MARKET)")
+        cm_ok = True
+        market_ready = bool(market_data)
+        for cell, desc, ticker in SWET_CM_RECON_MAPPING:
+            model_val = excel_data.get(coordinate_to_tuple(cell), None)
+            if not market_ready:
+                add_row(cell, desc, str(model_val), "-", "-", True)
+                continue
+            mi = safe_float(model_val, 0.0)
+            inf = market_data.get(ticker)
+            if not inf:
+                cm_ok = False
+                add_row(cell, desc, str(model_val), "-", "-", False)
+                alerts.append({"source": cell, "msg": f"{desc} Missing ticker", "val": "-", "exp": ticker})
+                continue
+            mv = float(inf.get("price", 0.0))
+            diff = mi - mv
+            ok = abs(diff) < 0.0005
+            cm_ok = cm_ok and ok
+            add_row(cell, desc, f"{mi:,.6f}", f"{mv:,.6f}", f"{diff:+.6f}", ok)
+        group_health["SWETCM"] = "OK" if cm_ok else "CHECK"
+
+    return {"rows": rows_out, "alerts": alerts, "status": status, "group_health": group_health, **state}
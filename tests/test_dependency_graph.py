@@ -0,0 +1,102 @@
+import pytest
+
+from dependency_graph import DependencyGraph
+
+
+def _graph(calls):
+    g = DependencyGraph()
+    g.add_input("a")
+    g.add_input("b")
+
+    def double(a):
+        calls.append("double")
+        return a * 2
+
+    def total(double, b):
+        calls.append("total")
+        return double + b
+
+    def b_only(b):
+        calls.append("b_only")
+        return -b
+
+    g.add_node("double", double, ["a"])
+    g.add_node("total", total, ["double", "b"])
+    g.add_node("b_only", b_only, ["b"])
+    return g
+
+
+def test_first_evaluate_runs_every_node():
+    calls = []
+    g = _graph(calls)
+    g.set_input("a", 1, "a1")
+    g.set_input("b", 10, "b1")
+    assert g.evaluate() == {"double": 2, "total": 12, "b_only": -10}
+    assert calls == ["double", "total", "b_only"]
+
+
+def test_same_token_skips_even_if_value_changed():
+    calls = []
+    g = _graph(calls)
+    g.set_input("a", 1, "a1")
+    g.set_input("b", 10, "b1")
+    g.evaluate()
+    calls.clear()
+
+    # Only the token counts: a new value under the old token is not a change
+    assert g.set_input("a", 5, "a1") is False
+    assert g.dirty_nodes() == []
+    g.evaluate()
+    assert calls == []
+    assert g.timings()["double"]["skips"] == 1
+
+
+def test_changed_token_recomputes_only_dependents():
+    calls = []
+    g = _graph(calls)
+    g.set_input("a", 1, "a1")
+    g.set_input("b", 10, "b1")
+    g.evaluate()
+    calls.clear()
+
+    assert g.set_input("a", 3, "a2") is True
+    assert g.dirty_nodes() == ["double", "total"]
+    assert g.evaluate() == {"double": 6, "total": 16, "b_only": -10}
+    assert calls == ["double", "total"]
+
+    calls.clear()
+    g.set_input("b", 1, "b2")
+    g.evaluate()
+    assert calls == ["total", "b_only"]
+
+
+def test_targets_limit_evaluation_to_their_closure():
+    calls = []
+    g = _graph(calls)
+    g.set_input("a", 1, "a1")
+    g.set_input("b", 10, "b1")
+    assert g.evaluate(["double"]) == {"double": 2}
+    assert calls == ["double"]
+    assert g.dirty_nodes() == ["total", "b_only"]
+
+
+def test_failing_node_records_error_and_yields_none():
+    g = DependencyGraph()
+    g.add_input("x")
+    g.add_node("boom", lambda x: 1 / x, ["x"])
+    g.set_input("x", 0, 1)
+    assert g.evaluate() == {"boom": None}
+    assert "division" in g.timings()["boom"]["error"]
+
+    g.set_input("x", 4, 2)
+    assert g.evaluate() == {"boom": 0.25}
+    assert g.timings()["boom"]["error"] is None
+
+
+def test_unknown_dependency_and_duplicates_are_rejected():
+    g = DependencyGraph()
+    g.add_input("x")
+    with pytest.raises(ValueError):
+        g.add_node("n", lambda y: y, ["y"])
+    with pytest.raises(ValueError):
+        g.add_input("x")
@@ -0,0 +1,55 @@
+import shutil
+
+import pytest
+
+from config import DAY_FILES
+from engines import ExcelEngine
+
+
+@pytest.fixture
+def day_file(tmp_path):
+    src = next((p for p in reversed(DAY_FILES) if p.exists()), None)
+    if src is None:
+        pytest.skip("day files not available")
+    return src, tmp_path / src.name
+
+
+def test_each_load_resolves_its_own_generation(day_file):
+    src, path = day_file
+    shutil.copy(src, path)
+    engine = ExcelEngine(day_files=[path], load_days=False, weights_history_file=None)
+    first = engine.ready("days")
+    assert not first.done()
+
+    engine.reload_days()
+    assert first.result() is True and engine.ready("days") is first
+
+    engine.reload_days()
+    second = engine.ready("days")
+    assert second is not first and second.result() is True
+
+
+def test_holders_of_a_failed_generation_see_the_retry_through_ready(day_file, monkeypatch):
+    src, path = day_file
+    shutil.copy(src, path)
+    engine = ExcelEngine(day_files=[path], load_days=False, weights_history_file=None)
+    failed = engine.ready("days")
+
+    def _boom(value):
+        raise RuntimeError("calendar broken")
+    monkeypatch.setattr("engines.to_date", _boom)
+    engine.reload_days()
+    monkeypatch.undo()
+    assert failed.result() is False
+    assert not engine.wait_ready("days", timeout=0)
+    assert engine.ready("days") is failed
+
+    seen = []
+    engine._begin_load("days")
+    retry = engine.ready("days")
+    retry.add_done_callback(lambda fut: seen.append(fut.result()))
+    assert not retry.done()
+    engine.reload_days()
+    assert seen == [True] and failed.result() is False
+    assert engine.wait_ready("days", timeout=0) and engine._day_data_err is None
+    assert engine.day_rows
@@ -0,0 +1,81 @@
+import os
+import time
+
+from file_watcher import FileWatcher
+
+
+def _touch(path, content: bytes, mtime_ns: int):
+    path.write_bytes(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_change_is_reported_once_after_it_settles(tmp_path, monkeypatch):
+    recon = tmp_path / "recon.xlsx"
+    weights = tmp_path / "weights.xlsx"
+    _touch(recon, b"v1", 1_000_000_000)
+    _touch(weights, b"w1", 1_000_000_000)
+
+    clock = [100.0]
+    monkeypatch.setattr("file_watcher.time.monotonic", lambda: clock[0])
+    watcher = FileWatcher({"recon": [recon], "weights": [weights]}, on_change=None,
+                          debounce=2.0, use_inotify=False)
+    assert watcher.check() == set()
+
+    # Excel writes in bursts: every new signature restarts the debounce window
+    _touch(recon, b"v2-partial", 2_000_000_000)
+    assert watcher.check() == set()
+    clock[0] += 1.5
+    _touch(recon, b"v2-complete", 3_000_000_000)
+    assert watcher.check() == set()
+    clock[0] += 1.5
+    assert watcher.check() == set()
+
+    clock[0] += 0.6
+    assert watcher.check() == {"recon"}
+    # Reported once; nothing further until the file changes again
+    clock[0] += 5.0
+    assert watcher.check() == set()
+
+
+def test_reverted_change_is_dropped(tmp_path, monkeypatch):
+    path = tmp_path / "days.xlsx"
+    _touch(path, b"a", 1_000_000_000)
+    clock = [0.0]
+    monkeypatch.setattr("file_watcher.time.monotonic", lambda: clock[0])
+    watcher = FileWatcher({"days": [path]}, on_change=None, debounce=1.0, use_inotify=False)
+
+    _touch(path, b"bb", 2_000_000_000)
+    assert watcher.check() == set()
+    _touch(path, b"a", 1_000_000_000)
+    clock[0] += 5.0
+    assert watcher.check() == set()
+
+
+def test_groups_sharing_a_file_are_reported_together(tmp_path, monkeypatch):
+    path = tmp_path / "shared.xlsx"
+    _touch(path, b"a", 1_000_000_000)
+    clock = [0.0]
+    monkeypatch.setattr("file_watcher.time.monotonic", lambda: clock[0])
+    watcher = FileWatcher({"recon": [path], "weights": [path]}, on_change=None, debounce=1.0,
+                          use_inotify=False)
+    _touch(path, b"b", 2_000_000_000)
+    watcher.check()
+    clock[0] += 1.0
+    assert watcher.check() == {"recon", "weights"}
+
+
+def test_thread_calls_on_change(tmp_path):
+    path = tmp_path / "recon.xlsx"
+    _touch(path, b"a", 1_000_000_000)
+    seen = []
+    watcher = FileWatcher({"recon": [path]}, on_change=seen.append, interval=0.02, debounce=0.05,
+                          use_inotify=False)
+    watcher.start()
+    try:
+        _touch(path, b"b", 2_000_000_000)
+        deadline = time.monotonic() + 2.0
+        while not seen and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        watcher.stop()
+    assert seen == [{"recon"}]
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from engines import BloombergEngine
+from market_providers import FetchIncomplete
+
+
+class ScriptedProvider:
+    """
+    Answers fetches from a list of steps: a dict result, or ("partial", dict)
+    to hold the provider until `overrun` seconds past the deadline and then
+    time out with that dict.
+    """
+
+    name = "scripted"
+    mock = True
+
+    def __init__(self, steps, overrun: float = 0.0):
+        self.steps = list(steps)
+        self.overrun = overrun
+
+    def start(self):
+        pass
+
+    def fetch(self, tickers, fields, deadline=None, cancel=None):
+        step = self.steps.pop(0)
+        if isinstance(step, tuple):
+            while deadline is not None and time.monotonic() < deadline + self.overrun:
+                time.sleep(0.01)
+            raise FetchIncomplete(step[1], "timeout")
+        return step
+
+
+def _fetch(engine, tickers):
+    done = threading.Event()
+    out = {}
+
+    def on_data(data, meta):
+        out.update(data=data, meta=meta)
+        done.set()
+
+    def on_error(err):
+        out.update(error=err)
+        done.set()
+
+    engine.fetch_snapshot(tickers, on_data, on_error)
+    return done, out
+
+
+def test_queued_request_behind_timed_out_fetch_gets_last_complete_snapshot():
+    full = {"A": (1.0, 0.0, "10:00"), "B": (2.0, 0.0, "10:00")}
+    engine = BloombergEngine(cache_ttl_sec=0.0, timeout_sec=0.3,
+                             provider=ScriptedProvider([full, ("partial", {"A": (9.0, 0.0, "10:01")})],
+                                                       overrun=0.2))
+
+    done, out = _fetch(engine, ["A", "B"])
+    assert done.wait(2.0)
+    complete = out["data"]
+    assert not out["meta"]["timed_out"]
+
+    # A times out holding the provider; B (different key) is still queued at its own deadline
+    partial_done, partial = _fetch(engine, ["A", "B"])
+    time.sleep(0.05)
+    queued_done, queued = _fetch(engine, ["A"])
+    assert partial_done.wait(2.0) and queued_done.wait(2.0)
+
+    assert partial["meta"]["timed_out"]
+    assert partial["data"]["A"]["price"] == 9.0
+    assert "B" not in partial["data"]
+
+    assert queued["meta"]["timed_out"]
+    assert queued["data"] is complete
+    assert engine.store.latest() is complete
+    assert [s.version for s in engine.store.history()] == [complete.version]
+
+
+def test_partial_result_is_not_cached():
+    full = {"A": (1.0, 0.0, "10:00")}
+    engine = BloombergEngine(cache_ttl_sec=60.0, timeout_sec=0.2,
+                             provider=ScriptedProvider([("partial", {}), full]))
+
+    done, out = _fetch(engine, ["A"])
+    assert done.wait(2.0) and out["meta"]["timed_out"]
+
+    done, out = _fetch(engine, ["A"])
+    assert done.wait(2.0)
+    assert not out["meta"]["from_cache"]
+    assert out["data"]["A"]["price"] == 1.0
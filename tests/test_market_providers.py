@@ -0,0 +1,95 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from market_providers import (
+    BlpapiProvider, FetchIncomplete, RandomWalkProvider, ReplayProvider, StaticDefaultsProvider
+)
+from mock_market import LatencyProfile, MockBlpapi, MockMarketService
+
+TICKERS = ("AAA Curncy", "BBB Curncy", "CCC Curncy")
+FIELDS = ["PX_LAST", "CHG_NET_1D", "LAST_UPDATE"]
+BASE = {"AAA Curncy": 10.0, "BBB Curncy": 20.0, "CCC Curncy": 30.0}
+
+
+def test_static_defaults_answer_every_ticker():
+    res = StaticDefaultsProvider({"AAA Curncy": 11.5}, delay_ms=0).fetch(TICKERS, FIELDS)
+    assert set(res) == set(TICKERS)
+    assert res["AAA Curncy"][0] == 11.5
+    assert res["BBB Curncy"][0] == 1.0
+
+
+def test_random_walk_moves_once_per_fetch_and_is_seeded():
+    a = RandomWalkProvider(BASE, seed=3, delay_ms=0)
+    b = RandomWalkProvider(BASE, seed=3, delay_ms=0)
+    first = a.fetch(TICKERS, FIELDS)
+    second = a.fetch(TICKERS, FIELDS)
+    assert first != second
+    assert b.fetch(TICKERS, FIELDS) == first
+
+
+def _frames(n):
+    t0 = datetime(2026, 3, 2, 9, 0)
+    return [(t0 + timedelta(minutes=i), {"AAA Curncy": {"price": 10.0 + i}}) for i in range(n)]
+
+
+def test_replay_steps_one_frame_per_fetch_at_speed_zero():
+    replay = ReplayProvider(_frames(3), speed=0)
+    prices = []
+    for _ in range(4):
+        prices.append(replay.fetch(("AAA Curncy", "BBB Curncy"), FIELDS)["AAA Curncy"][0])
+    assert prices == [10.0, 11.0, 12.0, 12.0]
+    assert replay.finished
+    assert replay.as_of == _frames(3)[-1][0]
+
+
+def test_replay_loop_wraps_around():
+    replay = ReplayProvider(_frames(2), speed=0, loop=True)
+    prices = [replay.fetch(("AAA Curncy",), FIELDS)["AAA Curncy"][0] for _ in range(3)]
+    assert prices == [10.0, 11.0, 10.0]
+    assert not replay.finished
+
+
+def test_replay_needs_frames():
+    with pytest.raises(ValueError):
+        ReplayProvider([])
+
+
+def _chunked_api(gap_ms):
+    profile = LatencyProfile("chunked", chunk=1, chunk_gap_ms=gap_ms)
+    return MockBlpapi(MockMarketService(seed=1, base_prices=BASE, profile=profile))
+
+
+def test_blpapi_complete_response():
+    res = BlpapiProvider(_chunked_api(0)).fetch(TICKERS, FIELDS, deadline=time.monotonic() + 2)
+    assert set(res) == set(TICKERS)
+
+
+def test_blpapi_deadline_returns_what_arrived():
+    provider = BlpapiProvider(_chunked_api(300))
+    with pytest.raises(FetchIncomplete) as exc:
+        provider.fetch(TICKERS, FIELDS, deadline=time.monotonic() + 0.15)
+    assert exc.value.reason == "timeout"
+    assert set(exc.value.partial) == {"AAA Curncy"}
+
+    # The abandoned request's late chunks do not leak into the next one
+    res = provider.fetch(TICKERS, FIELDS, deadline=time.monotonic() + 2)
+    assert set(res) == set(TICKERS)
+
+
+def test_blpapi_cancel_stops_the_request():
+    provider = BlpapiProvider(_chunked_api(300))
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    t0 = time.monotonic()
+    with pytest.raises(FetchIncomplete) as exc:
+        provider.fetch(TICKERS, FIELDS, cancel=cancel)
+    assert exc.value.reason == "cancelled"
+    assert time.monotonic() - t0 < 0.5
+
+
+def test_blpapi_without_api_raises():
+    with pytest.raises(RuntimeError):
+        BlpapiProvider(None).fetch(TICKERS, FIELDS)
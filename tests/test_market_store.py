@@ -0,0 +1,63 @@
+import math
+
+import pytest
+
+from market_store import MarketDataStore, MarketSnapshot, Quote
+
+
+def test_snapshot_reads_like_the_old_dicts():
+    store = MarketDataStore(tickers=["A", "B", "C"])
+    snap = store.publish({"A": (1.5, 0.1, "10:00"), "B": {"price": 2.0, "change": None, "time": None}})
+
+    assert isinstance(snap, MarketSnapshot)
+    assert len(snap) == 2 and list(snap) == ["A", "B"]
+    assert "C" not in snap and snap.get("C") is None
+    assert snap["A"]["price"] == 1.5 and snap["A"].get("time") == "10:00"
+    assert snap["B"] == {"price": 2.0, "change": 0.0, "time": ""}
+    assert dict(snap["A"]) == {"price": 1.5, "change": 0.1, "time": "10:00"}
+    assert snap.price("A") == 1.5 and snap.price("C", -1.0) == -1.0
+    assert snap.to_dict() == {"A": {"price": 1.5, "change": 0.1, "time": "10:00"},
+                              "B": {"price": 2.0, "change": 0.0, "time": ""}}
+
+
+def test_published_snapshots_are_immutable_and_unaffected_by_later_publishes():
+    store = MarketDataStore(tickers=["A"])
+    first = store.publish({"A": (1.0, 0.0, "10:00")})
+    second = store.publish({"A": (2.0, 1.0, "10:01"), "NEW": (3.0, 0.0, "10:01")})
+
+    with pytest.raises(AttributeError):
+        first["A"].price = 9.0
+    with pytest.raises(TypeError):
+        first["A"] = Quote(9.0, 0.0, "")
+
+    # The store grew an ordinal for NEW; the older snapshot does not see it
+    assert first["A"].price == 1.0 and "NEW" not in first and len(first) == 1
+    assert second["A"].price == 2.0 and second["NEW"].price == 3.0
+    assert (first.version, second.version) == (1, 2)
+
+
+def test_latest_history_and_detached_snapshots():
+    store = MarketDataStore(tickers=["A"], keep=2)
+    assert len(store.latest()) == 0 and store.latest().version == 0
+
+    snaps = [store.publish({"A": (float(i), 0.0, "")}) for i in range(3)]
+    assert store.latest() is snaps[-1]
+    assert store.history() == snaps[1:]
+
+    partial = store.publish({}, record=False)
+    assert partial.version == 4
+    assert store.latest() is snaps[-1]
+    assert store.history() == snaps[1:]
+
+
+def test_publishing_a_snapshot_returns_it_unchanged():
+    store = MarketDataStore(tickers=["A"])
+    snap = store.publish({"A": (1.0, 0.0, "")})
+    assert store.publish(snap) is snap
+    assert store.version == 1
+
+
+def test_missing_price_is_stored_as_zero_not_nan():
+    store = MarketDataStore(tickers=["A"])
+    snap = store.publish({"A": {"price": None}})
+    assert snap["A"].price == 0.0 and not math.isnan(snap["A"].change)
@@ -0,0 +1,74 @@
+import pytest
+
+from metrics import LatencyHistogram, MetricsRegistry
+
+
+def test_empty_histogram():
+    h = LatencyHistogram()
+    assert h.percentile(50) is None
+    assert h.snapshot() == {"count": 0}
+
+
+def test_small_values_are_exact():
+    h = LatencyHistogram()
+    for us in range(1, 11):
+        h.record(us / 1000.0)
+    assert h.percentile(50) == pytest.approx(0.005)
+    assert h.percentile(90) == pytest.approx(0.009)
+    assert h.percentile(100) == pytest.approx(0.010)
+    assert h.percentile(0) == pytest.approx(0.001)
+
+
+def test_percentiles_within_bucket_error():
+    h = LatencyHistogram()
+    values = [i * 0.5 for i in range(1, 2001)]  # 0.5 .. 1000 ms
+    for v in values:
+        h.record(v)
+
+    for p in (50, 90, 99, 99.9):
+        exact = values[int(round(p / 100.0 * len(values))) - 1]
+        assert h.percentile(p) == pytest.approx(exact, rel=1 / 32)
+
+    snap = h.snapshot()
+    assert snap["count"] == 2000
+    assert snap["min_ms"] == 0.5 and snap["max_ms"] == 1000.0
+    assert snap["mean_ms"] == pytest.approx(sum(values) / len(values), rel=1e-6)
+
+
+def test_percentiles_are_clamped_to_observed_range():
+    h = LatencyHistogram()
+    h.record(100.0)
+    assert h.percentile(1) == 100.0
+    assert h.percentile(99) == 100.0
+
+
+def test_registry_counters_gauges_and_timer():
+    m = MetricsRegistry()
+    m.inc("a")
+    m.inc("a", 2)
+    m.set_gauge("g", 7)
+    with pytest.raises(RuntimeError):
+        with m.timer("t"):
+            raise RuntimeError("boom")
+    snap = m.snapshot()
+    assert snap["counters"] == {"a": 3}
+    assert snap["gauges"] == {"g": 7}
+    assert snap["histograms"]["t"]["count"] == 1
+
+    m.reset()
+    assert m.snapshot()["counters"] == {} and m.histogram("t").count == 0
+
+
+def test_report_lists_counters_and_gauges_in_their_own_sections():
+    reg = MetricsRegistry()
+    reg.observe("recon.evaluate", 2.0)
+    reg.inc("market.timeouts")
+    reg.set_gauge("excel.day_rows", 252)
+    lines = reg.report().splitlines()
+    latency = next(i for i, l in enumerate(lines) if "Latency (ms)" in l)
+    counters = lines.index("[Metrics] Counters:")
+    gauges = lines.index("[Metrics] Gauges:")
+    assert latency < counters < gauges
+    assert any("recon.evaluate" in l for l in lines[latency:counters])
+    assert any("market.timeouts" in l for l in lines[counters:gauges])
+    assert any("excel.day_rows" in l for l in lines[gauges:])
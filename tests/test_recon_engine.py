@@ -0,0 +1,127 @@
+import threading
+from datetime import date
+
+import pytest
+from openpyxl.utils import coordinate_to_tuple
+
+from config import DAY_FILES, RECON_FILE, RECON_MAPPING, WEIGHTS_FILE
+from engines import ExcelEngine
+from recon_engine import RECON_INPUTS, VIEW_SECTIONS, ReconModel
+from tests.legacy_recon import legacy_build_recon_rows
+
+TODAY = date(2026, 3, 2)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    if not RECON_FILE.exists():
+        pytest.skip("recon workbook not available")
+    ee = ExcelEngine(RECON_FILE, WEIGHTS_FILE, DAY_FILES, load_days=False, weights_history_file=None)
+    ok, msg = ee.load_recon_direct()
+    assert ok, msg
+    ee.load_weights_file()
+    ee.reload_days()
+    return ee
+
+
+def _excel_market(engine) -> dict:
+    """Market data that matches the workbook exactly."""
+    market = {}
+    for cell, _desc, ticker in RECON_MAPPING:
+        value = engine.recon_data.get(coordinate_to_tuple(cell))
+        if value is not None:
+            market.setdefault(ticker, {"price": float(value)})
+    return market
+
+
+def _inputs(engine, market: dict, tag: str) -> dict:
+    cells = dict(engine.recon_data)
+    days = engine.get_days_for_date(TODAY.isoformat()) or {}
+    return {
+        "excel_cells": (cells, ("cells", engine.last_loaded_ts)),
+        "recon_data": (cells, ("recon", engine.last_loaded_ts)),
+        "market": (market, tag),
+        "day_calendar": (days, TODAY),
+        "weights_file": ({"ok": engine.weights_ok, "parsed": dict(engine.weights_cells_parsed)},
+                         engine.weights_last_loaded_ts),
+        "today": (TODAY, TODAY),
+    }
+
+
+def _markets(engine) -> dict:
+    exact = _excel_market(engine)
+    perturbed = {t: {"price": v["price"] + 0.01} for t, v in exact.items()}
+    perturbed.pop(next(iter(perturbed)))
+    return {"empty": {}, "exact": exact, "perturbed": perturbed}
+
+
+@pytest.mark.parametrize("case", ["empty", "exact", "perturbed"])
+def test_matches_legacy_build_recon_rows(engine, case):
+    market = _markets(engine)[case]
+    result = ReconModel().evaluate(_inputs(engine, market, case))
+    days = engine.get_days_for_date(TODAY.isoformat()) or {}
+    assert days, "day calendar has no row for the test date"
+
+    def legacy(view):
+        return legacy_build_recon_rows(dict(engine.recon_data), market, days, engine.weights_ok,
+                                       dict(engine.weights_cells_parsed), TODAY, view)
+
+    for view in VIEW_SECTIONS:
+        assert list(result.rows_for(view)) == legacy(view)["rows"], view
+
+    ref = legacy("ALL")
+    assert list(result.alerts) == ref["alerts"]
+    assert dict(result.group_health) == ref["group_health"]
+    assert result.weights_state == ref["weights_state"]
+    assert dict(result.criteria_stats) == ref["criteria_stats"]
+    for name, ok in ref["status"].items():
+        assert result.status[name] == ok, name
+
+
+def test_perturbed_market_fails_spot_and_fwds(engine):
+    markets = _markets(engine)
+    exact = ReconModel().evaluate(_inputs(engine, markets["exact"], "exact"))
+    perturbed = ReconModel().evaluate(_inputs(engine, markets["perturbed"], "perturbed"))
+    assert exact.status["spot"] and exact.status["fwds"]
+    assert not (perturbed.status["spot"] and perturbed.status["fwds"])
+    assert any("Missing ticker" in a["msg"] for a in perturbed.alerts)
+
+
+def test_result_is_immutable(engine):
+    result = ReconModel().evaluate(_inputs(engine, {}, "empty"))
+    with pytest.raises(AttributeError):
+        result.status = {}
+    with pytest.raises(TypeError):
+        result.status["spot"] = False
+    with pytest.raises(TypeError):
+        result.sections["spot"] = {}
+    assert isinstance(result.rows, tuple)
+
+
+def test_compute_async_skips_current_version_and_reports_errors(engine):
+    model = ReconModel()
+    inputs = _inputs(engine, {}, "empty")
+    done = threading.Event()
+    results = []
+    assert model.compute_async(inputs, lambda r: (results.append(r), done.set()))
+    assert done.wait(10)
+    assert model.current() is results[0]
+    assert results[0].version == tuple(inputs[name][1] for name in RECON_INPUTS)
+    assert not model.compute_async(inputs, results.append)
+
+    # A failing node is isolated to its section...
+    broken = ReconModel().evaluate(dict(inputs, today=(None, "broken")))
+    assert broken.status["weights"] is False
+    assert broken.rows_for("SPOT") == results[0].rows_for("SPOT")
+
+    # ...while a failure of the evaluation itself goes to on_error
+    def _boom():
+        raise RuntimeError("graph exploded")
+    model._graph.evaluate = _boom
+    errors = []
+    failed = threading.Event()
+    bumped = dict(inputs, market=({}, "bumped"))
+    assert model.compute_async(bumped, results.append, on_error=lambda e: (errors.append(e), failed.set()))
+    assert failed.wait(10)
+    assert errors == ["graph exploded"] and len(results) == 1
+    assert model.current() is results[0]
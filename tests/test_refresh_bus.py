@@ -0,0 +1,52 @@
+from refresh_bus import (
+    RefreshBus, REFRESH_STARTED, EXCEL_LOADED, VALIDATED, FAILED, TERMINAL_EVENTS
+)
+
+
+def test_subscribers_get_event_and_payload_in_order():
+    bus = RefreshBus()
+    seen = []
+    bus.subscribe([REFRESH_STARTED, VALIDATED], lambda e, p: seen.append((e, p)))
+    bus.emit(REFRESH_STARTED, date="2026-03-02")
+    bus.emit(EXCEL_LOADED, ok=True)
+    bus.emit(VALIDATED, alerts=0)
+    assert seen == [(REFRESH_STARTED, {"date": "2026-03-02"}), (VALIDATED, {"alerts": 0})]
+    assert bus.last(EXCEL_LOADED) == {"ok": True}
+
+
+def test_once_subscription_fires_for_the_first_listed_event_only():
+    bus = RefreshBus()
+    seen = []
+    bus.subscribe(TERMINAL_EVENTS, lambda e, p: seen.append(e), once=True)
+    bus.emit(FAILED, error="x")
+    bus.emit(VALIDATED)
+    assert seen == [FAILED]
+
+
+def test_unsubscribe_and_failing_subscriber():
+    bus = RefreshBus()
+    seen = []
+    token = bus.subscribe(VALIDATED, lambda e, p: seen.append("removed"))
+    bus.subscribe(VALIDATED, lambda e, p: 1 / 0)
+    bus.subscribe(VALIDATED, lambda e, p: seen.append("kept"))
+    bus.unsubscribe(token)
+    bus.emit(VALIDATED)
+    assert seen == ["kept"]
+
+
+def test_wait_for_resolves_at_the_next_terminal_event():
+    bus = RefreshBus()
+    fut = bus.wait_for()
+    bus.emit(REFRESH_STARTED)
+    assert not fut.done()
+    bus.emit(VALIDATED, alerts=2)
+    assert fut.result(0) == (VALIDATED, {"alerts": 2})
+
+
+def test_unknown_event_is_rejected():
+    bus = RefreshBus()
+    try:
+        bus.subscribe("nope", lambda e, p: None)
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
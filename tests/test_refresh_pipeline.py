@@ -0,0 +1,86 @@
+import threading
+import time
+
+from refresh_pipeline import RefreshOrchestrator, STAGE_MARKET, STAGE_RECON, STAGE_WEIGHTS
+
+
+class FakeExcel:
+    def __init__(self, delay=0.1, recon_ok=True):
+        self.delay = delay
+        self.recon_ok = recon_ok
+        self.weights_err = None
+
+    def load_recon_direct(self, include_weights=False, force=False):
+        time.sleep(self.delay)
+        if not self.recon_ok:
+            raise RuntimeError("locked")
+        return True, "ok"
+
+    def load_weights_file(self):
+        time.sleep(self.delay)
+        return True
+
+
+class FakeMarket:
+    timeout_sec = 0.2
+
+    def __init__(self, delay=0.1, respond=True):
+        self.delay = delay
+        self.respond = respond
+        self.cancelled = False
+
+    def fetch_snapshot(self, tickers, on_data, on_error, fields=None):
+        def _run():
+            time.sleep(self.delay)
+            if self.respond:
+                on_data({t: {"price": 1.0} for t in tickers}, {"responded_count": len(tickers)})
+        threading.Thread(target=_run, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def test_stages_run_in_parallel_and_excel_is_delivered_first():
+    order = []
+    orch = RefreshOrchestrator(FakeExcel(delay=0.15), FakeMarket(delay=0.15))
+    t0 = time.perf_counter()
+    trace = orch.run(tickers=["A", "B"],
+                     on_excel=lambda ok, msg: order.append(("excel", ok)),
+                     on_market=lambda data, meta, err: order.append(("market", len(data), err)),
+                     on_done=lambda tr: order.append(("done",)))
+    elapsed = time.perf_counter() - t0
+
+    assert order == [("excel", True), ("market", 2, None), ("done",)]
+    assert elapsed < 0.4
+    stages = trace.as_dict()["stages"]
+    assert set(stages) == {STAGE_RECON, STAGE_WEIGHTS, STAGE_MARKET}
+    assert all(st["ok"] for st in stages.values())
+    assert stages[STAGE_MARKET]["detail"] == "2 tickers"
+    assert trace.stage_sum_ms() > trace.total_ms
+
+
+def test_failed_recon_stage_is_reported_not_raised():
+    results = []
+    trace = RefreshOrchestrator(FakeExcel(delay=0.0, recon_ok=False)).run(
+        on_excel=lambda ok, msg: results.append((ok, msg)))
+    assert results == [(False, "locked")]
+    assert trace.as_dict()["stages"][STAGE_RECON]["ok"] is False
+
+
+def test_market_error_skips_the_fetch():
+    market = FakeMarket()
+    got = []
+    RefreshOrchestrator(FakeExcel(delay=0.0), market).run(
+        tickers=["A"], market_error="BLPAPI not installed",
+        on_market=lambda data, meta, err: got.append((data, err)))
+    assert got == [({}, "BLPAPI not installed")]
+
+
+def test_market_timeout_cancels_the_fetch():
+    market = FakeMarket(respond=False)
+    got = []
+    trace = RefreshOrchestrator(FakeExcel(delay=0.0), market).run(
+        tickers=["A"], market_timeout=0.1, on_market=lambda data, meta, err: got.append(err))
+    assert market.cancelled
+    assert got and "timed out" in got[0]
+    assert trace.as_dict()["stages"][STAGE_MARKET]["ok"] is False
@@ -0,0 +1,75 @@
+import csv
+import json
+
+import pytest
+
+from config import RECON_FILE, RULES_DB
+from report_engine import ReportEngine, write_report
+
+
+@pytest.fixture(scope="module")
+def report_engine():
+    if not RECON_FILE.exists():
+        pytest.skip("recon workbook not available")
+    return ReportEngine(workers=2)
+
+
+def test_plan_picks_latest_sheet_and_marks_missing_dates(report_engine):
+    latest = report_engine.plan()
+    assert len(latest) == 1 and latest[0]["sheet"]
+
+    jobs = report_engine.plan(["1999-01-04"])
+    assert jobs == [{"workbook": RECON_FILE, "sheet": None, "date": "1999-01-04"}]
+
+
+def test_range_plan_has_one_sheet_per_day(report_engine):
+    dated = [j for j in report_engine.plan(["2000-01-01:2100-12-31"])]
+    dates = [j["date"] for j in dated]
+    assert dates == sorted(set(dates))
+    assert all(j["sheet"] for j in dated)
+
+
+def test_run_checks_every_rule(report_engine):
+    report = report_engine.run()
+    (sheet,) = report["sheets"]
+    assert sheet["rules_passed"] + sheet["rules_failed"] == len(RULES_DB)
+    assert sheet["ok"] == (not sheet["alerts"])
+    assert report["weights_ok"] == report_engine.engine.weights_ok
+
+
+def test_multi_sheet_run_matches_single_sheet_runs(report_engine):
+    jobs = report_engine.plan(["2000-01-01:2100-12-31"])[-3:]
+    dates = [j["date"] for j in jobs]
+    combined = report_engine.run(dates)
+    assert [s["date"] for s in combined["sheets"]] == dates
+    for date, sheet in zip(dates, combined["sheets"]):
+        (single,) = report_engine.run([date])["sheets"]
+        assert (single["rules_passed"], single["alerts"]) == (sheet["rules_passed"], sheet["alerts"])
+
+
+def test_missing_sheet_becomes_an_alert(report_engine):
+    report = report_engine.run(["1999-01-04"])
+    (sheet,) = report["sheets"]
+    assert not sheet["ok"] and "1999-01-04" in sheet["alerts"][0]["val"]
+
+
+def test_writers(report_engine, tmp_path):
+    report = report_engine.run()
+    txt, js, cs = write_report(report, tmp_path, ["text", "json", "csv"])
+    assert "ALERT RAPPORT" in txt.read_text(encoding="utf-8")
+    assert len(json.loads(js.read_text(encoding="utf-8"))["alerts"]) == len(report["alerts"])
+    with open(cs, encoding="utf-8", newline="") as f:
+        assert len(list(csv.DictReader(f))) == len(report["alerts"])
+
+
+def test_worker_processes_match_the_in_process_run(monkeypatch):
+    if not RECON_FILE.exists():
+        pytest.skip("recon workbook not available")
+    dates = ["2000-01-01:2100-12-31"]
+    local = ReportEngine(workers=1, check_days=True).run(dates)
+
+    monkeypatch.setattr("report_engine.MIN_CHUNK_SHEETS", 8)
+    pooled = ReportEngine(workers=2, check_days=True).run(dates)
+    strip = lambda sheets: [{k: v for k, v in s.items() if k != "ms"} for s in sheets]
+    assert strip(pooled["sheets"]) == strip(local["sheets"])
+    assert [a["source"] for a in pooled["alerts"]] == [a["source"] for a in local["alerts"]]
@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+from calculations import calc_funding_rate, calc_implied_yield
+from config import FUNDING_SPREADS
+from scenario_engine import ScenarioEngine
+
+WEIGHTS = {"USD": 0.45, "EUR": 0.05, "NOK": 0.50}
+
+BASE = {
+    "1w": {"eur_spot": 11.71, "eur_pips": 6.5, "eur_rate": 2.95, "eur_days": 7,
+           "usd_spot": 10.84, "usd_pips": 2.1, "usd_rate": 4.31, "usd_days": 7, "nok_cm": 4.48},
+    "1m": {"eur_spot": 11.71, "eur_pips": 28.0, "eur_rate": 3.02, "eur_days": 30,
+           "usd_spot": 10.84, "usd_pips": 9.4, "usd_rate": 4.33, "usd_days": 30, "nok_cm": 4.52},
+    "3m": {"eur_spot": 11.71, "eur_pips": 82.0, "eur_rate": 3.10, "eur_days": 91,
+           "usd_spot": 10.84, "usd_pips": 27.5, "usd_rate": 4.35, "usd_days": 91, "nok_cm": 4.60},
+    "6m": {"eur_spot": 11.71, "eur_pips": 160.0, "eur_rate": 3.18, "eur_days": 182,
+           "usd_spot": 10.84, "usd_pips": 52.0, "usd_rate": 4.38, "usd_days": 182, "nok_cm": 4.70},
+}
+
+
+def scalar_final(inp: dict, tenor: str, weights: dict, spot_pct=0.0, pips=0.0, rate_bp=0.0) -> float:
+    """Final rate through the scalar calculations, with the same shocks as run_grid."""
+    spot_f = 1.0 + spot_pct / 100.0
+    rate = rate_bp / 100.0
+    eur = calc_implied_yield(inp["eur_spot"] * spot_f, inp["eur_pips"] + pips, inp["eur_rate"] + rate, inp["eur_days"])
+    usd = calc_implied_yield(inp["usd_spot"] * spot_f, inp["usd_pips"] + pips, inp["usd_rate"] + rate, inp["usd_days"])
+    return calc_funding_rate(eur, usd, inp["nok_cm"] + rate, weights) + FUNDING_SPREADS[tenor]
+
+
+def test_base_rates_match_scalar():
+    engine = ScenarioEngine(BASE, WEIGHTS)
+    for tenor, rate in engine.base_rates().items():
+        assert rate == pytest.approx(scalar_final(BASE[tenor], tenor, WEIGHTS), abs=1e-12)
+
+
+@pytest.mark.parametrize("spot_pct, pips, rate_bp", [(0.0, 0.0, 0.0), (1.5, 0.0, 0.0), (0.0, -12.0, 0.0),
+                                                     (0.0, 0.0, 25.0), (-2.0, 8.0, -10.0)])
+def test_grid_points_match_scalar(spot_pct, pips, rate_bp):
+    engine = ScenarioEngine(BASE, WEIGHTS)
+    out = engine.run_grid([spot_pct], [pips], [rate_bp])
+    for j, tenor in enumerate(out["tenors"]):
+        expected = scalar_final(BASE[tenor], tenor, WEIGHTS, spot_pct, pips, rate_bp)
+        assert out["final"][0, 0, 0, 0, j] == pytest.approx(expected, abs=1e-12)
+
+
+def test_weight_shift_matches_scalar():
+    engine = ScenarioEngine(BASE, WEIGHTS)
+    out = engine.run_grid(weight_shifts=[{"USD": 0.05, "EUR": -0.02}])
+    shifted = {"USD": 0.50, "EUR": 0.03, "NOK": 0.47}
+    for j, tenor in enumerate(out["tenors"]):
+        assert out["final"][0, 0, 0, 0, j] == pytest.approx(scalar_final(BASE[tenor], tenor, shifted), abs=1e-12)
+
+
+def test_dv01_matches_scalar_central_difference():
+    engine = ScenarioEngine(BASE, WEIGHTS)
+    dv01 = engine.dv01()
+    for tenor in BASE:
+        up = scalar_final(BASE[tenor], tenor, WEIGHTS, rate_bp=1.0)
+        down = scalar_final(BASE[tenor], tenor, WEIGHTS, rate_bp=-1.0)
+        parallel = (up - down) / 2.0 * 100.0
+        rates = dv01[tenor]
+        assert rates["eur_rate"] + rates["usd_rate"] + rates["nok_cm"] == pytest.approx(parallel, abs=1e-9)
+
+
+def test_missing_inputs_give_nan_not_errors():
+    engine = ScenarioEngine({"1m": dict(BASE["1m"], usd_days=None)}, WEIGHTS)
+    assert engine.base_rates() == {"1m": None}
+    assert math.isnan(engine.run_grid()["final"][0, 0, 0, 0, 0])
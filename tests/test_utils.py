@@ -0,0 +1,42 @@
+import os
+import time
+from pathlib import Path
+
+import utils
+
+
+def _copy(cache_dir, name, size, age_hours):
+    p = cache_dir / name
+    p.write_bytes(b"x" * size)
+    t = time.time() - age_hours * 3600
+    os.utime(p, (t, t))
+    return p
+
+
+def test_evict_copy_cache_skips_keep_and_files_it_cannot_delete(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "CACHE_DIR", tmp_path)
+    old = _copy(tmp_path, "COPY_old.xlsx", 10, 48)
+    kept = _copy(tmp_path, "COPY_kept.xlsx", 10, 48)
+    locked = _copy(tmp_path, "COPY_locked.xlsx", 10, 48)
+    fresh = _copy(tmp_path, "COPY_fresh.xlsx", 10, 0)
+    part = _copy(tmp_path, "COPY_x.xlsx.part", 10, 48)
+
+    real_unlink = Path.unlink
+
+    def _unlink(self, *args, **kwargs):
+        if self.name == locked.name:
+            raise PermissionError("in use")
+        return real_unlink(self, *args, **kwargs)
+    monkeypatch.setattr(Path, "unlink", _unlink)
+
+    assert utils.evict_copy_cache(max_mb=1, max_age_hours=24, keep=kept) == 1
+    assert not old.exists()
+    assert kept.exists() and locked.exists() and fresh.exists() and part.exists()
+
+
+def test_evict_copy_cache_trims_least_recently_used_to_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "CACHE_DIR", tmp_path)
+    oldest = _copy(tmp_path, "COPY_a.xlsx", 600_000, 3)
+    newer = _copy(tmp_path, "COPY_b.xlsx", 600_000, 2)
+    assert utils.evict_copy_cache(max_mb=1, max_age_hours=24) == 1
+    assert not oldest.exists() and newer.exists()
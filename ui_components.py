@@ -6,11 +6,6 @@ import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
 
-import matplotlib
-matplotlib.use('TkAgg')
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
 from config import THEME, CURRENT_MODE
 from utils import fmt_ts, LogoPipelineTK
 
@@ -241,17 +236,43 @@ class DataTableTree(tk.Frame):
         self._row_idx += 1
 
 
+def _load_matplotlib():
+    """Import matplotlib on first use; it is the single most expensive import in the app."""
+    import matplotlib
+    matplotlib.use('TkAgg')
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    return Figure, FigureCanvasTkAgg
+
+
 class TimeSeriesChartTK(tk.Frame):
     """
     Matplotlib chart component for displaying historical Nibor rates.
     Embedded in Tkinter using FigureCanvasTkAgg.
+
+    The figure (and matplotlib itself) is created shortly after the widget
+    is first shown, so it never delays the first window paint. Plots
+    requested before that are replayed once the figure exists.
     """
 
-    def __init__(self, master, title: str = "NIBOR HISTORICAL RATES"):
+    def __init__(self, master, title: str = "NIBOR HISTORICAL RATES", build_delay_ms: int = 150):
         super().__init__(master, bg=THEME["bg_card"],
                         highlightthickness=1, highlightbackground=THEME["border"])
 
         self.title = title
+        self.fig = None
+        self._pending = None
+
+        self._placeholder = tk.Label(self, text="Loading chart…", fg=THEME["muted"], bg=THEME["bg_card"],
+                                     font=("Segoe UI", CURRENT_MODE["body"]))
+        self._placeholder.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.after(build_delay_ms, self._build_figure)
+
+    def _build_figure(self):
+        if self.fig is not None:
+            return
+        Figure, FigureCanvasTkAgg = _load_matplotlib()
 
         # Create figure with dark theme
         self.fig = Figure(figsize=(10, 4), dpi=100, facecolor=THEME["bg_card"])
@@ -266,12 +287,17 @@ class TimeSeriesChartTK(tk.Frame):
         self.ax.spines['right'].set_color(THEME["border"])
 
         # Embed in Tkinter
+        self._placeholder.destroy()
         self.canvas = FigureCanvasTkAgg(self.fig, master=self)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # Initialize with empty message
-        self.clear_chart()
+        # Replay the last request, or initialize with empty message
+        pending, self._pending = self._pending, None
+        if pending:
+            self.plot_nibor_history(*pending)
+        else:
+            self.clear_chart()
 
     def plot_nibor_history(self, dates: list, rates_by_tenor: dict):
         """
@@ -281,6 +307,9 @@ class TimeSeriesChartTK(tk.Frame):
             dates: List of datetime objects
             rates_by_tenor: Dict like {"1M": [4.6, 4.55, ...], "3M": [...]}
         """
+        if self.fig is None:
+            self._pending = (dates, rates_by_tenor)
+            return
         self.ax.clear()
 
         # Color mapping for tenors
@@ -332,6 +361,9 @@ class TimeSeriesChartTK(tk.Frame):
 
     def clear_chart(self):
         """Clear the chart and show 'No data available' message."""
+        if self.fig is None:
+            self._pending = None
+            return
         self.ax.clear()
         self.ax.text(0.5, 0.5, "No historical data available",
                     ha='center', va='center',
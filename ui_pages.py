@@ -5,10 +5,10 @@ Contains all specific page views.
 import tkinter as tk
 from tkinter import ttk
 
-from config import THEME, CURRENT_MODE, RULES_DB, MARKET_STRUCTURE
+from config import THEME, CURRENT_MODE, RULES_DB, MARKET_STRUCTURE, METRICS_JSON_FILE, DIAGNOSTICS_REFRESH_MS
+from metrics import METRICS
+from refresh_bus import TERMINAL_EVENTS
 from ui_components import OnyxButtonTK, MetricChipTK, DataTableTree, TimeSeriesChartTK, ClickableDataTableTree, MatchDetailPopup, MatchCriteriaPopup
-from utils import safe_float
-from calculations import calc_implied_yield
 
 
 class DashboardPage(tk.Frame):
@@ -194,18 +194,12 @@ class DashboardPage(tk.Frame):
 
     def _on_match_click(self):
         """Handle Match button click - refresh data and show criteria popup."""
-        # First refresh the data
+        # Show the popup as soon as the refresh (new or already running) finishes
+        self.app.refresh_bus.wait_for(TERMINAL_EVENTS).add_done_callback(lambda _f: self._show_match_popup())
         self.app.refresh_data()
-        # Show the criteria popup after a delay to allow data to load
-        self.after(500, self._show_match_popup)
 
     def _show_match_popup(self):
         """Show the match criteria popup with current statistics."""
-        if self.app._busy:
-            # Still loading, check again later
-            self.after(500, self._show_match_popup)
-            return
-        # Show the popup with criteria stats
         MatchCriteriaPopup(self, self.app.criteria_stats)
 
     def _apply_state(self, card, state: str, subtext: str = "—"):
@@ -262,16 +256,16 @@ class DashboardPage(tk.Frame):
         content.pack(fill="both", expand=True, padx=20, pady=(0, 20))
 
         # Helper function to add section
-        def add_section(title, items, y_offset):
+        def add_section(title, items, y_offset, x=20):
             tk.Label(content, text=title, fg=THEME["accent"], bg=THEME["bg_card"],
-                    font=("Segoe UI", 12, "bold")).place(x=20, y=y_offset)
+                    font=("Segoe UI", 12, "bold")).place(x=x, y=y_offset)
 
             for i, (label, value) in enumerate(items):
                 y = y_offset + 30 + (i * 25)
                 tk.Label(content, text=label, fg=THEME["muted"], bg=THEME["bg_card"],
-                        font=("Segoe UI", 10)).place(x=40, y=y)
+                        font=("Segoe UI", 10)).place(x=x + 20, y=y)
                 tk.Label(content, text=value, fg=THEME["text"], bg=THEME["bg_card"],
-                        font=("Consolas", 10, "bold")).place(x=250, y=y)
+                        font=("Consolas", 10, "bold")).place(x=x + 230, y=y)
 
         # EUR IMPLIED section
         eur_items = [
@@ -316,6 +310,45 @@ class DashboardPage(tk.Frame):
         ]
         add_section("CALCULATION", calc_items, 480)
 
+        # Sensitivity of the final rate (bp per 1 bp / 1 pip bump) and a spot x CM shock grid
+        spot_shifts = (-2.0, -1.0, 0.0, 1.0, 2.0)
+        rate_shifts = (-25.0, -10.0, 0.0, 10.0, 25.0)
+        try:
+            from scenario_engine import ScenarioEngine
+            scenarios = ScenarioEngine.from_funding_data(self.app.funding_calc_data, self.app.excel_engine)
+            deltas = scenarios.dv01().get(tenor_key) or {}
+            grid = None
+            if tenor_key in scenarios.tenors:
+                change = scenarios.run_grid(spot_shifts_pct=spot_shifts, rate_shifts_bp=rate_shifts)["change_bp"]
+                # (spot, pips, rate, weight, tenor) -> rows = CM shift, columns = spot shift
+                grid = change[:, 0, :, 0, scenarios.tenors.index(tenor_key)].T
+        except Exception as e:
+            print(f"[Dashboard] Scenario engine failed: {e}")
+            deltas, grid = {}, None
+        labels = [("EUR Spot (1bp):", "eur_spot"), ("USD Spot (1bp):", "usd_spot"),
+                  ("EUR Pips (1):", "eur_pips"), ("USD Pips (1):", "usd_pips"),
+                  ("EUR Rate (1bp):", "eur_rate"), ("USD Rate (1bp):", "usd_rate"),
+                  ("NOK CM (1bp):", "nok_cm")]
+        dv01_items = [(label, f"{deltas[key]:+.4f} bp" if deltas.get(key) is not None else "N/A")
+                      for label, key in labels]
+        add_section("DV01", dv01_items, 20, x=360)
+
+        tk.Label(content, text="SCENARIOS (CHANGE, BP)", fg=THEME["accent"], bg=THEME["bg_card"],
+                font=("Segoe UI", 12, "bold")).place(x=360, y=250)
+        tk.Label(content, text="CM \\ Spot", fg=THEME["muted"], bg=THEME["bg_card"],
+                font=("Segoe UI", 9)).place(x=380, y=280)
+        for c, spot in enumerate(spot_shifts):
+            tk.Label(content, text=f"{spot:+.0f}%", fg=THEME["muted"], bg=THEME["bg_card"],
+                    font=("Consolas", 9)).place(x=450 + c * 52, y=280)
+        for r, rate in enumerate(rate_shifts):
+            y = 305 + r * 25
+            tk.Label(content, text=f"{rate:+.0f}bp", fg=THEME["muted"], bg=THEME["bg_card"],
+                    font=("Consolas", 9)).place(x=380, y=y)
+            for c in range(len(spot_shifts)):
+                v = grid[r, c] if grid is not None else float("nan")
+                tk.Label(content, text="N/A" if v != v else f"{v:+.1f}", fg=THEME["text"], bg=THEME["bg_card"],
+                        font=("Consolas", 9, "bold")).place(x=450 + c * 52, y=y)
+
         # Close button
         from ui_components import OnyxButtonTK
         OnyxButtonTK(popup, "Close", command=popup.destroy,
@@ -347,84 +380,19 @@ class DashboardPage(tk.Frame):
             for a in self.app.active_alerts[:250]:
                 self.alert_table.add_row([a["source"], a["msg"], a["val"], a["exp"]], style="bad")
 
-    def _get_ticker_val(self, ticker):
-        """Get price value from cached market data."""
-        data = self.app.cached_market_data or {}
-        inf = data.get(ticker)
-        if inf:
-            return float(inf.get("price", 0.0))
-        return None
-
-    def _get_weights(self):
-        """Get weights from Excel engine or use defaults."""
-        weights = {"USD": 0.45, "EUR": 0.05, "NOK": 0.50}
-        if hasattr(self.app, 'excel_engine') and self.app.excel_engine.weights_ok:
-            parsed = self.app.excel_engine.weights_cells_parsed
-            if parsed.get("USD") is not None:
-                weights["USD"] = parsed["USD"]
-            if parsed.get("EUR") is not None:
-                weights["EUR"] = parsed["EUR"]
-            if parsed.get("NOK") is not None:
-                weights["NOK"] = parsed["NOK"]
-        return weights
-
     def _update_funding_rates(self):
-        """Calculate and display funding rates table."""
+        """Display funding rates from the shared funding model."""
         from config import FUNDING_SPREADS
-        from calculations import calc_funding_rate
-
-        # Check if we have impl_calc_data from NokImpliedPage
-        if not hasattr(self.app, 'impl_calc_data'):
-            # Initialize empty funding data
-            self.app.funding_calc_data = {}
-            for tenor_key in ["1w", "1m", "2m", "3m", "6m"]:
-                cells = self.funding_cells.get(tenor_key, {})
-                if "funding" in cells:
-                    cells["funding"].config(text="N/A")
-                if "spread" in cells:
-                    spread = FUNDING_SPREADS.get(tenor_key, 0.20)
-                    cells["spread"].config(text=f"{spread:.2f}%")
-                if "final" in cells:
-                    cells["final"].config(text="N/A")
-                if "change" in cells:
-                    cells["change"].config(text="-", fg=THEME["text"])
-            return
 
-        weights = self._get_weights()
-        self.app.funding_calc_data = {}
+        funding = (self.app.funding_result or {}).get("funding", {})
 
         for tenor_key in ["1w", "1m", "2m", "3m", "6m"]:
-            # Get data from impl_calc_data
-            eur_data = self.app.impl_calc_data.get(f"eur_{tenor_key}", {})
-            usd_data = self.app.impl_calc_data.get(f"usd_{tenor_key}", {})
-
-            eur_impl = eur_data.get('implied')
-            usd_impl = usd_data.get('implied')
-            nok_cm = eur_data.get('nok_cm')  # Same for both USD and EUR
-
-            # Calculate funding rate
-            funding_rate = None
-            if all(x is not None for x in [eur_impl, usd_impl, nok_cm]):
-                funding_rate = calc_funding_rate(eur_impl, usd_impl, nok_cm, weights)
-
-            # Get spread
-            spread = FUNDING_SPREADS.get(tenor_key, 0.20)
-
-            # Calculate final rate
-            final_rate = None
-            if funding_rate is not None:
-                final_rate = funding_rate + spread
-
-            # Get change from Excel engine (comparison between latest and second-to-last sheet)
-            change_val = None
-            if hasattr(self.app, 'excel_engine') and hasattr(self.app.excel_engine, 'swedbank_contribution_change'):
-                # Map tenor_key (1m, 2m, etc.) to Excel tenor (1M, 2M, etc.)
-                excel_tenor = tenor_key.upper()  # "1m" -> "1M"
-                if excel_tenor in self.app.excel_engine.swedbank_contribution_change:
-                    # Use Z cell change (could also use AA)
-                    change_val = self.app.excel_engine.swedbank_contribution_change[excel_tenor].get("Z")
-
-            # Update UI cells
+            data = funding.get(tenor_key) or {}
+            funding_rate = data.get("funding_rate")
+            final_rate = data.get("final_rate")
+            spread = data.get("spread", FUNDING_SPREADS.get(tenor_key, 0.20))
+            change_val = data.get("change")
+
             cells = self.funding_cells.get(tenor_key, {})
             if "funding" in cells:
                 cells["funding"].config(text=f"{funding_rate:.2f}%" if funding_rate is not None else "N/A")
@@ -442,59 +410,13 @@ class DashboardPage(tk.Frame):
                 else:
                     cells["change"].config(text="-", fg=THEME["text"])
 
-            # Store for popup
-            self.app.funding_calc_data[tenor_key] = {
-                'eur_impl': eur_impl, 'usd_impl': usd_impl, 'nok_cm': nok_cm,
-                'eur_spot': eur_data.get('spot'), 'eur_pips': eur_data.get('pips'),
-                'eur_rate': eur_data.get('rate'), 'eur_days': eur_data.get('days'),
-                'usd_spot': usd_data.get('spot'), 'usd_pips': usd_data.get('pips'),
-                'usd_rate': usd_data.get('rate'), 'usd_days': usd_data.get('days'),
-                'weights': weights, 'funding_rate': funding_rate,
-                'spread': spread, 'final_rate': final_rate
-            }
-
     def _update_nibor_chart(self):
         """Load historical snapshots and update chart."""
-        from datetime import datetime, timedelta
-        from config import CHART_LOOKBACK_DAYS
-
         if not hasattr(self.app, 'snapshot_engine'):
             self.nibor_chart.clear_chart()
             return
 
-        # Get last N days of snapshots
-        today = datetime.now().date()
-        lookback_days = CHART_LOOKBACK_DAYS
-        dates = []
-        rates_by_tenor = {"1M": [], "2M": [], "3M": [], "6M": []}
-
-        for i in range(lookback_days, -1, -1):
-            check_date = today - timedelta(days=i)
-            date_str = check_date.strftime("%Y-%m-%d")
-
-            snapshot = self.app.snapshot_engine.load_snapshot(date_str)
-            if snapshot:
-                dates.append(check_date)
-
-                # Extract NIBOR rates from snapshot
-                nibor_rates = snapshot.get("bloomberg", {}).get("nibor_rates", {})
-
-                # Map tickers to tenors
-                tenor_map = {
-                    "1M": "NKCM1M SWET Curncy",
-                    "2M": "NKCM2M SWET Curncy",
-                    "3M": "NKCM3M SWET Curncy",
-                    "6M": "NKCM6M SWET Curncy"
-                }
-
-                for tenor, ticker in tenor_map.items():
-                    rate_data = nibor_rates.get(ticker, {})
-                    price = rate_data.get("price")
-                    if price is not None:
-                        rates_by_tenor[tenor].append(price)
-                    else:
-                        rates_by_tenor[tenor].append(None)
-
+        dates, rates_by_tenor = self.app.snapshot_engine.load_nibor_history()
         if dates:
             self.nibor_chart.plot_nibor_history(dates, rates_by_tenor)
         else:
@@ -530,6 +452,9 @@ class ReconPage(tk.Frame):
                                             on_row_click=self._on_row_click)
         self.table.pack(fill="both", expand=True, padx=pad, pady=(0, pad))
 
+        # (result version, view) currently in the table
+        self._rendered_key = None
+
     def _on_row_click(self, row_data: dict):
         """Handle row click - show match detail popup."""
         if row_data:
@@ -547,11 +472,17 @@ class ReconPage(tk.Frame):
         self.update()
 
     def update(self):
+        result = self.app.recon_result
+        key = (result.version if result else None, self.app.recon_view_mode)
+        if key == self._rendered_key:
+            return
+        self._rendered_key = key
+
         self.table.clear()
         rows = self.app.build_recon_rows(view=self.app.recon_view_mode)
 
-        # Get match details from app for CELLS view
-        match_details = {d["cell"]: d for d in (self.app.match_details or [])}
+        # Get match details from the result for CELLS view
+        match_details = result.match_by_cell if result else {}
 
         for r in rows:
             style = r.get("style", "normal")
@@ -783,7 +714,7 @@ class NokImpliedPage(tk.Frame):
         tk.Label(top, text="IMPLIED NOK YIELD", fg=THEME["muted"], bg=THEME["bg_panel"],
                  font=("Segoe UI", CURRENT_MODE["h2"], "bold")).pack(side="left")
 
-        OnyxButtonTK(top, "Recalculate", command=self.update, variant="default").pack(side="right")
+        OnyxButtonTK(top, "Recalculate", command=lambda: self.app.update_funding_model(force=True), variant="default").pack(side="right")
 
         # Weights display
         self.weights_frame = tk.Frame(container, bg=THEME["bg_panel"])
@@ -856,41 +787,6 @@ class NokImpliedPage(tk.Frame):
         ], col_widths=[50, 70, 60, 70, 60, 70, 60, 80], height=4)
         self.weighted_table_exc.pack(fill="x", padx=pad, pady=(0, pad))
 
-    def _get_ticker_val(self, ticker):
-        """Get price value from cached market data."""
-        data = self.app.cached_market_data or {}
-        inf = data.get(ticker)
-        if inf:
-            return float(inf.get("price", 0.0))
-        return None
-
-    def _get_spot_price(self, fwd_ticker, spot_ticker):
-        """Get forward pips (forward price - spot price) * 10000."""
-        fwd = self._get_ticker_val(fwd_ticker)
-        spot = self._get_ticker_val(spot_ticker)
-        if fwd is not None and spot is not None:
-            return (fwd - spot) * 10000
-        return None
-
-    def _get_weights(self):
-        """Get weights from Excel engine or use defaults."""
-        weights = {"USD": 0.45, "EUR": 0.05, "NOK": 0.50}
-        if hasattr(self.app, 'excel_engine') and self.app.excel_engine.weights_ok:
-            parsed = self.app.excel_engine.weights_cells_parsed
-            if parsed.get("USD") is not None:
-                weights["USD"] = parsed["USD"]
-            if parsed.get("EUR") is not None:
-                weights["EUR"] = parsed["EUR"]
-            if parsed.get("NOK") is not None:
-                weights["NOK"] = parsed["NOK"]
-        return weights
-
-    def _get_excel_cm_rates(self):
-        """Get CM rates from Excel file."""
-        if hasattr(self.app, 'excel_engine'):
-            return self.app.excel_engine.excel_cm_rates or {}
-        return {}
-
     def update(self):
         # Clear all tables
         self.usd_table_bbg.clear()
@@ -900,48 +796,16 @@ class NokImpliedPage(tk.Frame):
         self.eur_table_exc.clear()
         self.weighted_table_exc.clear()
 
-        # Initialize impl_calc_data storage for DashboardPage
-        if not hasattr(self.app, 'impl_calc_data'):
-            self.app.impl_calc_data = {}
+        model = self.app.funding_result
+        if not model:
+            # Not computed yet, app re-renders when the funding model arrives
+            return
 
-        # Get weights
-        weights = self._get_weights()
+        weights = model["weights"]
         self.weights_label.config(
             text=f"VIKTER:  USD = {weights['USD']*100:.0f}%  |  EUR = {weights['EUR']*100:.0f}%  |  NOK = {weights['NOK']*100:.0f}%"
         )
 
-        # Get Excel CM rates
-        excel_cm = self._get_excel_cm_rates()
-
-        # Spots
-        usd_spot = self._get_ticker_val("NOK F033 Curncy")
-        eur_spot = self._get_ticker_val("NKEU F033 Curncy")
-
-        # Excel days from Nibor days file
-        excel_days_data = self.app.current_days_data or {}
-
-        # Tenor configuration
-        tenors = [
-            {"tenor": "1M", "key": "1m",
-             "usd_fwd": "NK1M F033 Curncy", "usd_rate_bbg": "USCM1M SWET Curncy", "usd_days_bbg": "NK1M TPSF Curncy",
-             "eur_fwd": "NKEU1M F033 Curncy", "eur_rate_bbg": "EUCM1M SWET Curncy", "eur_days_bbg": "EURNOK1M TPSF Curncy",
-             "nok_cm": "NKCM1M SWET Curncy", "usd_rate_exc": "USD_1M", "eur_rate_exc": "EUR_1M"},
-            {"tenor": "2M", "key": "2m",
-             "usd_fwd": "NK2M F033 Curncy", "usd_rate_bbg": "USCM2M SWET Curncy", "usd_days_bbg": "NK2M TPSF Curncy",
-             "eur_fwd": "NKEU2M F033 Curncy", "eur_rate_bbg": "EUCM2M SWET Curncy", "eur_days_bbg": "EURNOK2M TPSF Curncy",
-             "nok_cm": "NKCM2M SWET Curncy", "usd_rate_exc": "USD_2M", "eur_rate_exc": "EUR_2M"},
-            {"tenor": "3M", "key": "3m",
-             "usd_fwd": "NK3M F033 Curncy", "usd_rate_bbg": "USCM3M SWET Curncy", "usd_days_bbg": "NK3M TPSF Curncy",
-             "eur_fwd": "NKEU3M F033 Curncy", "eur_rate_bbg": "EUCM3M SWET Curncy", "eur_days_bbg": "EURNOK3M TPSF Curncy",
-             "nok_cm": "NKCM3M SWET Curncy", "usd_rate_exc": "USD_3M", "eur_rate_exc": "EUR_3M"},
-            {"tenor": "6M", "key": "6m",
-             "usd_fwd": "NK6M F033 Curncy", "usd_rate_bbg": "USCM6M SWET Curncy", "usd_days_bbg": "NK6M TPSF Curncy",
-             "eur_fwd": "NKEU6M F033 Curncy", "eur_rate_bbg": "EUCM6M SWET Curncy", "eur_days_bbg": "EURNOK6M TPSF Curncy",
-             "nok_cm": "NKCM6M SWET Curncy", "usd_rate_exc": "USD_6M", "eur_rate_exc": "EUR_6M"},
-        ]
-
-        fallback_bbg_days = {"1m": 30, "2m": 58, "3m": 90, "6m": 181}
-
         def fmt_days(v):
             return str(int(v)) if v is not None else "-"
 
@@ -954,131 +818,55 @@ class NokImpliedPage(tk.Frame):
         def fmt_impl(v):
             return f"{v:.4f}%" if v is not None else "-"
 
-        # Store implied values for weighted calculations
-        implied_data_bbg = []
-        implied_data_exc = []
-
-        for t in tenors:
-            # Bloomberg days
-            bbg_days_usd = self._get_ticker_val(t["usd_days_bbg"])
-            if bbg_days_usd is None:
-                bbg_days_usd = fallback_bbg_days.get(t["key"])
-
-            bbg_days_eur = self._get_ticker_val(t["eur_days_bbg"])
-            if bbg_days_eur is None:
-                bbg_days_eur = fallback_bbg_days.get(t["key"])
-
-            # Excel days
-            excel_days = safe_float(excel_days_data.get(f"{t['key']}_Days"), None)
-            if excel_days is None:
-                excel_days = safe_float(excel_days_data.get(t["key"]), None)
-            if excel_days is None:
-                excel_days = bbg_days_usd
-
-            # Bloomberg pips
-            pips_bbg_usd = self._get_spot_price(t["usd_fwd"], "NOK F033 Curncy")
-            pips_bbg_eur = self._get_spot_price(t["eur_fwd"], "NKEU F033 Curncy")
-
-            # NOK CM (same for both sections)
-            nok_cm = self._get_ticker_val(t["nok_cm"]) if t["nok_cm"] else None
-
-            # ============ SECTION 1: Bloomberg CM + Excel Days ============
-            # USD: adjust pips for Excel days
-            pips_exc_usd = None
-            if pips_bbg_usd is not None and bbg_days_usd and excel_days:
-                pips_exc_usd = (pips_bbg_usd / bbg_days_usd) * excel_days
-
-            usd_rate_bbg = self._get_ticker_val(t["usd_rate_bbg"]) if t["usd_rate_bbg"] else None
-            impl_usd_bbg = calc_implied_yield(usd_spot, pips_exc_usd, usd_rate_bbg, excel_days) if excel_days else None
+        def add_weighted_row(table, tenor, impl_usd, impl_eur, nok_cm):
+            w_usd = impl_usd * weights["USD"] if impl_usd else None
+            w_eur = impl_eur * weights["EUR"] if impl_eur else None
+            w_nok = nok_cm * weights["NOK"] if nok_cm else None
+            total = (w_usd or 0) + (w_eur or 0) + (w_nok or 0) if all([w_usd, w_eur, w_nok]) else None
 
-            # EUR: adjust pips for Excel days
-            pips_exc_eur = None
-            if pips_bbg_eur is not None and bbg_days_eur and excel_days:
-                pips_exc_eur = (pips_bbg_eur / bbg_days_eur) * excel_days
+            table.add_row([
+                tenor, fmt_impl(impl_usd), fmt_impl(w_usd),
+                fmt_impl(impl_eur), fmt_impl(w_eur),
+                fmt_rate(nok_cm), fmt_impl(w_nok), fmt_impl(total)
+            ], style="normal")
 
-            eur_rate_bbg = self._get_ticker_val(t["eur_rate_bbg"]) if t["eur_rate_bbg"] else None
-            impl_eur_bbg = calc_implied_yield(eur_spot, pips_exc_eur, eur_rate_bbg, excel_days) if excel_days else None
+        rows = model["implied_rows"]
 
-            # Add rows to Section 1 tables
+        # ============ SECTION 1: Bloomberg CM + Excel Days ============
+        for r in rows:
             self.usd_table_bbg.add_row([
-                t["tenor"], fmt_rate(usd_rate_bbg),
-                fmt_days(bbg_days_usd), fmt_days(excel_days),
-                fmt_pips(pips_bbg_usd), fmt_pips(pips_exc_usd),
-                fmt_impl(impl_usd_bbg), fmt_rate(nok_cm)
+                r["tenor"], fmt_rate(r["usd_rate_bbg"]),
+                fmt_days(r["bbg_days_usd"]), fmt_days(r["excel_days"]),
+                fmt_pips(r["pips_bbg_usd"]), fmt_pips(r["pips_exc_usd"]),
+                fmt_impl(r["impl_usd_bbg"]), fmt_rate(r["nok_cm"])
             ], style="normal")
 
             self.eur_table_bbg.add_row([
-                t["tenor"], fmt_rate(eur_rate_bbg),
-                fmt_days(bbg_days_eur), fmt_days(excel_days),
-                fmt_pips(pips_bbg_eur), fmt_pips(pips_exc_eur),
-                fmt_impl(impl_eur_bbg), fmt_rate(nok_cm)
+                r["tenor"], fmt_rate(r["eur_rate_bbg"]),
+                fmt_days(r["bbg_days_eur"]), fmt_days(r["excel_days"]),
+                fmt_pips(r["pips_bbg_eur"]), fmt_pips(r["pips_exc_eur"]),
+                fmt_impl(r["impl_eur_bbg"]), fmt_rate(r["nok_cm"])
             ], style="normal")
 
-            implied_data_bbg.append({
-                "tenor": t["tenor"], "impl_usd": impl_usd_bbg, "impl_eur": impl_eur_bbg, "nok_cm": nok_cm
-            })
-
-            # Store data for DashboardPage funding rate table
-            self.app.impl_calc_data[f"usd_{t['key']}"] = {
-                'implied': impl_usd_bbg, 'spot': usd_spot, 'pips': pips_exc_usd,
-                'rate': usd_rate_bbg, 'days': excel_days, 'nok_cm': nok_cm
-            }
-
-            self.app.impl_calc_data[f"eur_{t['key']}"] = {
-                'implied': impl_eur_bbg, 'spot': eur_spot, 'pips': pips_exc_eur,
-                'rate': eur_rate_bbg, 'days': excel_days, 'nok_cm': nok_cm
-            }
-
-            # ============ SECTION 2: Excel CM + Bloomberg Days ============
-            # Use Bloomberg days and pips directly (no adjustment)
-            usd_rate_exc = excel_cm.get(t["usd_rate_exc"])
-            eur_rate_exc = excel_cm.get(t["eur_rate_exc"])
-
-            impl_usd_exc = calc_implied_yield(usd_spot, pips_bbg_usd, usd_rate_exc, bbg_days_usd) if bbg_days_usd else None
-            impl_eur_exc = calc_implied_yield(eur_spot, pips_bbg_eur, eur_rate_exc, bbg_days_eur) if bbg_days_eur else None
-
-            # Add rows to Section 2 tables
+        # ============ SECTION 2: Excel CM + Bloomberg Days ============
+        for r in rows:
             self.usd_table_exc.add_row([
-                t["tenor"], fmt_rate(usd_rate_exc),
-                fmt_days(bbg_days_usd), fmt_pips(pips_bbg_usd),
-                fmt_impl(impl_usd_exc), fmt_rate(nok_cm)
+                r["tenor"], fmt_rate(r["usd_rate_exc"]),
+                fmt_days(r["bbg_days_usd"]), fmt_pips(r["pips_bbg_usd"]),
+                fmt_impl(r["impl_usd_exc"]), fmt_rate(r["nok_cm"])
             ], style="normal")
 
             self.eur_table_exc.add_row([
-                t["tenor"], fmt_rate(eur_rate_exc),
-                fmt_days(bbg_days_eur), fmt_pips(pips_bbg_eur),
-                fmt_impl(impl_eur_exc), fmt_rate(nok_cm)
-            ], style="normal")
-
-            implied_data_exc.append({
-                "tenor": t["tenor"], "impl_usd": impl_usd_exc, "impl_eur": impl_eur_exc, "nok_cm": nok_cm
-            })
-
-        # Add weighted rows for Section 1
-        for d in implied_data_bbg:
-            w_usd = d["impl_usd"] * weights["USD"] if d["impl_usd"] else None
-            w_eur = d["impl_eur"] * weights["EUR"] if d["impl_eur"] else None
-            w_nok = d["nok_cm"] * weights["NOK"] if d["nok_cm"] else None
-            total = (w_usd or 0) + (w_eur or 0) + (w_nok or 0) if all([w_usd, w_eur, w_nok]) else None
-
-            self.weighted_table_bbg.add_row([
-                d["tenor"], fmt_impl(d["impl_usd"]), fmt_impl(w_usd),
-                fmt_impl(d["impl_eur"]), fmt_impl(w_eur),
-                fmt_rate(d["nok_cm"]), fmt_impl(w_nok), fmt_impl(total)
+                r["tenor"], fmt_rate(r["eur_rate_exc"]),
+                fmt_days(r["bbg_days_eur"]), fmt_pips(r["pips_bbg_eur"]),
+                fmt_impl(r["impl_eur_exc"]), fmt_rate(r["nok_cm"])
             ], style="normal")
 
-        # Add weighted rows for Section 2
-        for d in implied_data_exc:
-            w_usd = d["impl_usd"] * weights["USD"] if d["impl_usd"] else None
-            w_eur = d["impl_eur"] * weights["EUR"] if d["impl_eur"] else None
-            w_nok = d["nok_cm"] * weights["NOK"] if d["nok_cm"] else None
-            total = (w_usd or 0) + (w_eur or 0) + (w_nok or 0) if all([w_usd, w_eur, w_nok]) else None
-
-            self.weighted_table_exc.add_row([
-                d["tenor"], fmt_impl(d["impl_usd"]), fmt_impl(w_usd),
-                fmt_impl(d["impl_eur"]), fmt_impl(w_eur),
-                fmt_rate(d["nok_cm"]), fmt_impl(w_nok), fmt_impl(total)
-            ], style="normal")
+        # Weighted rows
+        for r in rows:
+            add_weighted_row(self.weighted_table_bbg, r["tenor"], r["impl_usd_bbg"], r["impl_eur_bbg"], r["nok_cm"])
+        for r in rows:
+            add_weighted_row(self.weighted_table_exc, r["tenor"], r["impl_usd_exc"], r["impl_eur_exc"], r["nok_cm"])
 
 
 class NiborMetaDataPage(tk.Frame):
@@ -1108,3 +896,84 @@ class NiborMetaDataPage(tk.Frame):
         self.table.add_row(["Publication Delay", "24h (T+1)", "License", "Active"], style="normal")
         self.table.add_row(["Panel Banks", "6", "GRSS Feed", "OK"], style="normal")
         self.table.add_row(["Algorithm", "Waterfall Level 1", "Manual", "Info"], style="section")
+
+
+class DiagnosticsPage(tk.Frame):
+    """Runtime metrics: hot-path latency histograms, counters and gauges."""
+
+    def __init__(self, master, app):
+        super().__init__(master, bg=THEME["bg_panel"])
+        self.app = app
+        pad = CURRENT_MODE["pad"]
+
+        top = tk.Frame(self, bg=THEME["bg_panel"])
+        top.pack(fill="x", padx=pad, pady=(pad, 10))
+
+        tk.Label(top, text="DIAGNOSTICS", fg=THEME["muted"], bg=THEME["bg_panel"],
+                 font=("Segoe UI", CURRENT_MODE["h2"], "bold")).pack(side="left")
+
+        self.lbl_info = tk.Label(top, text="", fg=THEME["muted2"], bg=THEME["bg_panel"],
+                                 font=("Segoe UI", CURRENT_MODE["small"]))
+        self.lbl_info.pack(side="left", padx=(15, 0))
+
+        OnyxButtonTK(top, "EXPORT JSON", command=self._export, variant="default").pack(side="right")
+        OnyxButtonTK(top, "RESET", command=self._reset, variant="default").pack(side="right", padx=(0, 10))
+
+        self.table = DataTableTree(self, columns=["METRIC", "COUNT", "P50 MS", "P90 MS", "P99 MS", "MAX MS"],
+                                   col_widths=[300, 100, 120, 120, 120, 120], height=22)
+        self.table.pack(fill="both", expand=True, padx=pad, pady=(0, pad))
+
+        self._after_id = None
+
+    def update(self):
+        snap = METRICS.snapshot()
+        self.table.clear()
+
+        self.table.add_row(["LATENCY", "", "", "", "", ""], style="section")
+        for name, h in snap["histograms"].items():
+            if not h["count"]:
+                continue
+            self.table.add_row([name, h["count"], f"{h['p50_ms']:.2f}", f"{h['p90_ms']:.2f}",
+                                f"{h['p99_ms']:.2f}", f"{h['max_ms']:.2f}"], style="normal")
+
+        self.table.add_row(["COUNTERS", "", "", "", "", ""], style="section")
+        for name, v in snap["counters"].items():
+            style = "bad" if name.endswith((".errors", ".failed")) and v else "normal"
+            self.table.add_row([name, v, "", "", "", ""], style=style)
+
+        self.table.add_row(["GAUGES", "", "", "", "", ""], style="section")
+        for name, v in snap["gauges"].items():
+            self.table.add_row([name, v, "", "", "", ""], style="normal")
+
+        watchdog = getattr(self.app, "stall_watchdog", None)
+        if watchdog is not None:
+            self.table.add_row(["UI STALLS (NEWEST FIRST)", "", "", "", "", ""], style="section")
+            for stall in watchdog.recent():
+                style = "warn" if stall.get("ongoing") else "bad"
+                self.table.add_row([f"{stall['at']}  {stall['callback']}", "", "", "", "",
+                                    f"{stall['duration_ms']:.0f}"], style=style)
+
+        self.lbl_info.configure(text=f"Uptime {snap['uptime_s']:.0f}s")
+        self._schedule()
+
+    def _schedule(self):
+        """Keep refreshing while the page is shown; stops once it is hidden."""
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+        self._after_id = self.after(DIAGNOSTICS_REFRESH_MS, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        if self.winfo_ismapped():
+            self.update()
+
+    def _reset(self):
+        METRICS.reset()
+        self.update()
+
+    def _export(self):
+        try:
+            path = METRICS.dump_json(METRICS_JSON_FILE)
+            self.lbl_info.configure(text=f"Saved: {path}")
+        except OSError as e:
+            self.lbl_info.configure(text=f"Export failed: {e}")
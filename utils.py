@@ -1,16 +1,16 @@
 """
 Utility functions for Onyx Terminal.
 """
+import hashlib
+import os
 import shutil
-import subprocess
+import threading
+import time
 import uuid
 from datetime import datetime, date, timedelta
 from pathlib import Path
 
-import pandas as pd
-from PIL import Image, ImageTk
-
-from config import CACHE_DIR
+from config import CACHE_DIR, COPY_CACHE_MAX_MB, COPY_CACHE_MAX_AGE_HOURS, ensure_dirs
 
 
 def fmt_ts(dt: datetime | None) -> str:
@@ -77,6 +77,12 @@ def to_date(v) -> date | None:
         s = v.strip()
         if not s:
             return None
+        # ISO dates need no pandas
+        try:
+            return date.fromisoformat(s[:10])
+        except ValueError:
+            pass
+        import pandas as pd
         try:
             dt = pd.to_datetime(s, errors="coerce")
             if pd.isna(dt):
@@ -86,6 +92,7 @@ def to_date(v) -> date | None:
             return None
     # fallback: pandas
     try:
+        import pandas as pd
         dt = pd.to_datetime(v, errors="coerce")
         if pd.isna(dt):
             return None
@@ -123,21 +130,160 @@ def calendar_days_since_month_start(today: date) -> int:
     return int((today - first).days)
 
 
+_COPY_CHUNK = 1024 * 1024
+_copy_locks: dict[str, threading.Lock] = {}
+_copy_locks_guard = threading.Lock()
+
+
+def _copy_cache_path(src: Path, st: os.stat_result) -> tuple[Path, str]:
+    """Cache file for `src` at its current signature, and the per-source name prefix."""
+    src_key = hashlib.sha1(str(src.resolve()).lower().encode("utf-8")).hexdigest()[:12]
+    sig_key = hashlib.sha1(f"{st.st_mtime_ns}:{st.st_size}".encode("ascii")).hexdigest()[:8]
+    prefix = f"COPY_{src_key}_"
+    return CACHE_DIR / f"{prefix}{sig_key}_{src.name}", prefix
+
+
+def _chunked_copy(src: Path, dst: Path):
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        while True:
+            buf = fin.read(_COPY_CHUNK)
+            if not buf:
+                break
+            fout.write(buf)
+
+
 def copy_to_cache_fast(src: Path) -> Path:
-    dst = CACHE_DIR / f"TEMP_{uuid.uuid4().hex}_{src.name}"
+    """
+    Copy a (possibly locked) workbook into CACHE_DIR and return the copy.
+
+    Copies are keyed by source path and mtime/size, so an unchanged file
+    reuses its existing copy. Older copies of the same source are removed
+    and the cache is kept within COPY_CACHE_MAX_MB / COPY_CACHE_MAX_AGE_HOURS.
+    Returns `src` itself if no copy could be made.
+    """
+    src = Path(src)
     try:
-        shutil.copy2(src, dst)
-        return dst
-    except Exception:
-        subprocess.run(f'copy "{src}" "{dst}" /Y', shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        return dst if dst.exists() else src
+        st = src.stat()
+    except OSError:
+        return src
+
+    ensure_dirs()
+    dst, prefix = _copy_cache_path(src, st)
+    with _copy_locks_guard:
+        lock = _copy_locks.setdefault(dst.name, threading.Lock())
+
+    with lock:
+        try:
+            if dst.exists() and dst.stat().st_size == st.st_size:
+                os.utime(dst)  # mark as recently used for eviction
+                return dst
+        except OSError:
+            pass
+
+        tmp = dst.with_name(f"{dst.name}.{uuid.uuid4().hex[:8]}.part")
+        try:
+            try:
+                # copyfile, not copy2: the copy's mtime tracks last use for eviction
+                shutil.copyfile(src, tmp)
+            except Exception:
+                _chunked_copy(src, tmp)
+            os.replace(tmp, dst)
+        except Exception as e:
+            print(f"[CopyCache] Could not copy {src.name}: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return src
+
+    # Previous signatures of this source are stale now
+    for old in CACHE_DIR.glob(f"{prefix}*_{src.name}"):
+        if old != dst:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    evict_copy_cache(keep=dst)
+    return dst
+
+
+def evict_copy_cache(max_mb: float = COPY_CACHE_MAX_MB, max_age_hours: float = COPY_CACHE_MAX_AGE_HOURS,
+                     keep: Path | None = None) -> int:
+    """
+    Delete cached copies older than max_age_hours, then the least recently
+    used ones until the cache fits in max_mb. `keep` and .part files are
+    skipped. A copy that cannot be deleted (on Windows, one a reader still
+    has open) is left for the next pass; on POSIX the delete succeeds and
+    open readers keep their handle.
+
+    Returns:
+        Number of files removed
+    """
+    now = time.time()
+    entries = []
+    for p in CACHE_DIR.glob("COPY_*"):
+        if p.name.endswith(".part") or p == keep:
+            continue
+        try:
+            st = p.stat()
+            entries.append((st.st_mtime, st.st_size, p))
+        except OSError:
+            continue
+
+    removed = 0
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, p in sorted(entries):
+        too_old = (now - mtime) > max_age_hours * 3600
+        too_big = total > max_mb * 1024 * 1024
+        if not (too_old or too_big):
+            continue
+        try:
+            p.unlink()
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def cleanup_copy_cache() -> int:
+    """
+    Startup cleanup: legacy TEMP_* copies, abandoned .part files and
+    anything outside the eviction policy.
+
+    Returns:
+        Number of files removed
+    """
+    removed = 0
+    now = time.time()
+    for pattern in ("TEMP_*", "COPY_*.part"):
+        for p in CACHE_DIR.glob(pattern):
+            try:
+                # Leave very recent partial copies alone, another process may be writing them
+                if p.name.endswith(".part") and now - p.stat().st_mtime < 3600:
+                    continue
+                p.unlink()
+                removed += 1
+            except OSError:
+                pass
+    removed += evict_copy_cache()
+    if removed:
+        print(f"[CopyCache] Removed {removed} stale file(s)")
+    return removed
 
 
 class LogoPipelineTK:
-    """Pipeline for processing and caching logo images."""
+    """
+    Pipeline for processing and caching logo images. PIL is imported on first use.
+
+    Processed RGBA images are also written to CACHE_DIR as PNG, keyed by
+    source path, mtime/size, kind and target size, so later starts only
+    decode the finished image.
+    """
 
     def __init__(self):
-        self._cache: dict[tuple, tuple[ImageTk.PhotoImage, str]] = {}
+        self._cache: dict[tuple, tuple["ImageTk.PhotoImage", str]] = {}
 
     @staticmethod
     def _find_first(cands):
@@ -150,35 +296,30 @@ class LogoPipelineTK:
         return None
 
     @staticmethod
-    def _remove_near_white_to_transparent(img_rgba: Image.Image, threshold=246) -> Image.Image:
-        img = img_rgba.copy()
-        px = img.load()
-        w, h = img.size
-        for y in range(h):
-            for x in range(w):
-                r, g, b, a = px[x, y]
-                if a == 0:
-                    continue
-                if r >= threshold and g >= threshold and b >= threshold:
-                    px[x, y] = (r, g, b, 0)
-        return img
+    def _remove_near_white_to_transparent(img_rgba: "Image.Image", threshold=246) -> "Image.Image":
+        from PIL import Image, ImageChops
+
+        r, g, b, a = img_rgba.split()
+        # 255 where all of r, g, b >= threshold
+        white = ImageChops.darker(ImageChops.darker(r, g), b).point(lambda v: 255 if v >= threshold else 0)
+        # a - 255 clamps to 0 for near-white pixels, other pixels keep their alpha
+        return Image.merge("RGBA", (r, g, b, ImageChops.subtract(a, white)))
 
     @staticmethod
-    def _invert_dark_to_white(img_rgba: Image.Image) -> Image.Image:
-        img = img_rgba.copy()
-        px = img.load()
-        w, h = img.size
-        for y in range(h):
-            for x in range(w):
-                r, g, b, a = px[x, y]
-                if a == 0:
-                    continue
-                if r < 90 and g < 90 and b < 90:
-                    px[x, y] = (255, 255, 255, a)
-        return img
+    def _invert_dark_to_white(img_rgba: "Image.Image") -> "Image.Image":
+        from PIL import Image, ImageChops
+
+        r, g, b, a = img_rgba.split()
+        # 255 where all of r, g, b < 90 and the pixel is not fully transparent
+        dark = ImageChops.lighter(ImageChops.lighter(r, g), b).point(lambda v: 255 if v < 90 else 0)
+        dark = ImageChops.darker(dark, a.point(lambda v: 255 if v > 0 else 0))
+        return Image.merge("RGBA", (ImageChops.lighter(r, dark), ImageChops.lighter(g, dark),
+                                    ImageChops.lighter(b, dark), a))
 
     @staticmethod
-    def _resize_fit(img: Image.Image, max_w: int, max_h: int) -> Image.Image:
+    def _resize_fit(img: "Image.Image", max_w: int, max_h: int) -> "Image.Image":
+        from PIL import Image
+
         w, h = img.size
         if w <= 0 or h <= 0:
             return img
@@ -187,22 +328,63 @@ class LogoPipelineTK:
         new_h = max(1, int(h * scale))
         return img.resize((new_w, new_h), Image.Resampling.LANCZOS)
 
+    @staticmethod
+    def _disk_cache_path(src: Path, max_w: int, max_h: int, kind: str) -> tuple[Path, str] | tuple[None, None]:
+        """Processed PNG for `src` at its current signature, and the per-source/kind name prefix."""
+        try:
+            st = src.stat()
+        except OSError:
+            return None, None
+        src_key = hashlib.sha1(str(src.resolve()).lower().encode("utf-8")).hexdigest()[:12]
+        sig_key = hashlib.sha1(f"{st.st_mtime_ns}:{st.st_size}".encode("ascii")).hexdigest()[:8]
+        prefix = f"LOGO_{src_key}_{kind}_"
+        return CACHE_DIR / f"{prefix}{max_w}x{max_h}_{sig_key}.png", prefix
+
+    def _process(self, src: Path, max_w: int, max_h: int, kind: str) -> "Image.Image":
+        from PIL import Image
+
+        dst, prefix = self._disk_cache_path(src, max_w, max_h, kind)
+        if dst is not None and dst.exists():
+            try:
+                with Image.open(dst) as cached:
+                    return cached.convert("RGBA")
+            except Exception:
+                pass  # corrupt cache file; rebuild below
+
+        img = Image.open(src).convert("RGBA")
+        img = self._remove_near_white_to_transparent(img, threshold=246)
+        if kind == "bloomberg":
+            img = self._invert_dark_to_white(img)
+        img = self._resize_fit(img, max_w=max_w, max_h=max_h)
+
+        if dst is not None:
+            try:
+                ensure_dirs()
+                tmp = dst.with_name(f"{dst.name}.{uuid.uuid4().hex[:6]}.part")
+                img.save(tmp, format="PNG")
+                os.replace(tmp, dst)
+                # Drop this logo's outputs for older source signatures
+                for old in CACHE_DIR.glob(f"{prefix}{max_w}x{max_h}_*.png"):
+                    if old != dst:
+                        old.unlink(missing_ok=True)
+            except Exception as e:
+                print(f"[Logo] Could not cache {src.name}: {e}")
+        return img
+
     def build_tk_image(self, candidates, max_w, max_h, kind: str):
         src = self._find_first(candidates)
         if not src:
             return None, None
 
-        key = (str(src), int(max_w), int(max_h), str(kind).lower())
+        kind = str(kind).lower()
+        key = (str(src), int(max_w), int(max_h), kind)
         if key in self._cache:
             img, path = self._cache[key]
             return img, path
 
-        img = Image.open(src).convert("RGBA")
-        img = self._remove_near_white_to_transparent(img, threshold=246)
-        if str(kind).lower() == "bloomberg":
-            img = self._invert_dark_to_white(img)
-        img = self._resize_fit(img, max_w=max_w, max_h=max_h)
+        from PIL import ImageTk
 
+        img = self._process(src, int(max_w), int(max_h), kind)
         tk_img = ImageTk.PhotoImage(img)
         self._cache[key] = (tk_img, str(src))
         return tk_img, str(src)
@@ -183,6 +183,22 @@ def main():
             log(f"[FAIL] No data received (timeout?)")
 
         log("")
+
+        # The mock blpapi service must walk: consecutive requests give new prices
+        from engines import create_mock_market_api
+        from market_providers import BlpapiProvider
+
+        provider = BlpapiProvider(create_mock_market_api(profile="instant", seed=7))
+        fields = ["PX_LAST", "CHG_NET_1D", "LAST_UPDATE"]
+        first = provider.fetch(tuple(test_tickers), fields)
+        second = provider.fetch(tuple(test_tickers), fields)
+        moved = [t for t in test_tickers if t in first and t in second and first[t][0] != second[t][0]]
+        if first and len(moved) == len(first):
+            log(f"[OK] Mock blpapi prices move between fetches ({len(moved)}/{len(test_tickers)} tickers)")
+        else:
+            log(f"[FAIL] Mock blpapi prices did not move ({len(moved)}/{len(first)} tickers changed)")
+
+        log("")
     except Exception as e:
         log(f"[FAIL] Bloomberg Engine test failed: {e}")
         import traceback
@@ -0,0 +1,185 @@
+"""
+Shared-read workbook access for Onyx Terminal.
+Opens workbooks that Excel (or a colleague) holds open without copying
+them: the file is opened with full share flags and only the zip members
+needed for the requested sheets are streamed into an in-memory package.
+"""
+import io
+import os
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+from metrics import METRICS
+from utils import copy_to_cache_fast
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+WORKBOOK_PART = "xl/workbook.xml"
+WORKBOOK_RELS = "xl/_rels/workbook.xml.rels"
+
+# Package parts openpyxl needs regardless of which sheets are read
+BASE_PARTS = [
+    "[Content_Types].xml",
+    "_rels/.rels",
+    WORKBOOK_RELS,
+    "xl/styles.xml",
+    "xl/sharedStrings.xml",
+    "xl/theme/theme1.xml",
+]
+
+# Keep ElementTree from writing ns0:-style prefixes
+ET.register_namespace("", NS_MAIN)
+ET.register_namespace("r", NS_REL)
+
+
+def open_shared(path: Path):
+    """
+    Open a file for binary reading without blocking (or being blocked by) writers.
+
+    On Windows this uses CreateFileW with FILE_SHARE_READ | FILE_SHARE_WRITE |
+    FILE_SHARE_DELETE, which succeeds while Excel has the workbook open.
+    Elsewhere a plain open() already shares.
+    """
+    if sys.platform != "win32":
+        return open(path, "rb")
+
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
+
+    GENERIC_READ = 0x80000000
+    FILE_SHARE_ALL = 0x00000001 | 0x00000002 | 0x00000004
+    OPEN_EXISTING = 3
+    FILE_ATTRIBUTE_NORMAL = 0x80
+    INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+    create_file = ctypes.windll.kernel32.CreateFileW
+    create_file.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                            wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+    create_file.restype = wintypes.HANDLE
+
+    handle = create_file(str(path), GENERIC_READ, FILE_SHARE_ALL, None,
+                         OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, None)
+    if handle == INVALID_HANDLE_VALUE or handle is None:
+        raise ctypes.WinError()
+
+    try:
+        fd = msvcrt.open_osfhandle(handle, os.O_RDONLY | os.O_BINARY)
+    except Exception:
+        ctypes.windll.kernel32.CloseHandle(handle)
+        raise
+    return os.fdopen(fd, "rb")
+
+
+def _sheet_parts(zf: zipfile.ZipFile) -> tuple[ET.Element, list[tuple[str, str]]]:
+    """Parse workbook.xml; returns (root, [(sheet name, part path)]) in workbook order."""
+    root = ET.fromstring(zf.read(WORKBOOK_PART))
+    rels = ET.fromstring(zf.read(WORKBOOK_RELS))
+    targets = {}
+    for rel in rels.findall(f"{{{NS_PKG_REL}}}Relationship"):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        elif not target.startswith("xl/"):
+            target = "xl/" + target
+        targets[rel.get("Id")] = target
+
+    sheets = []
+    for sheet in root.iter(f"{{{NS_MAIN}}}sheet"):
+        sheets.append((sheet.get("name"), targets.get(sheet.get(f"{{{NS_REL}}}id"), "")))
+    return root, sheets
+
+
+def list_sheets(path: Path) -> list[str]:
+    """Sheet names in workbook order, read from workbook.xml only (no sheet data is parsed)."""
+    with open_shared(Path(path)) as f, zipfile.ZipFile(f) as zf:
+        _, sheets = _sheet_parts(zf)
+    return [n for n, _ in sheets]
+
+
+def extract_sheets(fileobj, select=None) -> tuple[io.BytesIO, list[str]]:
+    """
+    Build an in-memory xlsx package with only the selected sheets.
+
+    Args:
+        fileobj: Seekable binary file of the source workbook
+        select: Callable taking the ordered sheet names and returning the
+            names to keep (None keeps all)
+
+    Returns:
+        (BytesIO with the trimmed package, kept sheet names in workbook order)
+    """
+    with zipfile.ZipFile(fileobj) as zf:
+        root, sheets = _sheet_parts(zf)
+        names = [n for n, _ in sheets]
+        keep = set(select(names) if select else names)
+
+        sheets_el = root.find(f"{{{NS_MAIN}}}sheets")
+        for el in list(sheets_el):
+            if el.get("name") not in keep:
+                sheets_el.remove(el)
+
+        # Defined names refer to sheets by index; drop them with the removed sheets
+        defined = root.find(f"{{{NS_MAIN}}}definedNames")
+        if defined is not None:
+            root.remove(defined)
+        for view in root.iter(f"{{{NS_MAIN}}}workbookView"):
+            view.set("activeTab", "0")
+            view.set("firstSheet", "0")
+
+        available = set(zf.namelist())
+        members = [p for p in BASE_PARTS if p in available]
+        members += [part for name, part in sheets if name in keep and part in available]
+
+        out = io.BytesIO()
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as dst:
+            dst.writestr(WORKBOOK_PART, ET.tostring(root, xml_declaration=True, encoding="UTF-8"))
+            for member in members:
+                with zf.open(member) as src:
+                    dst.writestr(member, src.read())
+
+    out.seek(0)
+    return out, [n for n in names if n in keep]
+
+
+def load_workbook_shared(path: Path, select=None, data_only: bool = True):
+    """
+    Open a workbook read-only with only the sheets picked by `select`.
+
+    Tries, in order: shared-read streaming of the needed zip members,
+    a plain openpyxl load, and finally a managed cache copy.
+
+    Args:
+        path: Workbook path
+        select: Callable (sheet names -> names to keep), e.g. lambda n: n[-2:]
+        data_only: Read cached values instead of formulas
+
+    Returns:
+        openpyxl Workbook (read-only); caller closes it
+    """
+    path = Path(path)
+    with METRICS.timer("workbook.open"):
+        try:
+            with open_shared(path) as f:
+                package, _ = extract_sheets(f, select)
+            wb = load_workbook(package, data_only=data_only, read_only=True, keep_links=False)
+            METRICS.inc("workbook.open.shared")
+            return wb
+        except Exception as e:
+            print(f"[Workbook] Shared read failed for {path.name}: {e}")
+
+        try:
+            wb = load_workbook(path, data_only=data_only, read_only=True, keep_links=False)
+            METRICS.inc("workbook.open.plain")
+            return wb
+        except Exception:
+            # Last resort: copy the file into the managed cache and read the copy
+            wb = load_workbook(copy_to_cache_fast(path), data_only=data_only, read_only=True, keep_links=False)
+            METRICS.inc("workbook.open.copy")
+            return wb